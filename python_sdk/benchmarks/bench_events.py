@@ -0,0 +1,123 @@
+"""
+Frames handled per second on the reader thread: typed replies vs. the
+original per-frame reply dicts.
+
+Frames are handed to _handle_frame directly and, for the second column,
+parsed from one prebuilt stream first. Events go to a bounded deque
+instead of the bus so only decoding and allocation are measured.
+
+    python benchmarks/bench_events.py
+"""
+
+import struct
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from jx1000.driver import JX1000Driver, EFRAME
+from jx1000.frames import FrameParser, build_frame
+
+
+class _Collecting(JX1000Driver):
+
+    def __init__(self):
+        super().__init__(print_events=False)
+        self.collected = deque(maxlen=1024)
+        self.handled = 0
+
+    def _dispatch_event(self, cmd, value):
+        self.handled += 1
+        self.collected.append((cmd, value))
+
+
+class LegacyDriver(_Collecting):
+    """Reply dicts, as before typed replies."""
+
+    def _handle_frame(self, cmd, data):
+        if cmd == EFRAME.DevRead or cmd == EFRAME.DevWrite:
+            if len(data) >= 9:
+                com, ch, res, addr, val = struct.unpack_from("<BBBHf", data)
+                reply = {"com": com, "ch": ch, "addr": addr, "result": res, "value": val}
+                self._mux.resolve((cmd, reply["com"], reply["ch"], reply["addr"]), reply)
+                self._dispatch_event(cmd, reply)
+        elif cmd == EFRAME.RES:
+            text = data.decode("utf-8", errors="ignore").strip()
+            if text.startswith("{ED,") and text.endswith("}"):
+                parts = text[1:-1].split(",")
+                self._dispatch_event(cmd, "{PASS}" if parts[1].strip() == "1" else "FAIL")
+                return
+            self._dispatch_event(cmd, text)
+        elif cmd == EFRAME.LOG:
+            text = data.decode("utf-8", errors="ignore").strip()
+            if text == "cmd_EnableExec.":
+                text = "Starting test..."
+            elif text.startswith("cmd") and text.endswith("Start..."):
+                text = "Test Start"
+            elif text.startswith("cmd") and text.endswith("End..."):
+                text = "Test End"
+            self._dispatch_event(cmd, text)
+
+
+class TypedDriver(_Collecting):
+    pass
+
+
+def make_frames(n: int, text_share: float):
+    frames = []
+    every = int(1 / text_share) if text_share else 0
+    for i in range(n):
+        if every and i % every == 0:
+            cmd, payload = (EFRAME.RES, b"  step 12: voltage 3.30 V ok  ") if i % 2 \
+                else (EFRAME.LOG, b"cmd_Step12 Start...")
+        else:
+            cmd = EFRAME.DevRead
+            payload = struct.pack("<BBBHf", 1, i % 8 + 1, 0, i & 0xFFFF, i * 0.5)
+        frames.append((cmd, payload))
+    return frames
+
+
+def bench(driver_cls, frames, repeat=15):
+    drv = driver_cls()
+    best = float("inf")
+    for _ in range(repeat):
+        drv.collected.clear()
+        t0 = time.perf_counter()
+        for cmd, payload in frames:
+            drv._handle_frame(cmd, payload)
+        best = min(best, time.perf_counter() - t0)
+    drv.events.close()
+    return len(frames) / best
+
+
+def bench_stream(driver_cls, stream, repeat=15):
+    drv = driver_cls()
+    best = float("inf")
+    for _ in range(repeat):
+        drv.handled = 0
+        drv._parser = FrameParser()
+        t0 = time.perf_counter()
+        for i in range(0, len(stream), 4096):
+            drv._process_buffer(stream[i:i + 4096])
+        best = min(best, time.perf_counter() - t0)
+    n = drv.handled
+    drv.events.close()
+    return n / best
+
+
+def main():
+    n = 100000
+    for label, share in (("DevRead replies only", 0), ("10% RES/LOG text", 0.1)):
+        frames = make_frames(n, share)
+        stream = b"".join(build_frame(cmd, payload) for cmd, payload in frames)
+        print(f"{label}: {n} frames")
+        for name, cls in (("legacy", LegacyDriver), ("typed", TypedDriver)):
+            print(f"  {name:<7} handle {bench(cls, frames) / 1e3:8.1f} k frames/s"
+                  f"   parse+handle {bench_stream(cls, stream) / 1e3:8.1f} k frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+CRC-16/MODBUS throughput (bit loop vs. table) and ModbusRTU transaction
+latency (fixed 50 ms settle vs. reading to length / 3.5-char silence),
+against the simulated RTU slave on an in-process port at 9600 and
+115200 baud.
+
+    python benchmarks/bench_modbus_rtu.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from jx1000.crc import crc16_modbus
+from jx1000.modbus_simple import ModbusExceptionResponse, ModbusRTU
+from jx1000.sim.modbus_slave import SimulatedModbusSlave
+from jx1000.sim.simulator import Simulator
+
+
+def crc16_bitwise(data: bytes) -> int:
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+class LegacyRTU(ModbusRTU):
+    """The original transaction path: sleep 50 ms, then read the exact length."""
+
+    def _send_frame(self, frame, response_length):
+        self.ser.reset_input_buffer()
+        self.ser.write(frame)
+        self.ser.flush()
+        time.sleep(0.05)
+        resp = self.ser.read(response_length)
+        if len(resp) != response_length:
+            raise RuntimeError("Timeout or incomplete Modbus response")
+        return resp
+
+
+def bench_crc():
+    print("CRC-16/MODBUS")
+    for size in (8, 256):
+        data = os.urandom(size)
+        n = max(1, 200000 // size)
+        for name, fn in (("bitwise", crc16_bitwise), ("table", crc16_modbus)):
+            t0 = time.perf_counter()
+            for _ in range(n):
+                fn(data)
+            dt = time.perf_counter() - t0
+            print(f"  {name:<8} {size:>4} B frames  {n * size / dt / 1e6:6.2f} MB/s"
+                  f"  {dt / n * 1e6:8.1f} us/frame")
+
+
+def bench_transactions(baudrate, n=10):
+    print(f"transactions at {baudrate} baud, 2 ms slave latency")
+    sim = Simulator()
+    for name, cls in (("legacy", LegacyRTU), ("rtu", ModbusRTU)):
+        port = sim.add_fake(SimulatedModbusSlave(latency=0.002), baud=baudrate, timeout=1.0)
+        rtu = cls.from_serial(port)
+        cases = (("read 2", lambda: rtu.read_holding_registers(1, 1000, 2)),
+                 ("read 125", lambda: rtu.read_holding_registers(1, 1000, 125)),
+                 ("exception", lambda: rtu.read_holding_registers(1, 1990, 20)))
+        for label, call in cases:
+            t0 = time.perf_counter()
+            for _ in range(n):
+                try:
+                    call()
+                except ModbusExceptionResponse:
+                    pass
+                except RuntimeError:
+                    # The legacy path waits out the timeout on short replies.
+                    pass
+            dt = (time.perf_counter() - t0) / n
+            print(f"  {name:<7} {label:<10} {dt * 1e3:8.2f} ms")
+    sim.close()
+
+
+def main():
+    bench_crc()
+    for baudrate in (9600, 115200):
+        bench_transactions(baudrate)
+
+
+if __name__ == "__main__":
+    main()
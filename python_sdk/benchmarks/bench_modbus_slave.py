@@ -0,0 +1,134 @@
+"""
+Modbus transactions per second and p50/p99 latency against the simulated
+slave on a pseudo-terminal, through ModbusHelper (pymodbus) and ModbusRTU.
+
+    single  read_single_register(1000, 2)      one input pair
+    mapped  read_mapped_pair(1000, 500)        the whole mapped range
+    block   read_registers(0, 125)             one full-size request
+    test    write 20 = 1, poll 23 until done   trigger / result registers
+
+Latency is per call; tx/s counts Modbus requests the slave answered.
+
+    python benchmarks/bench_modbus_slave.py --baud 115200 --latency 0.002
+    python benchmarks/bench_modbus_slave.py --exception-rate 0.01 --drop-rate 0.01
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from pymodbus.client import ModbusSerialClient
+
+from jx1000.modbus import ModbusHelper
+from jx1000.modbus_simple import ModbusRTU
+from jx1000.sim.modbus_slave import RESULT_REGISTER, TRIGGER_REGISTER, SimulatedModbusSlave
+from jx1000.sim.simulator import Simulator
+
+
+def helper_cases(modbus: ModbusHelper):
+    def run_test():
+        modbus.write_register(TRIGGER_REGISTER, 1)
+        while True:
+            result, err = modbus.read_single_register(RESULT_REGISTER, 1)
+            if err or result[0]:
+                return err
+
+    return (("single", lambda: modbus.read_single_register(1000, 2)[1]),
+            ("mapped", lambda: modbus.read_mapped_pair(1000, 500, as_array=True)[1]),
+            ("block", lambda: modbus.read_registers(0, 125)[1]),
+            ("test", run_test))
+
+
+def rtu_cases(rtu: ModbusRTU, slave: int = 1):
+    def call(fn, *args):
+        try:
+            fn(*args)
+        except RuntimeError as e:
+            return str(e)
+        return None
+
+    def mapped():
+        for start in range(1000, 2000, 124):
+            err = call(rtu.read_holding_registers, slave, start, min(124, 2000 - start))
+            if err:
+                return err
+        return None
+
+    def run_test():
+        err = call(rtu.write_single_register, slave, TRIGGER_REGISTER, 1)
+        while err is None:
+            try:
+                if rtu.read_holding_registers(slave, RESULT_REGISTER, 1)[0]:
+                    return None
+            except RuntimeError as e:
+                err = str(e)
+        return err
+
+    return (("single", lambda: call(rtu.read_holding_registers, slave, 1000, 2)),
+            ("mapped", mapped),
+            ("block", lambda: call(rtu.read_holding_registers, slave, 0, 125)),
+            ("test", run_test))
+
+
+def measure(slave: SimulatedModbusSlave, call, n: int) -> dict:
+    times, errors = [], 0
+    requests = slave.requests
+    t_start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter()
+        if call():
+            errors += 1
+        times.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t_start
+    times.sort()
+    return {
+        "tx_s": (slave.requests - requests) / elapsed,
+        "p50_ms": statistics.median(times) * 1e3,
+        "p99_ms": times[min(len(times) - 1, int(len(times) * 0.99))] * 1e3,
+        "errors": errors,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--baud", type=int, default=115200)
+    ap.add_argument("--latency", type=float, default=0.002, help="slave response delay, s")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--drop-rate", type=float, default=0.0)
+    ap.add_argument("--corrupt-rate", type=float, default=0.0)
+    ap.add_argument("--exception-rate", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=0.2, help="client timeout, s")
+    ap.add_argument("-n", type=int, default=100, help="calls per case")
+    args = ap.parse_args()
+
+    sim = Simulator()
+    slave = SimulatedModbusSlave(latency=args.latency, jitter=args.jitter,
+                                 drop_rate=args.drop_rate, corrupt_rate=args.corrupt_rate,
+                                 exception_rate=args.exception_rate, test_duration=0.01, seed=1)
+    slave.set_inputs(1000, [i * 0.01 for i in range(500)])
+    port = sim.add_pty(slave, baud=args.baud)
+
+    client = ModbusSerialClient(port=port, baudrate=args.baud, timeout=args.timeout, retries=0)
+    client.connect()
+    rtu = ModbusRTU(port, args.baud, args.timeout)
+
+    print(f"{port} at {args.baud} baud, {args.latency * 1e3:.1f} ms slave latency, {args.n} calls per case")
+    try:
+        for name, cases in (("helper", helper_cases(ModbusHelper(client))), ("rtu", rtu_cases(rtu))):
+            for label, call in cases:
+                r = measure(slave, call, args.n)
+                print(f"  {name:<7} {label:<7} {r['tx_s']:8.0f} tx/s   p50 {r['p50_ms']:7.2f} ms"
+                      f"   p99 {r['p99_ms']:7.2f} ms   errors {r['errors']}")
+    finally:
+        client.close()
+        rtu.close()
+        sim.close()
+
+
+if __name__ == "__main__":
+    main()
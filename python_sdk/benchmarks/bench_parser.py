@@ -0,0 +1,81 @@
+"""
+Frame parser throughput in MB/s on clean and noisy input, FrameParser vs.
+the original pop(0)-based _process_buffer loop.
+
+    python benchmarks/bench_parser.py
+"""
+
+import random
+import struct
+import sys
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from jx1000.frames import FRAME_H, FRAME_L, FrameParser, build_frame
+
+
+def legacy_parse(buffer: bytearray, out: list):
+    while len(buffer) >= 5:
+        if buffer[0] != FRAME_H or buffer[1] != FRAME_L:
+            buffer.pop(0)
+            continue
+        total = buffer[2] + 5
+        if len(buffer) < total:
+            return
+        frame = bytes(buffer[:total])
+        del buffer[:total]
+        if sum(frame[:-1]) & 0xFF != frame[-1]:
+            continue
+        out.append((frame[3], frame[4:-1]))
+
+
+def make_stream(n_frames: int, noise: float, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+    out = bytearray()
+    for i in range(n_frames):
+        out += build_frame(0x21, struct.pack("<BBBHf", 1, i % 8 + 1, 0, i & 0xFFFF, i * 0.5))
+        if noise:
+            out += bytes(rnd.getrandbits(8) for _ in range(int(rnd.expovariate(1 / noise))))
+    return bytes(out)
+
+
+def chunks(data: bytes, size: int = 256):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def bench(name, stream, parse, size):
+    pieces = chunks(stream, size)
+    t0 = time.perf_counter()
+    n = parse(pieces)
+    dt = time.perf_counter() - t0
+    print(f"  {name:<8} {size:>6} B reads  {len(stream) / dt / 1e6:8.2f} MB/s  ({n} frames)")
+
+
+def run_frameparser(pieces):
+    parser = FrameParser()
+    return sum(1 for piece in pieces for _ in parser.feed(piece))
+
+
+def run_legacy(pieces):
+    buffer = bytearray()
+    out = []
+    for piece in pieces:
+        buffer.extend(piece)
+        legacy_parse(buffer, out)
+    return len(out)
+
+
+def main():
+    for label, noise in (("clean", 0), ("noisy (~32 B garbage per frame)", 32)):
+        stream = make_stream(20000, noise)
+        print(f"{label}: {len(stream) / 1e6:.2f} MB")
+        for size in (256, 65536):
+            bench("legacy", stream, run_legacy, size)
+            bench("parser", stream, run_frameparser, size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Reply-to-caller latency of JX1000Driver.read(), event wakeups vs. the old
+1 ms sleep polling loop, measured against a simulated device on an
+in-process port.
+
+    python benchmarks/bench_wakeup.py
+"""
+
+import struct
+import sys
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from jx1000.driver import JX1000Driver, EFRAME
+from jx1000.messages import DevReply
+from jx1000.sim.device import SimulatedJX1000
+from jx1000.sim.simulator import Simulator
+
+
+class PollingDriver(JX1000Driver):
+    """The pre-event driver: 256-byte blocking reads and a 1 ms polling wait."""
+
+    def _reader(self):
+        while self._running:
+            chunk = self.s.read(256)
+            if chunk:
+                self._process_buffer(chunk)
+
+    def _dispatch_event(self, cmd, value):
+        if cmd == EFRAME.DevRead and isinstance(value, DevReply):
+            self._last_read = value.value
+
+    def read(self, com, ch, addr, timeout=300):
+        self._last_read = None
+        payload = struct.pack("<BBHf", com, ch, addr, 0.0)
+        self.send_frame(EFRAME.DevRead, payload)
+        start_time = time.time()
+        while time.time() - start_time < timeout * 0.001:
+            if self._last_read is not None:
+                return self._last_read
+            time.sleep(0.001)
+        return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(driver_cls, n=200, latency=0.0):
+    sim = Simulator()
+    drv = driver_cls(print_events=False)
+    drv.open_serial(sim.add_fake(SimulatedJX1000(latency=latency)))
+    time.sleep(0.01)
+    samples = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        drv.read(1, 1, i)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    drv.close_port()
+    sim.close()
+    return {
+        "p50_us": percentile(samples, 50),
+        "p99_us": percentile(samples, 99),
+        "cpu_pct": 100.0 * cpu / wall,
+    }
+
+
+def main():
+    for latency in (0.0, 0.02):
+        print(f"device latency {latency * 1000:.0f} ms")
+        for name, cls in (("polling", PollingDriver), ("events", JX1000Driver)):
+            n = 40 if cls is PollingDriver and latency == 0.0 else 100
+            r = run(cls, n=n, latency=latency)
+            print(f"  {name:<8} p50 {r['p50_us']:9.0f} us   p99 {r['p99_us']:9.0f} us   cpu {r['cpu_pct']:5.1f} %")
+
+
+if __name__ == "__main__":
+    main()
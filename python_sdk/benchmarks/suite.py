@@ -0,0 +1,342 @@
+"""
+SDK benchmark suite with JSON results and regression comparison.
+
+Runs against the simulators in jx1000.sim (in-process ports, or PTYs
+where pymodbus or real port opening is involved), so no hardware is
+needed:
+
+    parse       frames/s through JX1000Driver._process_buffer, clean and noisy
+    roundtrip   read()/write() p50/p99 and read_many() reads/s
+    download    download_rules() bytes/s, stop-and-wait and window=4, unthrottled
+                and at 115200 baud
+    mapped      ModbusHelper.read_mapped_pair(1000, 500) over a PTY
+    crc         CRC-16/MODBUS and CRC-16/KERMIT MB/s
+    discovery   discover_jx1000() over 8 PTYs, first device and all devices
+    shards      ShardedStationPool.read_many() reads/s over 8 PTYs, 1/2/4 workers
+
+    python benchmarks/suite.py run -o before.json
+    python benchmarks/suite.py run -o after.json --only parse crc
+    python benchmarks/suite.py compare before.json after.json --threshold 0.1
+
+Each metric is the median of --repeat runs. compare exits with status 1
+when any metric got worse by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from jx1000.crc import crc16_kermit, crc16_modbus
+from jx1000.discovery import PortCache, discover_jx1000
+from jx1000.driver import EFRAME, JX1000Driver
+from jx1000.frames import build_frame
+from jx1000.rule_cache import RuleImageCache
+from jx1000.sim.device import SimulatedJX1000
+from jx1000.sim.simulator import Simulator, pty
+
+# name -> (function, description); each function returns {metric: (value, unit, higher_is_better)}
+BENCHMARKS: Dict[str, Tuple[Callable[[], Dict[str, Tuple[float, str, bool]]], str]] = {}
+
+
+def benchmark(name: str, description: str):
+    def register(fn):
+        BENCHMARKS[name] = (fn, description)
+        return fn
+    return register
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def _quiet_driver(name: str) -> JX1000Driver:
+    driver = JX1000Driver(name, print_events=False)
+    driver.rule_cache = RuleImageCache(tempfile.mkdtemp(prefix="jx1000-bench-"))
+    return driver
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+@benchmark("parse", "frames/s through JX1000Driver._process_buffer")
+def bench_parse():
+    class Counting(JX1000Driver):
+        handled = 0
+
+        def _dispatch_event(self, cmd, value):
+            self.handled += 1
+
+    rnd = random.Random(1)
+    results = {}
+    for label, noise in (("clean", 0), ("noisy", 32)):
+        stream = bytearray()
+        for i in range(20000):
+            stream += build_frame(EFRAME.DevRead, struct.pack("<BBBHf", 1, i % 8 + 1, 0, i & 0xFFFF, i * 0.5))
+            if noise:
+                stream += bytes(rnd.getrandbits(8) for _ in range(int(rnd.expovariate(1 / noise))))
+        pieces = [bytes(stream[i:i + 256]) for i in range(0, len(stream), 256)]
+        driver = Counting(print_events=False)
+        t0 = time.perf_counter()
+        for piece in pieces:
+            driver._process_buffer(piece)
+        dt = time.perf_counter() - t0
+        results[f"{label}_frames_s"] = (driver.handled / dt, "frames/s", True)
+    return results
+
+
+@benchmark("roundtrip", "read()/write() latency and read_many() throughput on a simulated device")
+def bench_roundtrip():
+    sim = Simulator()
+    driver = _quiet_driver("bench")
+    driver.open_serial(sim.add_fake(SimulatedJX1000(latency=0.0005)))
+    try:
+        results = {}
+        for label, call in (("read", lambda i: driver.read(1, 1, i % 64)),
+                            ("write", lambda i: driver.write(1, 1, i % 64, float(i)))):
+            times = []
+            for i in range(300):
+                t0 = time.perf_counter()
+                call(i)
+                times.append(time.perf_counter() - t0)
+            results[f"{label}_p50_ms"] = (statistics.median(times) * 1e3, "ms", False)
+            results[f"{label}_p99_ms"] = (_percentile(times, 0.99) * 1e3, "ms", False)
+        requests = [(1, 1, addr) for addr in range(256)]
+        t0 = time.perf_counter()
+        for _ in range(5):
+            driver.read_many(requests, as_array=True)
+        results["read_many_reads_s"] = (5 * len(requests) / (time.perf_counter() - t0), "reads/s", True)
+        return results
+    finally:
+        driver.close_port()
+        sim.close()
+
+
+@benchmark("download", "download_rules() bytes/s of a 32 KiB image")
+def bench_download():
+    image = bytes(random.Random(2).getrandbits(8) for _ in range(32 * 1024))
+    results = {}
+    for label, baud in (("unthrottled", None), ("115200", 115200)):
+        for mode, options in (("", {}), ("_window4", {"window": 4, "adaptive": True})):
+            sim = Simulator()
+            device = SimulatedJX1000(latency=0.0005)
+            driver = _quiet_driver(f"bench-{label}")
+            driver.open_serial(sim.add_fake(device, baud=baud))
+            try:
+                driver.download_rules(image, **options)
+                deadline = time.monotonic() + 60
+                while driver.last_transfer is None and time.monotonic() < deadline:
+                    time.sleep(0.005)
+                transfer = driver.last_transfer
+                ok = transfer is not None and bytes(device.rule_image) == image
+                results[f"{label}{mode}_bytes_s"] = (transfer.bytes_per_second if ok else 0.0,
+                                                     "B/s", True)
+            finally:
+                driver.close_port()
+                sim.close()
+    return results
+
+
+@benchmark("mapped", "ModbusHelper.read_mapped_pair over the whole 1000-1499 range")
+def bench_mapped():
+    if pty is None:
+        return {}
+    from pymodbus.client import ModbusSerialClient
+    from jx1000.modbus import ModbusHelper
+    from jx1000.sim.modbus_slave import SimulatedModbusSlave
+
+    sim = Simulator()
+    slave = SimulatedModbusSlave(latency=0.001)
+    slave.set_inputs(1000, [i * 0.01 for i in range(500)])
+    client = ModbusSerialClient(port=sim.add_pty(slave, baud=115200), baudrate=115200,
+                                timeout=0.5, retries=0)
+    client.connect()
+    try:
+        modbus = ModbusHelper(client)
+        times = []
+        for _ in range(10):
+            t0 = time.perf_counter()
+            _, err = modbus.read_mapped_pair(1000, 500, as_array=True)
+            if err:
+                raise RuntimeError(err)
+            times.append(time.perf_counter() - t0)
+        return {"full_range_ms": (statistics.median(times) * 1e3, "ms", False)}
+    finally:
+        client.close()
+        sim.close()
+
+
+@benchmark("crc", "CRC-16 throughput on 256-byte frames")
+def bench_crc():
+    data = os.urandom(256)
+    results = {}
+    for label, fn in (("modbus", crc16_modbus), ("kermit", crc16_kermit)):
+        n = 2000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn(data)
+        results[f"{label}_mb_s"] = (n * len(data) / (time.perf_counter() - t0) / 1e6, "MB/s", True)
+    return results
+
+
+@benchmark("discovery", "discover_jx1000() over 8 PTYs with one device answering")
+def bench_discovery():
+    if pty is None:
+        return {}
+    sim = Simulator()
+    # Seven silent ports that never answer and one live device, found last in port order.
+    ports = [sim.add_pty(SimulatedJX1000(drop_rate=1.0)) for _ in range(7)]
+    ports.append(sim.add_pty(SimulatedJX1000()))
+    cache = PortCache(Path(tempfile.mkdtemp(prefix="jx1000-bench-")) / "ports.json")
+    try:
+        results = {}
+        for label, want in (("first", 1), ("all", None)):
+            t0 = time.perf_counter()
+            found = discover_jx1000(want=want, timeout=0.3, ports=ports, cache=cache)
+            dt = time.perf_counter() - t0
+            results[f"{label}_ms"] = (dt * 1e3 if found else float("inf"), "ms", False)
+        return results
+    finally:
+        sim.close()
+
+
+@benchmark("shards", "ShardedStationPool.read_many reads/s over 8 PTYs with 1, 2 and 4 workers")
+def bench_shards():
+    if pty is None:
+        return {}
+    from jx1000.sharding import ShardedStationPool
+
+    sim = Simulator()
+    ports = {f"s{i}": sim.add_pty(SimulatedJX1000()) for i in range(8)}
+    requests = [(1, 1, addr) for addr in range(32)]
+    results = {}
+    try:
+        for workers in (1, 2, 4):
+            pool = ShardedStationPool(ports, workers=workers)
+            try:
+                pool.read_many(requests)    # warm up
+                rounds = 20
+                t0 = time.perf_counter()
+                for _ in range(rounds):
+                    pool.read_many(requests)
+                dt = time.perf_counter() - t0
+                results[f"workers{workers}_reads_s"] = (rounds * len(requests) * len(ports) / dt,
+                                                        "reads/s", True)
+            finally:
+                pool.close()
+        return results
+    finally:
+        sim.close()
+
+
+# -------------------------
+# Run / compare
+# -------------------------
+def _sdk_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=repo_root,
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(names: List[str], repeat: int) -> dict:
+    metrics = {}
+    for name in names:
+        fn, description = BENCHMARKS[name]
+        print(f"{name}: {description}", file=sys.stderr)
+        runs: Dict[str, List[float]] = {}
+        units: Dict[str, Tuple[str, bool]] = {}
+        for _ in range(repeat):
+            for metric, (value, unit, higher) in fn().items():
+                runs.setdefault(metric, []).append(value)
+                units[metric] = (unit, higher)
+        for metric, values in runs.items():
+            unit, higher = units[metric]
+            value = statistics.median(values)
+            metrics[f"{name}.{metric}"] = {"value": value, "unit": unit, "higher_is_better": higher}
+            print(f"  {metric:<22} {value:14.2f} {unit}", file=sys.stderr)
+    return {
+        "meta": {
+            "sdk": _sdk_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": repeat,
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> int:
+    """Print a metric-by-metric comparison; returns the number of regressions."""
+    regressions = 0
+    print(f"base {base['meta'].get('sdk')}  ->  new {new['meta'].get('sdk')}  (threshold {threshold:.0%})")
+    for name in sorted(set(base["metrics"]) | set(new["metrics"])):
+        old, cur = base["metrics"].get(name), new["metrics"].get(name)
+        if old is None or cur is None:
+            print(f"  {name:<34} {'only in ' + ('new' if old is None else 'base'):>38}")
+            continue
+        if not old["value"] or old["value"] == float("inf"):
+            change = 0.0
+        else:
+            change = (cur["value"] - old["value"]) / old["value"]
+        better = change if cur["higher_is_better"] else -change
+        status = "ok"
+        if better < -threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif better > threshold:
+            status = "improved"
+        print(f"  {name:<34} {old['value']:12.2f} {cur['value']:12.2f} {cur['unit']:<9}"
+              f" {change:+7.1%}  {status}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run benchmarks and write JSON results")
+    run_p.add_argument("-o", "--output", help="results file (default: stdout)")
+    run_p.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    run_p.add_argument("--repeat", type=int, default=3)
+    cmp_p = sub.add_parser("compare", help="compare two results files")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.1,
+                       help="relative change counted as a regression (default 0.1)")
+    args = ap.parse_args()
+
+    if args.command == "run":
+        results = run(args.only or list(BENCHMARKS), max(1, args.repeat))
+        text = json.dumps(results, indent=2)
+        if args.output:
+            Path(args.output).write_text(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    regressions = compare(base, new, args.threshold)
+    if regressions:
+        print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
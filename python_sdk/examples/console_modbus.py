@@ -13,6 +13,7 @@ repo_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(repo_root))
 
 from jx1000.modbus import ModbusHelper
+from jx1000.registers import decode_registers
 
 def main():
     # Load config
@@ -56,10 +57,10 @@ def main():
         if err:
             print(err)
         else:
-            for entry in results:
+            voltages = decode_registers([v for entry in results for v in entry["values"]])
+            for entry, voltage in zip(results, voltages):
                 a, b = entry["mapped_registers"]
                 v1, v2 = entry["values"]
-                voltage = modbus.registers_to_float(v1, v2)
                 print(f"[{entry['input_target']}] > {a},{b} = {v1},{v2} | Voltage: {voltage}V")
 
     elif choice == "3":
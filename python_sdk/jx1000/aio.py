@@ -0,0 +1,360 @@
+import asyncio
+import struct
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import serial_asyncio
+
+from jx1000.frames import (EFRAME, FrameParser, build_frame, decode_dev_reply, decode_info,
+                           decode_log, decode_res)
+from jx1000.messages import DevReply, InfoReply, plain
+from jx1000.rule_cache import RuleImageCache
+from jx1000.transfer import DEFAULT_CHUNK, RuleTransfer
+
+
+class _EFrameProtocol(asyncio.Protocol):
+
+    def __init__(self, client: "AsyncJX1000"):
+        self.client = client
+
+    def connection_made(self, transport):
+        self.client._transport = transport
+        made = self.client._connection_made
+        if made is not None and not made.done():
+            made.set_result(True)
+
+    def data_received(self, data: bytes):
+        for cmd, payload in self.client._parser.feed(data):
+            self.client._handle_frame(cmd, payload)
+
+    def connection_lost(self, exc):
+        self.client._connection_lost(exc)
+
+
+class AsyncJX1000:
+    """
+    asyncio client for the JX1000 EFRAME protocol.
+
+    Runs entirely on the event loop: the port is an asyncio transport, replies
+    resolve asyncio futures and events are queued for `events()`. One loop can
+    drive many ports without any per-port threads. Frame building, parsing,
+    reply decoding and the RuleDown transfer are shared with JX1000Driver.
+    """
+
+    def __init__(self, port: Optional[str] = None, baud: int = 115200,
+                 max_in_flight: int = 16, event_queue_size: int = 1024):
+        self.port_name = port
+        self.baud = baud
+        self.max_in_flight = max_in_flight
+        self.on_event: Optional[Callable[[Union[int, str], object], None]] = None
+        self.device_info: Optional[InfoReply] = None
+        self.rule_cache = RuleImageCache()
+        self.last_transfer: Optional[RuleTransfer] = None
+
+        self._transport: Optional[asyncio.Transport] = None
+        self._connection_made: Optional[asyncio.Future] = None
+        self._parser = FrameParser()
+        # key -> (sequence number, future), oldest first; see _resolve_oldest.
+        self._pending: Dict[tuple, Deque[Tuple[int, asyncio.Future]]] = {}
+        self._seq = 0
+        self._event_queue_size = event_queue_size
+        self._events: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._info_waiters: List[asyncio.Future] = []
+        self._rule_acks: Optional[asyncio.Queue] = None
+
+    # -------------------------
+    # Port management
+    # -------------------------
+    def protocol_factory(self) -> asyncio.Protocol:
+        """Protocol for use with any asyncio transport (socket, pipe, PTY)."""
+        self._setup()
+        return _EFrameProtocol(self)
+
+    def _setup(self):
+        # Created here rather than in __init__ so they bind to the running loop.
+        if self._events is None:
+            self._events = asyncio.Queue(self._event_queue_size)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    async def connect(self, port: Optional[str] = None) -> bool:
+        if port:
+            self.port_name = port
+        if not self.port_name:
+            raise ValueError("Port name not specified")
+        if self.is_open():
+            return True
+        loop = asyncio.get_running_loop()
+        # The transport reports itself via connection_made on a later loop
+        # iteration; nothing may be sent before that.
+        self._connection_made = loop.create_future()
+        try:
+            await serial_asyncio.create_serial_connection(
+                loop, self.protocol_factory, self.port_name, baudrate=self.baud)
+            await asyncio.wait_for(self._connection_made, 5.0)
+        except Exception as e:
+            self._dispatch_event(EFRAME.RES, f"Failed to open port: {e}")
+            return False
+        finally:
+            self._connection_made = None
+        self._dispatch_event(EFRAME.RES, f"Port {self.port_name} opened")
+        self.request_info()
+        return True
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            # Let connection_lost run so waiters are failed before returning.
+            await asyncio.sleep(0)
+
+    def is_open(self) -> bool:
+        return self._transport is not None and not self._transport.is_closing()
+
+    def _connection_lost(self, exc):
+        self._transport = None
+        self.device_info = None
+        for entries in self._pending.values():
+            for _, fut in entries:
+                if not fut.done():
+                    fut.set_exception(ConnectionError("Port closed"))
+        self._pending.clear()
+        self._dispatch_event(EFRAME.RES, f"Port {self.port_name} closed")
+        if self._events is not None:
+            self._put_event(None)
+
+    # -------------------------
+    # Frame handling
+    # -------------------------
+    def send_frame(self, cmd: int, payload: bytes = b"") -> bool:
+        return self.send_raw(build_frame(cmd, payload))
+
+    def send_raw(self, frame) -> bool:
+        if not self.is_open():
+            self._dispatch_event(EFRAME.RES, "Port not open")
+            return False
+        # Transports may keep a reference to unsent data; hand over a copy.
+        self._transport.write(bytes(frame))
+        return True
+
+    def _handle_frame(self, cmd: int, data: bytes):
+        if cmd == EFRAME.DevRead or cmd == EFRAME.DevWrite:
+            reply = decode_dev_reply(data, cmd)
+            if reply is not None:
+                self._resolve((cmd, reply.com, reply.ch, reply.addr), reply)
+                self._dispatch_event(cmd, reply)
+            else:
+                if cmd == EFRAME.DevWrite:
+                    self._resolve_oldest(cmd, data)
+                self._dispatch_event(cmd, data)
+        elif cmd == EFRAME.Info:
+            info = decode_info(data)
+            if info is not None:
+                self.device_info = info
+                for fut in self._info_waiters:
+                    if not fut.done():
+                        fut.set_result(info)
+                self._info_waiters.clear()
+            self._dispatch_event(cmd, info if info is not None else data)
+        elif cmd == EFRAME.RuleDown:
+            if not data:
+                self._dispatch_event(cmd, "No ACK byte")
+            elif self._rule_acks is not None:
+                self._rule_acks.put_nowait((data[0] == 1, time.monotonic()))
+        elif cmd == EFRAME.RES:
+            value, is_result = decode_res(data)
+            if value is not None:
+                self._dispatch_event(cmd, value)
+        elif cmd == EFRAME.LOG:
+            self._dispatch_event(cmd, decode_log(data))
+        else:
+            self._dispatch_event(cmd, data)
+
+    def _resolve(self, key: tuple, reply):
+        entries = self._pending.get(key)
+        while entries:
+            _, fut = entries.popleft()
+            if not fut.done():
+                fut.set_result(reply)
+                break
+        if entries is not None and not entries:
+            del self._pending[key]
+
+    def _resolve_oldest(self, cmd: int, reply):
+        oldest_key = None
+        oldest_seq = None
+        for key, entries in self._pending.items():
+            if key[0] == cmd and entries and (oldest_seq is None or entries[0][0] < oldest_seq):
+                oldest_key, oldest_seq = key, entries[0][0]
+        if oldest_key is not None:
+            self._resolve(oldest_key, reply)
+
+    def _forget(self, key: tuple, entry: Tuple[int, asyncio.Future]):
+        entries = self._pending.get(key)
+        if entries is None:
+            return
+        if entry in entries:
+            entries.remove(entry)
+        if not entries:
+            del self._pending[key]
+
+    # -------------------------
+    # Commands
+    # -------------------------
+    async def _request(self, cmd: int, com: int, ch: int, addr: int, value: float,
+                       timeout: int):
+        key = (cmd, com & 0xFF, ch & 0xFF, addr & 0xFFFF)
+        self._setup()
+        async with self._slots:
+            fut = asyncio.get_running_loop().create_future()
+            self._seq += 1
+            entry = (self._seq, fut)
+            self._pending.setdefault(key, deque()).append(entry)
+            payload = struct.pack("<BBHf", key[1], key[2], key[3], value)
+            if not self.send_frame(cmd, payload):
+                self._forget(key, entry)
+                return None
+            try:
+                return await asyncio.wait_for(fut, timeout * 0.001)
+            except asyncio.TimeoutError:
+                name = "Read" if cmd == EFRAME.DevRead else "Write"
+                self._dispatch_event(EFRAME.RES, f"{name} timed out")
+            except ConnectionError:
+                pass
+            finally:
+                self._forget(key, entry)
+        return None
+
+    async def read(self, com: int, ch: int, addr: int, timeout: int = 300) -> Optional[float]:
+        """As JX1000Driver.read: None on timeout or when the device rejects the read."""
+        reply = await self._request(EFRAME.DevRead, com, ch, addr, 0.0, timeout)
+        if reply is None or (isinstance(reply, DevReply) and reply.result != 0):
+            return None
+        return float(reply.value)
+
+    async def write(self, com: int, ch: int, addr: int, value: float, timeout: int = 300) -> bool:
+        reply = await self._request(EFRAME.DevWrite, com, ch, addr, float(value), timeout)
+        return reply is not None and not (isinstance(reply, DevReply) and reply.result != 0)
+
+    async def read_many(self, requests: Iterable[Tuple[int, int, int]],
+                        timeout: int = 300) -> List[Optional[float]]:
+        """Concurrent reads, bounded by max_in_flight, returned in request order."""
+        return list(await asyncio.gather(*(self.read(com, ch, addr, timeout)
+                                           for com, ch, addr in requests)))
+
+    def request_info(self) -> bool:
+        return self.send_frame(EFRAME.Info, b"\x00\x00")
+
+    async def get_info(self, timeout: int = 3000) -> Optional[InfoReply]:
+        fut = asyncio.get_running_loop().create_future()
+        self._info_waiters.append(fut)
+        if not self.request_info():
+            self._info_waiters.remove(fut)
+            return None
+        try:
+            return await asyncio.wait_for(fut, timeout * 0.001)
+        except asyncio.TimeoutError:
+            return None
+
+    async def start_test(self) -> bool:
+        return self.send_frame(EFRAME.LOG, b'cmd_EnableExec()\r\n')
+
+    async def stop_test(self) -> bool:
+        return self.send_frame(EFRAME.LOG, b'cmd_ExitExec()\r\n')
+
+    async def download_rules(self, buf, window: int = 1, chunk_size: int = DEFAULT_CHUNK,
+                             adaptive: bool = False, ack_timeout: float = 2.0, retries: int = 3,
+                             delta: bool = False, unit_id: Optional[str] = None) -> bool:
+        """Same transfer as JX1000Driver.download_rules, awaited instead of threaded."""
+        if not self.is_open():
+            self._dispatch_event(EFRAME.RuleDown, "Port not open")
+            return False
+        if not buf or len(buf) < 10:
+            self._dispatch_event(EFRAME.RuleDown, "Invalid rules buffer")
+            return False
+        if self._rule_acks is not None:
+            self._dispatch_event(EFRAME.RuleDown, "Download in progress")
+            return False
+        try:
+            transfer = RuleTransfer(self, buf, window=window, chunk_size=chunk_size,
+                                    adaptive=adaptive, ack_timeout=ack_timeout, retries=retries)
+        except ValueError as e:
+            self._dispatch_event(EFRAME.RuleDown, str(e))
+            return False
+
+        self._rule_acks = asyncio.Queue()
+        try:
+            key = None
+            if delta and not unit_id:
+                self._dispatch_event(EFRAME.RuleDown, "delta: no unit id, sending the whole image")
+            elif delta:
+                # Only a reply to this request counts; see JX1000Driver.download_rules.
+                info = await self.get_info()
+                if info is None:
+                    self._dispatch_event(EFRAME.RuleDown, "delta: no Info reply, sending the whole image")
+                else:
+                    key = self.rule_cache.key(unit_id, info)
+            if key is not None:
+                ranges = self.rule_cache.delta_ranges(key, buf)
+                if ranges is not None:
+                    transfer.ranges = ranges
+                    sent = sum(end - start for start, end in ranges)
+                    self._dispatch_event(EFRAME.RuleDown, f"delta: {sent} of {len(buf)} bytes changed")
+                self.rule_cache.invalidate(key)
+            ok = await self._run_transfer(transfer)
+            if ok and key is not None:
+                self.rule_cache.store(key, buf)
+            return ok
+        finally:
+            transfer.release()
+            self.last_transfer = transfer
+            self._rule_acks = None
+
+    async def _run_transfer(self, transfer: RuleTransfer) -> bool:
+        acks = self._rule_acks
+        steps = transfer.steps()
+        try:
+            deadline, settle = next(steps)
+            while True:
+                remaining = max(0.0, deadline - time.monotonic())
+                ack = None
+                if settle:
+                    await asyncio.sleep(remaining)
+                    while not acks.empty():
+                        acks.get_nowait()
+                else:
+                    try:
+                        ack = await asyncio.wait_for(acks.get(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                deadline, settle = steps.send(ack)
+        except StopIteration as stop:
+            return stop.value
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def _dispatch_event(self, cmd: Union[int, str], value):
+        value = plain(value)
+        if callable(self.on_event):
+            try:
+                self.on_event(cmd, value)
+            except Exception:
+                pass
+        if self._events is not None:
+            self._put_event((cmd, value))
+
+    def _put_event(self, item):
+        # Never block the protocol: when nobody is consuming, drop the oldest.
+        if self._events.full():
+            self._events.get_nowait()
+        self._events.put_nowait(item)
+
+    async def events(self) -> AsyncIterator[Tuple[Union[int, str], object]]:
+        """Yield (code, value) events until the port is closed."""
+        self._setup()
+        while True:
+            item = await self._events.get()
+            if item is None:
+                return
+            yield item
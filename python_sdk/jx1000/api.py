@@ -1,5 +1,10 @@
 from typing import Optional, Callable
+from jx1000.cache import ReadCache
+from jx1000.discovery import discover_jx1000
 from jx1000.driver import JX1000Driver, EFRAME
+from jx1000.events import EventBus
+from jx1000.poller import JX1000Poller
+from jx1000.sampler import Sampler
 
 
 class JX1000:
@@ -8,15 +13,25 @@ class JX1000:
     """
 
     def __init__(self, port: Optional[str] = None, baud: int = 115200,
-                 event_mode: str = "pretty", print_events: bool = True):
+                 event_mode: str = "pretty", print_events: bool = True,
+                 event_bus: Optional[EventBus] = None, cache_ttl: Optional[float] = None,
+                 cache_size: int = 4096):
 
         self.driver = JX1000Driver(port=port, baud=baud,
                                    event_mode=event_mode,
-                                   print_events=print_events)
-        
+                                   print_events=print_events,
+                                   event_bus=event_bus)
+        # Subscribe here for filtered or batched delivery (see EventBus).
+        self.events = self.driver.events
+
         self.on_event: Optional[Callable[[str, object], None]] = None
         self.driver.on_event = self._handle_driver_event
 
+        # Optional read cache; see enable_cache().
+        self.cache: Optional[ReadCache] = None
+        if cache_ttl is not None:
+            self.enable_cache(cache_ttl, cache_size)
+
     # ------------------------------------------------------------------
     # High-level event dispatch
     # ------------------------------------------------------------------
@@ -39,6 +54,18 @@ class JX1000:
             self.driver.port_name = port
         return self.driver.open_port()
 
+    def auto_connect(self, timeout: float = 1.0) -> bool:
+        """
+        Find a JX1000 by probing every serial port with an Info request in
+        parallel (the port found last time first) and connect to it.
+        """
+        found = discover_jx1000(self.driver.baud, want=1, timeout=timeout)
+        if not found:
+            if self.on_event:
+                self.on_event(EFRAME.RES, "No JX1000 found")
+            return False
+        return self.connect(found[0][0])
+
     def disconnect(self):
         self.driver.close_port()
 
@@ -50,20 +77,81 @@ class JX1000:
     # ------------------------------------------------------------------
     def read_memory(self, com: int, ch: int, addr: int):
         """
-        Read a float value from device memory.
+        Read a float value from device memory; None on timeout or when the
+        device rejects the read. With the cache enabled the value may come
+        from it.
         """
+        if self.cache is not None:
+            return self.cache.read(com, ch, addr)
         return self.driver.read(com, ch, addr)
 
     def write_memory(self, com: int, ch: int, addr: int, value: float):
         """
-        Write a float value to device memory.
+        Write a float value to device memory; False on timeout or when the
+        device rejects the write.
         """
+        if self.cache is not None:
+            return self.cache.write(com, ch, addr, value)
         return self.driver.write(com, ch, addr, value)
 
+    def read_many(self, requests, as_array: bool = False):
+        """
+        Read many (com, ch, addr) points in one pipelined batch.
+        See JX1000Driver.read_many for the return shapes. Array reads
+        always go to the device, since they report per-point status.
+        """
+        if self.cache is not None and not as_array:
+            return self.cache.read_many(requests)
+        return self.driver.read_many(requests, as_array=as_array)
+
+    def write_many(self, requests, as_array: bool = False):
+        """
+        Write many (com, ch, addr, value) points in one pipelined batch.
+        """
+        if self.cache is None:
+            return self.driver.write_many(requests, as_array=as_array)
+        if not as_array:
+            return self.cache.write_many(requests)
+        requests = list(requests)
+        result = self.driver.write_many(requests, as_array=True)
+        self.cache.discard((com, ch, addr) for com, ch, addr, _ in requests)
+        return result
+
+    # ------------------------------------------------------------------
+    # Read cache
+    # ------------------------------------------------------------------
+    def enable_cache(self, ttl: float = 1.0, max_entries: int = 4096) -> ReadCache:
+        """
+        Serve memory reads younger than `ttl` seconds from a cache of at
+        most `max_entries` addresses; writes pass through. Per-address TTLs
+        are set with cache.set_ttl(). See ReadCache.
+        """
+        self.disable_cache()
+        self.cache = ReadCache(self.driver, ttl, max_entries)
+        return self.cache
+
+    def disable_cache(self):
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def invalidate_cache(self, com: Optional[int] = None, ch: Optional[int] = None,
+                         addr: Optional[int] = None):
+        """Drop cached values (all, or those matching com / ch / addr)."""
+        if self.cache is not None:
+            self.cache.invalidate(com, ch, addr)
+
     # ------------------------------------------------------------------
     # Rule download
     # ------------------------------------------------------------------
-    def download_rules_from_file(self, path: str):
+    def download_rules_from_file(self, path: str, window: int = 1, adaptive: bool = False,
+                                 delta: bool = False, unit_id: Optional[str] = None):
+        """
+        Download a .jx1000 rule file. The defaults are the original
+        stop-and-wait transfer; pass e.g. window=4, adaptive=True to pipeline
+        chunks to firmware that accepts it. delta=False always sends the
+        whole image.
+        """
         try:
             with open(path, "rb") as f:
                 data = f.read()
@@ -71,7 +159,30 @@ class JX1000:
             if self.on_event:
                 self.on_event("RuleLoadError", f"Failed to read file: {e}")
             return
-        self.driver.download_rules(data)
+        self.driver.download_rules(data, window=window, adaptive=adaptive, delta=delta,
+                                   unit_id=unit_id)
+
+    # ------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------
+    def stats(self) -> dict:
+        """Driver counters, latency histograms and queue depths (see JX1000Driver.stats_snapshot)."""
+        return self.driver.stats_snapshot()
+
+    def sampler(self, points, rate: float, capacity: int = 1 << 16, start: bool = True) -> Sampler:
+        """
+        Poll (com, ch, addr) points `rate` times per second into a NumPy ring.
+        See Sampler for reading the samples and its rate statistics.
+        """
+        sampler = Sampler(self.driver, points, rate, capacity)
+        return sampler.start() if start else sampler
+
+    def poller(self, max_batch: int = 64) -> JX1000Poller:
+        """
+        Scheduler for points with their own periods and priorities; changed
+        values arrive as "PointChanged" events. Add points, then start().
+        """
+        return JX1000Poller(self.driver, max_batch)
 
     # ------------------------------------------------------------------
     # Test control
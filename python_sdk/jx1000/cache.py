@@ -0,0 +1,219 @@
+"""
+TTL read cache for device memory, with request coalescing and write-through.
+
+ReadCache sits in front of a JX1000Driver. A read of a (com, ch, addr)
+key younger than its TTL is answered from memory; a read of a key that
+is already being fetched waits for that request instead of sending its
+own, so N concurrent readers cost one round trip. Misses of a batch go
+out as one pipelined read_many.
+
+Writes go to the device first; the value the device echoes replaces the
+cached one only when it reports success (result 0). A fetch that was in flight when its key was written or
+invalidated does not overwrite the newer entry. The cache holds at most
+`max_entries` keys and evicts the least recently used. Everything is
+invalidated when a rule download ends, whether it succeeded or not,
+since new rules can change any address.
+
+    cache = ReadCache(drv, ttl=0.5)
+    cache.set_ttl((1, 1, 100), 0.05)      # a fast-moving point
+    value = cache.read(1, 1, 100)
+    cache.write(1, 2, 10, 3.5)
+    print(cache.stats())
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[int, int, int]
+
+
+class ReadCache:
+
+    def __init__(self, driver, ttl: float = 1.0, max_entries: int = 4096, timeout: int = 300):
+        if ttl < 0:
+            raise ValueError("ttl must not be negative")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.driver = driver
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.ttls: Dict[Key, float] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self._entries: "OrderedDict[Key, Tuple[float, float]]" = OrderedDict()  # key -> (value, expires)
+        self._pending: Dict[Key, Future] = {}
+        self._lock = threading.Lock()
+        driver.on_transfer_done = self._on_transfer_done
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        if self.driver.on_transfer_done == self._on_transfer_done:
+            self.driver.on_transfer_done = None
+
+    @staticmethod
+    def _key(com: int, ch: int, addr: int) -> Key:
+        return com & 0xFF, ch & 0xFF, addr & 0xFFFF
+
+    # -------------------------
+    # Configuration
+    # -------------------------
+    def set_ttl(self, key: Key, ttl: Optional[float]):
+        """TTL for one (com, ch, addr); 0 never caches it, None restores the default."""
+        key = self._key(*key)
+        if ttl is None:
+            self.ttls.pop(key, None)
+        elif ttl < 0:
+            raise ValueError("ttl must not be negative")
+        else:
+            self.ttls[key] = ttl
+
+    def invalidate(self, com: Optional[int] = None, ch: Optional[int] = None,
+                   addr: Optional[int] = None):
+        """Drop cached values: all of them, or those matching the given com / ch / addr."""
+        with self._lock:
+            self.invalidations += 1
+            if com is None and ch is None and addr is None:
+                self._entries.clear()
+                self._pending.clear()
+                return
+            for table in (self._entries, self._pending):
+                for key in [k for k in table
+                            if (com is None or k[0] == com & 0xFF) and (ch is None or k[1] == ch & 0xFF)
+                            and (addr is None or k[2] == addr & 0xFFFF)]:
+                    del table[key]
+
+    def discard(self, keys: Iterable[Tuple[int, int, int]]):
+        """Drop the given (com, ch, addr) keys, e.g. after writing them around the cache."""
+        with self._lock:
+            for key in keys:
+                key = self._key(*key)
+                self._entries.pop(key, None)
+                self._pending.pop(key, None)
+
+    def _on_transfer_done(self, ok: bool):
+        # Called by the driver's download thread once the transfer has ended.
+        self.invalidate()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def read(self, com: int, ch: int, addr: int) -> Optional[float]:
+        return self.read_many([(com, ch, addr)])[0]
+
+    def read_many(self, requests: Iterable[Tuple[int, int, int]]) -> List[Optional[float]]:
+        """Values in request order, None where the device did not answer or reported an error."""
+        keys = [self._key(*r) for r in requests]
+        results: List[Optional[float]] = [None] * len(keys)
+        waits: List[Tuple[int, Future]] = []
+        fetch: Dict[Key, Future] = {}
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[1] > now:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        results[i] = entry[0]
+                        continue
+                    del self._entries[key]
+                fut = self._pending.get(key)
+                if fut is not None:
+                    if key not in fetch:
+                        self.coalesced += 1
+                else:
+                    fut = self._pending[key] = fetch[key] = Future()
+                    self.misses += 1
+                waits.append((i, fut))
+
+        if fetch:
+            self._fetch(fetch)
+        for i, fut in waits:
+            # Our own fetches are resolved by now; others' end within their timeout.
+            results[i] = fut.result()
+        return results
+
+    def _fetch(self, fetch: Dict[Key, Future]):
+        keys = list(fetch)
+        try:
+            array, status = self.driver.read_many(keys, self.timeout, as_array=True)
+            values = [float(v) if st == 0 else None for v, st in zip(array, status)]
+        except Exception:
+            values = [None] * len(keys)
+        now = time.monotonic()
+        with self._lock:
+            for key, value in zip(keys, values):
+                fut = fetch[key]
+                # A write or invalidate() while this was in flight supersedes it.
+                if self._pending.get(key) is fut:
+                    del self._pending[key]
+                    if value is not None:
+                        self._store(key, value, now)
+        for key, value in zip(keys, values):
+            fetch[key].set_result(value)
+
+    def _store(self, key: Key, value: float, now: float):
+        ttl = self.ttls.get(key, self.ttl)
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (value, now + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def write(self, com: int, ch: int, addr: int, value: float) -> bool:
+        return self.write_many([(com, ch, addr, value)])[0]
+
+    def write_many(self, requests: Iterable[Tuple[int, int, int, float]]) -> List[bool]:
+        """
+        Write through to the device. Returns True per write the device
+        accepted (result 0); the value it echoes replaces the cached one.
+        """
+        items = [self._key(com, ch, addr) + (float(value),) for com, ch, addr, value in requests]
+        echoed, status = self.driver.write_many(items, self.timeout, as_array=True)
+        now = time.monotonic()
+        oks = []
+        with self._lock:
+            for item, value, st in zip(items, echoed, status):
+                key = item[:3]
+                self._pending.pop(key, None)
+                oks.append(bool(st == 0))
+                if st == 0 and value == value:
+                    self._store(key, float(value), now)
+                else:
+                    # Rejected, unanswered, or a short ack without an echo.
+                    self._entries.pop(key, None)
+        return oks
+
+    # -------------------------
+    # Statistics
+    # -------------------------
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,49 @@
+"""
+Table-driven CRC-16 routines shared by the Modbus RTU code and the rule
+table compiler.
+
+Both CRCs are reflected 16-bit CRCs, so one table lookup per byte
+replaces the 8-iteration bit loop:
+
+    CRC-16/MODBUS   poly 0xA001, init 0xFFFF   (RTU frames, sent LE)
+    CRC-16/KERMIT   poly 0x8408, init 0x0000   (.jx1000 rule records)
+"""
+
+from typing import List
+
+
+def _reflected_table(poly: int) -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ poly if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+MODBUS_TABLE = _reflected_table(0xA001)
+KERMIT_TABLE = _reflected_table(0x8408)
+
+
+def crc16_modbus(data, crc: int = 0xFFFF) -> int:
+    """
+    Modbus RTU CRC-16 of `data`. Pass a previous result as `crc` to
+    continue over data received in pieces.
+    """
+    table = MODBUS_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
+
+
+def crc16_modbus_bytes(data) -> bytes:
+    """CRC-16/MODBUS in wire order (low byte first), ready to append to a frame."""
+    return crc16_modbus(data).to_bytes(2, "little")
+
+
+def crc16_kermit(data, crc: int = 0x0000) -> int:
+    table = KERMIT_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
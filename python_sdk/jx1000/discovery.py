@@ -0,0 +1,166 @@
+"""
+Parallel serial port discovery.
+
+Every candidate port is probed at once on a thread pool, ports that
+answered last time are tried before the rest, and discovery returns as
+soon as the requested number of devices has answered. Late answers are
+released (closed) in the background.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import serial
+from serial.tools import list_ports
+
+from jx1000.frames import EFRAME, FrameParser, build_frame, decode_info
+from jx1000.messages import InfoReply
+
+
+class PortCache:
+    """Small JSON file mapping a device kind to the ports it was last found on."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else Path.home() / ".jx1000" / "ports.json"
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, List[str]]:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str) -> List[str]:
+        ports = self._load().get(key, [])
+        return [p for p in ports if isinstance(p, str)]
+
+    def put(self, key: str, ports: Iterable[str]):
+        with self._lock:
+            data = self._load()
+            data[key] = list(ports)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(data))
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+def candidate_ports(match: Optional[Callable[[Any], bool]] = None) -> List[str]:
+    """Device names of the system's serial ports, optionally filtered on the ListPortInfo."""
+    return [p.device for p in list_ports.comports() if match is None or match(p)]
+
+
+def discover(probe: Callable[[str], Any], want: Optional[int] = 1,
+             ports: Optional[Iterable[str]] = None, cache_key: Optional[str] = None,
+             cache: Optional[PortCache] = None, release: Optional[Callable[[Any], None]] = None,
+             max_workers: int = 16) -> List[Tuple[str, Any]]:
+    """
+    Probe ports in parallel and return [(port, result), ...] in answer order.
+
+    `probe(port)` returns a truthy result (e.g. an open client) when a
+    device answered and a falsy one or raises otherwise. Ports cached
+    under `cache_key` are probed first; the rest only if they did not
+    yield `want` devices (want=None finds all). Results that arrive after
+    discovery returned are passed to `release`.
+    """
+    ports = candidate_ports() if ports is None else list(ports)
+    if cache_key is not None and cache is None:
+        cache = PortCache()
+    cached = [p for p in cache.get(cache_key) if p in ports] if cache_key is not None else []
+    rest = [p for p in ports if p not in cached]
+
+    found: List[Tuple[str, Any]] = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def run(port: str):
+        if done.is_set():
+            return
+        try:
+            result = probe(port)
+        except Exception:
+            result = None
+        if not result:
+            return
+        with lock:
+            if not done.is_set():
+                found.append((port, result))
+                if want is not None and len(found) >= want:
+                    done.set()
+                return
+        if release is not None:
+            try:
+                release(result)
+            except Exception:
+                pass
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ports) or 1)),
+                              thread_name_prefix="jx1000-discover")
+    submitted = []
+    try:
+        # Finding every device gains nothing from probing the cached ports first.
+        groups = (cached, rest) if want is not None else (cached + rest,)
+        for group in groups:
+            pending = {pool.submit(run, port) for port in group}
+            submitted.extend(pending)
+            while pending and not done.is_set():
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if done.is_set():
+                break
+        with lock:
+            done.set()
+            result = list(found)
+    finally:
+        # Probes not started yet are dropped; those running finish in the
+        # background and their results are released.
+        for fut in submitted:
+            fut.cancel()
+        pool.shutdown(wait=False)
+
+    if cache_key is not None and result:
+        answered = [port for port, _ in result]
+        cache.put(cache_key, answered + [p for p in cache.get(cache_key) if p not in answered][:16])
+    return result
+
+
+# -------------------------
+# JX1000 native probe
+# -------------------------
+def probe_jx1000(port: str, baud: int = 115200, timeout: float = 1.0) -> Optional[InfoReply]:
+    """Send an Info request on `port` and return the decoded reply, or None."""
+    try:
+        s = serial.Serial(port, baud, timeout=0.05)
+    except Exception:
+        return None
+    try:
+        s.reset_input_buffer()
+        s.write(build_frame(EFRAME.Info, b"\x00\x00"))
+        parser = FrameParser()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for cmd, data in parser.feed(s.read(s.in_waiting or 1)):
+                if cmd == EFRAME.Info:
+                    info = decode_info(data)
+                    if info is not None:
+                        return info
+        return None
+    except Exception:
+        return None
+    finally:
+        s.close()
+
+
+def discover_jx1000(baud: int = 115200, want: Optional[int] = 1, timeout: float = 1.0,
+                    ports: Optional[Iterable[str]] = None,
+                    cache: Optional[PortCache] = None) -> List[Tuple[str, InfoReply]]:
+    """Ports with a JX1000 answering the Info frame, as [(port, info), ...]."""
+    return discover(lambda port: probe_jx1000(port, baud, timeout), want=want, ports=ports,
+                    cache_key=f"jx1000-{baud}", cache=cache)
@@ -2,27 +2,19 @@ import serial
 import struct
 import threading
 import time
-from typing import Optional, Callable, Union
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Iterable, List, Optional, Callable, Tuple, Union
 
-FRAME_H = 0xA5
-FRAME_L = 0x5E
+import numpy as np
 
-class EFRAME:
-    Info = 0x01
-    RuleDown = 0x02
-    DevRead = 0x21
-    DevWrite = 0x22
-    RES = 0xFE
-    LOG = 0xFF
-
-EFRAME_NAMES = {
-    EFRAME.Info:      "INFO",
-    EFRAME.RuleDown:  "RULE",
-    EFRAME.DevRead:   "READ",
-    EFRAME.DevWrite:  "WRITE",
-    EFRAME.RES:       "RES",
-    EFRAME.LOG:       "LOG",
-}
+from jx1000.frames import (EFRAME, EFRAME_NAMES, FRAME_H, FRAME_L, FrameParser, build_frame, checksum,
+                           decode_dev_reply, decode_info, decode_log, decode_res)
+from jx1000.events import EventBus
+from jx1000.messages import DevReply, InfoReply
+from jx1000.mux import RequestMux
+from jx1000.rule_cache import RuleImageCache
+from jx1000.stats import DriverStats, StatsDumper
+from jx1000.transfer import DEFAULT_CHUNK, RuleTransfer
 
 
 class JX1000Driver:
@@ -32,23 +24,40 @@ class JX1000Driver:
     """
 
     def __init__(self, port: Optional[str] = None, baud: int = 115200,
-                 event_mode: str = "pretty", print_events: bool = True):
+                 event_mode: str = "pretty", print_events: bool = True,
+                 max_in_flight: int = 16, event_bus: Optional[EventBus] = None):
         self.port_name = port
         self.baud = baud
         self.s: Optional[serial.Serial] = None
-        self.buffer = bytearray()
+        self._parser = FrameParser()
         self._running = False
         self._reader_thread: Optional[threading.Thread] = None
-        self._last_read: Optional[float] = None
-        self._write_ack: Optional[bool] = None
-        self._rule_ack: Optional[bool] = None
+        self._write_lock = threading.Lock()
+        self._mux = RequestMux(max_in_flight)
+        self._transfer: Optional[RuleTransfer] = None
+        self.last_transfer: Optional[RuleTransfer] = None
+        self.rule_cache = RuleImageCache()
+        self.device_info: Optional[InfoReply] = None
+        self._info_event = threading.Event()
+        self._info_sent_at: Optional[float] = None
+        # Called with the outcome on the download thread once a rule transfer ends.
+        self.on_transfer_done: Optional[Callable[[bool], None]] = None
+
+        # Instrumentation, cheap enough to stay on; see stats_snapshot().
+        self.stats = DriverStats()
+        self._mux.on_reply = self._on_reply
+        self._stats_dumper: Optional[StatsDumper] = None
 
         # Event system
         self.event_mode = event_mode  # "pretty" or "raw"
         self.print_events = print_events
         self.on_event: Optional[Callable[[Union[int, str], object], None]] = None
-        self._event_queue = []
         self._print_lock = threading.Lock()
+        # Printing and on_event run on the bus's dispatcher thread, never the reader.
+        # The driver's own bus blocks the reader when full, so on_event sees every event.
+        self._owns_events = event_bus is None
+        self.events = event_bus if event_bus is not None else EventBus(policy="block")
+        self.events.subscribe(self._deliver_event, source=self)
 
     # -------------------------
     # Port management
@@ -60,11 +69,20 @@ class JX1000Driver:
             self._dispatch_event(EFRAME.RES, f"Port {self.port_name} already open")
             return True
         try:
-            self.s = serial.Serial(self.port_name, self.baud, timeout=0.05)
+            s = serial.Serial(self.port_name, self.baud, timeout=0.05)
         except Exception as e:
             self._dispatch_event(EFRAME.RES, f"Failed to open port: {e}")
             return False
-
+        return self.open_serial(s)
+
+    def open_serial(self, s) -> bool:
+        """
+        Start the driver on an already open port: a serial.Serial, a
+        serial_for_url() object or anything with the same read/write API
+        (e.g. jx1000.sim.simulator.FakeSerial).
+        """
+        self.s = s
+        self.device_info = None
         self._running = True
         self._reader_thread = threading.Thread(target=self._reader, daemon=True)
         self._reader_thread.start()
@@ -74,6 +92,7 @@ class JX1000Driver:
 
     def close_port(self):
         self._running = False
+        self._mux.fail_all(ConnectionError("Port closed"))
         if self.s and getattr(self.s, "is_open", False):
             try:
                 self.s.close()
@@ -81,6 +100,10 @@ class JX1000Driver:
                 pass
             self._dispatch_event(EFRAME.RES, f"Port {self.port_name} closed")
         self.s = None
+        self.device_info = None
+        if self._owns_events:
+            # Delivers the close event, then lets the dispatcher thread go.
+            self.events.close()
 
     def is_open(self) -> bool:
         return self.s is not None and getattr(self.s, "is_open", False)
@@ -89,110 +112,280 @@ class JX1000Driver:
     # Frame handling
     # -------------------------
     def checksum(self, data: bytes) -> int:
-        return sum(data) & 0xFF
+        return checksum(data)
 
     def send_frame(self, cmd: int, payload: bytes = b"") -> bool:
+        return self.send_raw(build_frame(cmd, payload))
+
+    def send_raw(self, frame) -> bool:
+        """Write an already assembled frame (bytes, bytearray or memoryview)."""
         if not self.is_open():
             self._dispatch_event(EFRAME.RES, "Port not open")
             return False
-        frame = bytearray([FRAME_H, FRAME_L, len(payload), cmd]) + payload
-        frame.append(self.checksum(frame))
         try:
-            self.s.write(frame)
+            with self._write_lock:
+                self.s.write(frame)
+                self.stats.bytes_out += len(frame)
             return True
         except Exception as e:
+            self.stats.send_failed()
             self._dispatch_event(EFRAME.RES, f"Serial write error: {e}")
             return False
 
     # -------------------------
     # High-level commands
     # -------------------------
+    def submit_read(self, com: int, ch: int, addr: int, timeout: int = 300) -> Future:
+        """
+        Send a DevRead without waiting for the reply.
+        The returned Future resolves to a DevReadReply (com, ch, result, addr, value).
+        """
+        return self._submit(EFRAME.DevRead, com, ch, addr, 0.0, timeout)
+
+    def submit_write(self, com: int, ch: int, addr: int, value: float, timeout: int = 300) -> Future:
+        """
+        Send a DevWrite without waiting for the acknowledgement.
+        The returned Future resolves to a DevWriteReply, or raw data for short replies.
+        """
+        return self._submit(EFRAME.DevWrite, com, ch, addr, float(value), timeout)
+
+    def _submit(self, cmd: int, com: int, ch: int, addr: int, value: float, timeout: int) -> Future:
+        key = (cmd, com & 0xFF, ch & 0xFF, addr & 0xFFFF)
+        # Register before sending so a fast reply can never beat its request.
+        fut = self._mux.register(key, timeout * 0.001)
+        if fut is None:
+            fut = Future()
+            fut.set_exception(FutureTimeoutError())
+            return fut
+        payload = struct.pack("<BBHf", com & 0xFF, ch & 0xFF, addr & 0xFFFF, value)
+        if not self.send_frame(cmd, payload):
+            self._mux.discard(key, fut)
+            fut.set_exception(ConnectionError("Send failed"))
+        return fut
+
+    def _wait(self, cmd: int, com: int, ch: int, addr: int, fut: Future, timeout: int):
+        try:
+            return fut.result(timeout * 0.001)
+        except FutureTimeoutError:
+            self._mux.discard((cmd, com & 0xFF, ch & 0xFF, addr & 0xFFFF), fut)
+            fut.cancel()
+            self.stats.timed_out()
+            name = "Read" if cmd == EFRAME.DevRead else "Write"
+            self._dispatch_event(EFRAME.RES, f"{name} timed out")
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def _rejected(reply) -> bool:
+        """True for a reply whose result byte is nonzero (short replies carry none)."""
+        return isinstance(reply, DevReply) and reply.result != 0
+
     def read(self, com: int, ch: int, addr: int, timeout: int = 300) -> Optional[float]:
-        self._last_read = None
-        payload = struct.pack("<BBHf", com & 0xFF, ch & 0xFF, addr & 0xFFFF, 0.0)
-        if not self.send_frame(EFRAME.DevRead, payload):
+        """Read a float; None on timeout or when the device rejects the read."""
+        fut = self.submit_read(com, ch, addr, timeout)
+        reply = self._wait(EFRAME.DevRead, com, ch, addr, fut, timeout)
+        if reply is None or self._rejected(reply):
             return None
-
-        start_time = time.time()
-        while time.time() - start_time < timeout * 0.001:
-            if self._last_read is not None:
-                val = self._last_read
-                self._last_read = None
-                return val
-            time.sleep(0.001)
-        self._dispatch_event(EFRAME.RES, "Read timed out")
-        return None
+        return float(reply.value)
 
     def write(self, com: int, ch: int, addr: int, value: float, timeout: int = 300) -> bool:
-        self._write_ack = None
-        payload = struct.pack("<BBHf", com & 0xFF, ch & 0xFF, addr & 0xFFFF, float(value))
-        if not self.send_frame(EFRAME.DevWrite, payload):
-            return False
+        """Write a float; False on timeout or when the device rejects the write."""
+        fut = self.submit_write(com, ch, addr, value, timeout)
+        reply = self._wait(EFRAME.DevWrite, com, ch, addr, fut, timeout)
+        return reply is not None and not self._rejected(reply)
 
-        start_time = time.time()
-        while time.time() - start_time < timeout * 0.001:
-            if self._write_ack is not None:
-                ack = self._write_ack
-                self._write_ack = None
-                return ack
-            time.sleep(0.001)
-        self._dispatch_event(EFRAME.RES, "Write timed out")
-        return False
+    # -------------------------
+    # Batched commands
+    # -------------------------
+    def read_many(self, requests: Iterable[Tuple[int, int, int]], timeout: int = 300,
+                  as_array: bool = False):
+        """
+        Read many (com, ch, addr) points with their DevRead frames pipelined.
+
+        Returns a list of floats in request order, None where a read timed
+        out or the device rejected it. With as_array=True it returns a float32
+        value array (NaN on failure) and an int16 status array: the device
+        result byte, -3 timeout, -2 send error.
+        """
+        items = [(com, ch, addr, 0.0) for com, ch, addr in requests]
+        replies, status = self._transact_many(EFRAME.DevRead, items, timeout)
+        if as_array:
+            return self._to_arrays(replies, status)
+        return [None if r is None or self._rejected(r) else float(r.value) for r in replies]
+
+    def write_many(self, requests: Iterable[Tuple[int, int, int, float]], timeout: int = 300,
+                   as_array: bool = False):
+        """
+        Write many (com, ch, addr, value) points with their DevWrite frames pipelined.
+
+        Returns a list of bools in request order, False where a write timed
+        out or the device rejected it, or with as_array=True the echoed
+        float32 values and the int16 status array as in read_many.
+        """
+        items = [(com, ch, addr, float(value)) for com, ch, addr, value in requests]
+        replies, status = self._transact_many(EFRAME.DevWrite, items, timeout)
+        if as_array:
+            return self._to_arrays(replies, status)
+        return [r is not None and not self._rejected(r) for r in replies]
+
+    def submit_read_many(self, requests: Iterable[Tuple[int, int, int]],
+                         timeout: int = 300) -> List[Future]:
+        """
+        Send DevReads for many (com, ch, addr) points, pipelined as in
+        read_many, without waiting. Returns one Future per point, as submit_read.
+        """
+        items = [(com, ch, addr, 0.0) for com, ch, addr in requests]
+        return self._submit_many(EFRAME.DevRead, items, timeout)[1]
+
+    def _submit_many(self, cmd: int, items: List[Tuple[int, int, int, float]], timeout: int):
+        keys = [(cmd, com & 0xFF, ch & 0xFF, addr & 0xFFFF) for com, ch, addr, _ in items]
+        futures: List[Future] = []
+        batch = bytearray()
+        unsent: List[Tuple[tuple, Future]] = []
+
+        def flush():
+            if batch and not self.send_raw(batch):
+                for key, fut in unsent:
+                    self._mux.discard(key, fut)
+                    fut.set_exception(ConnectionError("Send failed"))
+            batch.clear()
+            unsent.clear()
+
+        # Frames are packed into one write until the in-flight window is full;
+        # then the batch goes out so replies can free slots for the rest.
+        for key, (_, _, _, value) in zip(keys, items):
+            fut = self._mux.register(key, timeout * 0.001, block=False)
+            if fut is None:
+                flush()
+                fut = self._mux.register(key, timeout * 0.001)
+                if fut is None:
+                    fut = Future()
+                    fut.set_exception(FutureTimeoutError())
+                    futures.append(fut)
+                    continue
+            batch += build_frame(cmd, struct.pack("<BBHf", key[1], key[2], key[3], value))
+            unsent.append((key, fut))
+            futures.append(fut)
+        flush()
+        return keys, futures
+
+    def _transact_many(self, cmd: int, items: List[Tuple[int, int, int, float]], timeout: int):
+        keys, futures = self._submit_many(cmd, items, timeout)
+        replies = []
+        status = []
+        timed_out = 0
+        for key, fut in zip(keys, futures):
+            try:
+                reply = fut.result(timeout * 0.001)
+                replies.append(reply)
+                status.append(reply.result if isinstance(reply, DevReply) else 0)
+                continue
+            except FutureTimeoutError:
+                self._mux.discard(key, fut)
+                fut.cancel()
+                timed_out += 1
+                status.append(-3)
+            except Exception:
+                status.append(-2)
+            replies.append(None)
+        if timed_out:
+            self.stats.timed_out(timed_out)
+            name = "reads" if cmd == EFRAME.DevRead else "writes"
+            self._dispatch_event(EFRAME.RES, f"{timed_out} of {len(items)} {name} timed out")
+        return replies, status
+
+    @staticmethod
+    def _to_arrays(replies, status):
+        values = np.full(len(replies), np.nan, dtype=np.float32)
+        for i, reply in enumerate(replies):
+            # A nonzero result byte means the device rejected the request: no value.
+            if isinstance(reply, DevReply) and reply.result == 0:
+                values[i] = reply.value
+        return values, np.asarray(status, dtype=np.int16)
 
     def request_info(self):
+        self._info_sent_at = time.monotonic()
         self.send_frame(EFRAME.Info, b"\x00\x00")
 
-    def download_rules(self, buf: bytes):
+    def download_rules(self, buf: bytes, window: int = 1, chunk_size: int = DEFAULT_CHUNK,
+                       adaptive: bool = False, ack_timeout: float = 2.0, retries: int = 3,
+                       delta: bool = False, unit_id: Optional[str] = None):
+        """
+        Download a rule image in the background.
+
+        By default this is the original stop-and-wait transfer. With
+        window > 1 up to `window` RuleDown chunks are kept in flight, and
+        `adaptive` resizes them; see RuleTransfer.
+
+        With `delta` and a `unit_id` naming this physical unit (e.g. its
+        serial label; the Info reply carries none), only blocks that differ
+        from the image this unit last accepted are sent, and the accepted
+        image is recorded in the RuleImageCache. Without a fresh Info reply,
+        or when the image length changed, the whole image is sent.
+        """
         if not self.is_open():
             self._dispatch_event(EFRAME.RuleDown, "Port not open")
             return
         if not buf or len(buf) < 10:
             self._dispatch_event(EFRAME.RuleDown, "Invalid rules buffer")
             return
+        if self._transfer is not None:
+            self._dispatch_event(EFRAME.RuleDown, "Download in progress")
+            return
 
-        chunk_size = 156
-        total_len = len(buf)
-        offset = 0
+        try:
+            transfer = RuleTransfer(self, buf, window=window, chunk_size=chunk_size,
+                                    adaptive=adaptive, ack_timeout=ack_timeout, retries=retries)
+        except ValueError as e:
+            self._dispatch_event(EFRAME.RuleDown, str(e))
+            return
+        self._transfer = transfer
 
         def worker():
-            nonlocal offset
-            self.request_info()
-            time.sleep(0.05)
-
-            while offset < total_len:
-                end = min(offset + chunk_size, total_len)
-                chunk = buf[offset:end]
-                hdr = struct.pack("<B H B", 1, offset & 0xFFFF, len(chunk) & 0xFF)
-                self._rule_ack = None
-                if not self.send_frame(EFRAME.RuleDown, hdr + chunk):
-                    self._dispatch_event(EFRAME.RuleDown, "error-send")
-                    return
-
-                waited = 0
-                while waited < 2000:
-                    if self._rule_ack is not None:
-                        break
-                    time.sleep(0.01)
-                    waited += 10
-                if self._rule_ack is False:
-                    self._dispatch_event(EFRAME.RuleDown, "chunk-failed")
-                    return
-
-                offset = end
-                pct = int(offset * 100 / total_len)
-                if self._rule_ack is not None:
-                    status = 'OK' if self._rule_ack else 'FAIL'
-                else:
-                    status = 'Unknown'
+            ok = False
+            try:
+                key = self._delta_key(delta, unit_id)
+                if key is not None:
+                    ranges = self.rule_cache.delta_ranges(key, buf)
+                    if ranges is not None:
+                        transfer.ranges = ranges
+                        sent = sum(end - start for start, end in ranges)
+                        self._dispatch_event(EFRAME.RuleDown, f"delta: {sent} of {len(buf)} bytes changed")
+                    # The device holds an unknown mix of images until this succeeds.
+                    self.rule_cache.invalidate(key)
+                ok = transfer.run()
+                self.stats.transfer_done(ok, transfer.bytes_sent, transfer.elapsed)
+                if ok and key is not None:
+                    self.rule_cache.store(key, buf)
+            finally:
+                transfer.release()
+                self.last_transfer = transfer
+                self._transfer = None
+                if self.on_transfer_done is not None:
+                    try:
+                        self.on_transfer_done(ok)
+                    except Exception:
+                        pass
 
-                self._dispatch_event(EFRAME.RuleDown, f"{pct}% - {status}")
+        threading.Thread(target=worker, daemon=True).start()
 
-            final_hdr = struct.pack("<B H B", 2, 0, 1)
-            self.send_frame(EFRAME.RuleDown, final_hdr + b"\x00")
-            self._dispatch_event(EFRAME.RuleDown, "Done")
+    def _delta_key(self, delta: bool, unit_id: Optional[str]) -> Optional[str]:
+        """RuleImageCache key for a delta download, or None to send the whole image."""
+        if not delta:
+            return None
+        if not unit_id:
+            self._dispatch_event(EFRAME.RuleDown, "delta: no unit id, sending the whole image")
+            return None
+        # Only a reply to this request counts; device_info may be from another unit.
+        self.device_info = None
+        self._info_event.clear()
+        self.request_info()
+        if not self._info_event.wait(3.0) or self.device_info is None:
+            self._dispatch_event(EFRAME.RuleDown, "delta: no Info reply, sending the whole image")
+            return None
+        return self.rule_cache.key(unit_id, self.device_info)
 
-        threading.Thread(target=worker, daemon=True).start()
-    
     def test_start(self):
         payload = b'cmd_EnableExec()\r\n' 
         return self.send_frame(EFRAME.LOG, payload) 
@@ -201,6 +394,51 @@ class JX1000Driver:
         payload = b'cmd_ExitExec()\r\n' 
         return self.send_frame(EFRAME.LOG, payload) 
 
+    # -------------------------
+    # Instrumentation
+    # -------------------------
+    def _on_reply(self, key, seconds: float):
+        self.stats.observe(key[0], seconds)
+
+    def stats_snapshot(self) -> dict:
+        """
+        Counters and per-command round-trip histograms since the last reset,
+        plus parser errors and current queue depths. The event counts are
+        those of the (possibly shared) event bus.
+        """
+        snap = self.stats.snapshot()
+        snap["port"] = self.port_name
+        snap["checksum_errors"] = self._parser.bad_checksums
+        snap["resync_bytes"] = self._parser.discarded
+        snap["queues"] = {
+            "in_flight": self._mux.in_flight,
+            "max_in_flight": self._mux.max_in_flight,
+            "rx_buffered": len(self._parser),
+            "events": self.events.stats(),
+        }
+        return snap
+
+    def reset_stats(self):
+        self.stats.reset()
+        self._parser.bad_checksums = 0
+        self._parser.discarded = 0
+
+    def start_stats_dump(self, interval: float = 60.0,
+                         sink: Optional[Callable[[dict], None]] = None):
+        """
+        Take a snapshot every `interval` seconds and pass it to `sink`, by
+        default a "Stats" event on the event bus.
+        """
+        self.stop_stats_dump()
+        if sink is None:
+            sink = lambda snap: self._dispatch_event("Stats", snap)
+        self._stats_dumper = StatsDumper(self.stats_snapshot, sink, interval)
+
+    def stop_stats_dump(self):
+        if self._stats_dumper is not None:
+            self._stats_dumper.stop()
+            self._stats_dumper = None
+
     # -------------------------
     # Frame parser
     # -------------------------
@@ -210,99 +448,68 @@ class JX1000Driver:
                 time.sleep(0.05)
                 continue
             try:
-                chunk = self.s.read(256)
+                # Block for the first byte only, then drain whatever is buffered,
+                # so a reply is handed to the parser as soon as it arrives.
+                chunk = self.s.read(self.s.in_waiting or 1)
             except Exception:
                 break
             if chunk:
-                self.buffer.extend(chunk)
-                self._process_buffer()
-
-    def _process_buffer(self):
-        while len(self.buffer) >= 5:
-            if self.buffer[0] != FRAME_H or self.buffer[1] != FRAME_L:
-                self.buffer.pop(0)
-                continue
-            length = self.buffer[2]
-            total = length + 5
-            if len(self.buffer) < total:
-                return
-            frame = bytes(self.buffer[:total])
-            del self.buffer[:total]
-            if self.checksum(frame[:-1]) != frame[-1]:
-                continue
-            cmd = frame[3]
-            data = frame[4:-1]
+                self.stats.bytes_in += len(chunk)
+                self._process_buffer(chunk)
+            self._mux.expire()
+
+    def _process_buffer(self, chunk: bytes = b""):
+        n = 0
+        for cmd, data in self._parser.feed(chunk):
+            n += 1
             self._handle_frame(cmd, data)
+        self.stats.frames_in += n
 
     def _handle_frame(self, cmd: int, data: bytes):
         try:
-            # DEV_READ
-            if cmd == EFRAME.DevRead:
-                if len(data) >= 9:
-                    com, ch, res, addr, val = struct.unpack("<BBBHf", data[:9])
-                    self._last_read = float(val)
-                    self._dispatch_event(EFRAME.DevRead, {"com":com,"ch":ch,"addr":addr,"result":res,"value":val})
+            # DEV_READ / DEV_WRITE
+            if cmd == EFRAME.DevRead or cmd == EFRAME.DevWrite:
+                reply = decode_dev_reply(data, cmd)
+                if reply is not None:
+                    self._mux.resolve((cmd, reply.com, reply.ch, reply.addr), reply)
+                    self._dispatch_event(cmd, reply)
                 else:
-                    self._dispatch_event(EFRAME.DevRead, data)
-            # DEV_WRITE
-            elif cmd == EFRAME.DevWrite:
-                if len(data) >= 9:
-                    try:
-                        com, ch, res, addr, val = struct.unpack("<BBBHf", data[:9])
-                        self._write_ack = True
-                        self._dispatch_event(EFRAME.DevWrite, {"com": com,"ch": ch,"addr": addr,"result": res,"value": val})
-                    except struct.error:
-                        self._write_ack = True
-                        self._dispatch_event(EFRAME.DevWrite, data)
-                else:
-                    self._write_ack = True
-                    self._dispatch_event(EFRAME.DevWrite, data)
+                    if cmd == EFRAME.DevWrite:
+                        # Short acks carry no address; complete the oldest pending write.
+                        self._mux.resolve_oldest(EFRAME.DevWrite, data)
+                    self._dispatch_event(cmd, data)
             # INFO
             elif cmd == EFRAME.Info:
-                if len(data) >= 6:
-                    hard, ver, comnum, model, cmdbytes = struct.unpack("<BBBBH", data[:6])
-                    info_dict = {"HardType": hard, "Version": f"{ver/10:.1f}", "ComNumber": comnum, "BoardCount": model}
+                info_dict = decode_info(data)
+                if info_dict is not None:
+                    sent_at, self._info_sent_at = self._info_sent_at, None
+                    if sent_at is not None:
+                        self.stats.observe(EFRAME.Info, time.monotonic() - sent_at)
+                    self.device_info = info_dict
+                    self._info_event.set()
                     self._dispatch_event(EFRAME.Info, info_dict)
                 else:
                     self._dispatch_event(EFRAME.Info, data)
             # RULE download
             elif cmd == EFRAME.RuleDown:
                 if len(data) >= 1:
-                    ok = data[0] == 1
-                    self._rule_ack = ok
-                    self._dispatch_event(EFRAME.RuleDown)
+                    transfer = self._transfer
+                    if transfer is not None:
+                        transfer.on_ack(data[0] == 1)
                 else:
                     self._dispatch_event(EFRAME.RuleDown, "No ACK byte")
             # RES
             elif cmd == EFRAME.RES:
-                try:
-                    text = data.decode("utf-8", errors="ignore").strip()
-                except Exception:
-                    text = data
-                if text.startswith("{ED,") and text.endswith("}"):
-                    parts = text[1:-1].split(",")   # remove {}
-                    if len(parts) >= 2:
-                        result_flag = parts[1].strip()
-                        self._last_test_result = "{PASS}" if result_flag == "1" else "FAIL"
-                        self._dispatch_event(cmd, self._last_test_result)
+                value, is_result = decode_res(data)
+                if is_result:
+                    if value is not None:
+                        self._last_test_result = value
+                        self._dispatch_event(cmd, value)
                     return
-                self._dispatch_event(cmd, text)
+                self._dispatch_event(cmd, value)
             # LOG
             elif cmd == EFRAME.LOG:
-                try:
-                    text = data.decode("utf-8", errors="ignore").strip()
-                except Exception:
-                    text = data
-                if text == ("cmd_EnableExec."):
-                    self._dispatch_event(cmd, "Starting test...")
-                    return
-                if text.startswith("cmd") and text.endswith("Start..."):
-                    self._dispatch_event(cmd, "Test Start")
-                    return
-                if text.startswith("cmd") and text.endswith("End..."):
-                    self._dispatch_event(cmd, "Test End")
-                    return
-                self._dispatch_event(cmd, text)
+                self._dispatch_event(cmd, decode_log(data))
             else:
                 self._dispatch_event(cmd, data)
         except Exception as e:
@@ -337,7 +544,11 @@ class JX1000Driver:
         return f"[{name}] {value}"
 
     def _dispatch_event(self, cmd: Union[int, str], value):
-        """Dispatch event to console if print_events=True and to callback if provided."""
+        """Queue an event for the dispatcher thread; never blocks on subscribers."""
+        self.events.publish(cmd, value, source=self)
+
+    def _deliver_event(self, cmd: Union[int, str], value):
+        """Deliver event to console if print_events=True and to callback if provided."""
         if self.print_events:
             pretty = self._format_event(cmd, value)
             self._safe_print(pretty)
@@ -0,0 +1,261 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Union
+
+from jx1000.messages import DevReply, plain
+
+OVERFLOW_POLICIES = ("drop-oldest", "block", "coalesce")
+
+
+def event_address(value):
+    """(com, ch, addr) of a DevRead/DevWrite event value, or None for other events."""
+    if isinstance(value, DevReply):
+        return value.com, value.ch, value.addr
+    if isinstance(value, (str, bytes)) or value is None:
+        return None
+    if isinstance(value, dict):
+        if "com" in value:
+            return value["com"], value["ch"], value.get("addr")
+        return None
+    com = getattr(value, "com", None)
+    if com is None:
+        return None
+    return com, value.ch, getattr(value, "addr", None)
+
+
+class _Subscription:
+    __slots__ = ("callback", "cmd", "com", "ch", "batch", "source")
+
+    def __init__(self, callback, cmd, com, ch, batch, source):
+        self.callback = callback
+        self.cmd = cmd
+        self.com = com
+        self.ch = ch
+        self.batch = batch
+        self.source = source
+
+    def matches(self, cmd, value, source) -> bool:
+        if self.source is not None and source is not self.source:
+            return False
+        if self.cmd is not None and cmd != self.cmd:
+            return False
+        if self.com is None and self.ch is None:
+            return True
+        address = event_address(value)
+        if address is None:
+            return False
+        return (self.com is None or address[0] == self.com) and (self.ch is None or address[1] == self.ch)
+
+
+class EventBus:
+    """
+    Bounded event queue with its own dispatcher thread.
+
+    publish() only enqueues, so a slow subscriber or terminal never stalls
+    the serial reader. When the queue is full the overflow policy applies:
+
+        drop-oldest  discard the oldest queued event
+        block        make the publisher wait for space
+        coalesce     a DevRead/DevWrite event replaces a queued event for the
+                     same (cmd, com, ch, addr); otherwise drop the oldest
+
+    Below `maxsize` every event is queued, whatever the policy. The
+    default, drop-oldest, can lose events under a sustained burst; pass
+    policy="block" where every event must arrive.
+
+    Events are delivered in batches of up to `batch_size`, with reply
+    values converted by messages.plain(). Subscribers can
+    filter by EFRAME code, by (com, ch) and by publishing source (so one bus
+    can be shared by several drivers), and may ask for whole batches.
+
+    The dispatcher thread starts with the first publish and exits after
+    `idle_timeout` seconds without events (or on close()); the next
+    publish starts it again. A subscriber that publishes from inside its
+    callback never blocks: if the "block" policy would make it wait for
+    the dispatcher, its event is delivered inline instead.
+    """
+
+    def __init__(self, maxsize: int = 1024, policy: str = "drop-oldest",
+                 batch_size: int = 64, delay_threshold: float = 0.1,
+                 idle_timeout: float = 1.0):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.batch_size = batch_size
+        self.delay_threshold = delay_threshold
+        self.idle_timeout = idle_timeout
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.delayed = 0
+        self.max_depth = 0
+
+        self._queue: Deque[list] = deque()  # [cmd, value, published_at, key, source]
+        self._latest: Dict[tuple, list] = {}
+        self._subs: List[_Subscription] = []
+        self._cond = threading.Condition()
+        self._busy = False
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    # -------------------------
+    # Subscription
+    # -------------------------
+    def subscribe(self, callback: Callable, cmd: Optional[Union[int, str]] = None,
+                  com: Optional[int] = None, ch: Optional[int] = None,
+                  batch: bool = False, source=None) -> _Subscription:
+        """
+        Register `callback(cmd, value)`, or `callback([(cmd, value), ...])` with
+        batch=True. Returns a handle for unsubscribe().
+        """
+        sub = _Subscription(callback, cmd, com, ch, batch, source)
+        with self._cond:
+            self._subs = self._subs + [sub]
+        return sub
+
+    def unsubscribe(self, sub: _Subscription):
+        with self._cond:
+            self._subs = [s for s in self._subs if s is not sub]
+
+    # -------------------------
+    # Publishing
+    # -------------------------
+    def publish(self, cmd: Union[int, str], value=None, source=None):
+        key = None
+        if self.policy == "coalesce":
+            address = event_address(value)
+            if address is not None:
+                key = (id(source), cmd) + address
+        with self._cond:
+            self.published += 1
+            if key is not None and len(self._queue) >= self.maxsize:
+                entry = self._latest.get(key)
+                if entry is not None:
+                    entry[1] = value
+                    self.coalesced += 1
+                    return
+            entry = [cmd, value, time.monotonic(), key, source]
+            inline = False
+            if len(self._queue) >= self.maxsize:
+                if self.policy != "block":
+                    self._drop_oldest()
+                elif threading.current_thread() is self._thread:
+                    # A subscriber publishing: waiting here would wait for ourselves.
+                    inline = True
+                else:
+                    while len(self._queue) >= self.maxsize and self._running:
+                        self._cond.wait()
+            if not inline:
+                self._queue.append(entry)
+                if key is not None:
+                    self._latest[key] = entry
+                if len(self._queue) > self.max_depth:
+                    self.max_depth = len(self._queue)
+                if self._thread is None:
+                    self._running = True
+                    self._thread = threading.Thread(target=self._run, name="jx1000-events",
+                                                    daemon=True)
+                    self._thread.start()
+                self._cond.notify_all()
+                return
+            subs = self._subs
+        self._deliver([entry], subs)
+
+    def _drop_oldest(self):
+        entry = self._queue.popleft()
+        if entry[3] is not None and self._latest.get(entry[3]) is entry:
+            del self._latest[entry[3]]
+        self.dropped += 1
+
+    # -------------------------
+    # Dispatch
+    # -------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._busy = False
+                    self._cond.notify_all()
+                    if not self._cond.wait(self.idle_timeout) and not self._queue:
+                        break
+                if not self._queue:
+                    # Idle or closed: the next publish starts a new dispatcher.
+                    self._busy = False
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+                self._busy = True
+                n = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(n)]
+                for entry in batch:
+                    if entry[3] is not None and self._latest.get(entry[3]) is entry:
+                        del self._latest[entry[3]]
+                subs = self._subs
+                self._cond.notify_all()
+            self._deliver(batch, subs)
+
+    def _deliver(self, batch: List[list], subs: List[_Subscription]):
+        now = time.monotonic()
+        self.delayed += sum(1 for entry in batch if now - entry[2] > self.delay_threshold)
+        # Subscribers get plain dicts, built once per event and only if someone matches it.
+        converted: Dict[int, object] = {}
+        for sub in subs:
+            events = []
+            for i, (cmd, value, _, _, source) in enumerate(batch):
+                if sub.matches(cmd, value, source):
+                    if i not in converted:
+                        converted[i] = plain(value)
+                    events.append((cmd, converted[i]))
+            if not events:
+                continue
+            if sub.batch:
+                self._call(sub.callback, events)
+                continue
+            for cmd, value in events:
+                self._call(sub.callback, cmd, value)
+        self.delivered += len(batch)
+
+    @staticmethod
+    def _call(callback, *args):
+        try:
+            callback(*args)
+        except Exception:
+            pass
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been delivered."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 1.0):
+        """Deliver what is queued, then stop the dispatcher thread (a later publish restarts it)."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "delayed": self.delayed,
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+        }
@@ -0,0 +1,163 @@
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from jx1000.messages import DevReadReply, DevReply, DevWriteReply, InfoReply
+
+FRAME_H = 0xA5
+FRAME_L = 0x5E
+FRAME_HEADER = bytes([FRAME_H, FRAME_L])
+
+
+
+class EFRAME:
+    Info = 0x01
+    RuleDown = 0x02
+    DevRead = 0x21
+    DevWrite = 0x22
+    RES = 0xFE
+    LOG = 0xFF
+
+EFRAME_NAMES = {
+    EFRAME.Info:      "INFO",
+    EFRAME.RuleDown:  "RULE",
+    EFRAME.DevRead:   "READ",
+    EFRAME.DevWrite:  "WRITE",
+    EFRAME.RES:       "RES",
+    EFRAME.LOG:       "LOG",
+}
+
+
+def checksum(data) -> int:
+    return sum(data) & 0xFF
+
+
+def build_frame(cmd: int, payload: bytes = b"") -> bytearray:
+    """Assemble a complete frame: header, length, command, payload, checksum."""
+    frame = bytearray(FRAME_HEADER)
+    frame.append(len(payload))
+    frame.append(cmd)
+    frame += payload
+    frame.append(checksum(frame))
+    return frame
+
+
+# -------------------------
+# Reply decoding
+# -------------------------
+_DEV_REPLY_TYPES = {EFRAME.DevRead: DevReadReply, EFRAME.DevWrite: DevWriteReply}
+_unpack_dev_reply = struct.Struct("<BBBHf").unpack_from
+_new_reply = tuple.__new__
+
+
+def decode_dev_reply(data: bytes, cmd: int = EFRAME.DevRead) -> Optional[DevReply]:
+    """DevRead/DevWrite reply, or None if the payload is too short to carry an address."""
+    if len(data) < 9:
+        return None
+    return _new_reply(_DEV_REPLY_TYPES[cmd], _unpack_dev_reply(data))
+
+
+def decode_info(data: bytes) -> Optional[InfoReply]:
+    if len(data) < 6:
+        return None
+    hard, ver, comnum, model, cmdbytes = struct.unpack_from("<BBBBH", data)
+    return InfoReply(hard, f"{ver/10:.1f}", comnum, model)
+
+
+def decode_res(data: bytes) -> Tuple[Optional[str], bool]:
+    """
+    Text of a RES frame and whether it is an end-of-test record.
+    "{ED,1}" becomes "{PASS}", any other flag "FAIL"; a malformed record gives None.
+    """
+    text = data.decode("utf-8", errors="ignore").strip()
+    if text.startswith("{ED,") and text.endswith("}"):
+        parts = text[1:-1].split(",")   # remove {}
+        if len(parts) >= 2:
+            return ("{PASS}" if parts[1].strip() == "1" else "FAIL"), True
+        return None, True
+    return text, False
+
+
+def decode_log(data: bytes) -> str:
+    """LOG text, with the test markers mapped to "Starting test...", "Test Start" and "Test End"."""
+    text = data.decode("utf-8", errors="ignore").strip()
+    if text == "cmd_EnableExec.":
+        return "Starting test..."
+    if text.startswith("cmd") and text.endswith("Start..."):
+        return "Test Start"
+    if text.startswith("cmd") and text.endswith("End..."):
+        return "Test End"
+    return text
+
+
+class FrameParser:
+    """
+    Incremental EFRAME parser.
+
+    Bytes are appended to one buffer and consumed by advancing an offset;
+    the buffer is only compacted once the consumed prefix grows past
+    `compact_threshold`. Resync after noise jumps straight to the next
+    0xA5 0x5E header, so garbage costs linear time.
+
+    `bad_checksums` counts frames dropped for a checksum mismatch and
+    `discarded` every byte skipped while resyncing.
+    """
+
+    def __init__(self, compact_threshold: int = 4096):
+        self.compact_threshold = compact_threshold
+        self._buf = bytearray()
+        self._pos = 0
+        self.bad_checksums = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        """Number of buffered bytes not yet consumed."""
+        return len(self._buf) - self._pos
+
+    def reset(self):
+        self._buf.clear()
+        self._pos = 0
+
+    def feed(self, data: bytes = b"") -> Iterator[Tuple[int, bytes]]:
+        """Add received bytes and return an iterator of complete (cmd, payload) frames."""
+        buf = self._buf
+        if data:
+            buf += data
+        frames: List[Tuple[int, bytes]] = []
+        pos = self._pos
+        end = len(buf)
+        view = memoryview(buf)
+        try:
+            while end - pos >= 5:
+                if buf[pos] != FRAME_H or buf[pos + 1] != FRAME_L:
+                    nxt = buf.find(FRAME_HEADER, pos + 1)
+                    if nxt < 0:
+                        # Keep a trailing 0xA5: it may be the first half of a header.
+                        nxt = end - 1 if buf[end - 1] == FRAME_H else end
+                        self.discarded += nxt - pos
+                        pos = nxt
+                        break
+                    self.discarded += nxt - pos
+                    pos = nxt
+                    continue
+                stop = pos + buf[pos + 2] + 4
+                if stop >= end:
+                    break
+                if sum(view[pos:stop]) & 0xFF != buf[stop]:
+                    # A false header inside noise; resync from the next byte.
+                    self.bad_checksums += 1
+                    self.discarded += 1
+                    pos += 1
+                    continue
+                frames.append((buf[pos + 3], bytes(view[pos + 4:stop])))
+                pos = stop + 1
+        finally:
+            view.release()
+
+        if pos >= end:
+            buf.clear()
+            pos = 0
+        elif pos >= self.compact_threshold:
+            del buf[:pos]
+            pos = 0
+        self._pos = pos
+        return iter(frames)
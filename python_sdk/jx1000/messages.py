@@ -0,0 +1,58 @@
+"""
+Typed reply and event values.
+
+DevRead/DevWrite and Info replies are immutable NamedTuples built
+straight from the unpacked payload, so decoding a reply costs one
+struct unpack and one tuple. Fields are read as attributes
+(reply.value).
+
+These types stay inside the SDK: futures resolve to them, but event
+callbacks get plain() values, the dicts they always got.
+"""
+
+from typing import NamedTuple
+
+
+class _DevReply(NamedTuple):
+    # Wire order, so a reply is built from one unpack without reordering.
+    com: int
+    ch: int
+    result: int
+    addr: int
+    value: float
+
+
+class DevReply(_DevReply):
+    __slots__ = ()
+
+
+class DevReadReply(DevReply):
+    __slots__ = ()
+
+
+class DevWriteReply(DevReply):
+    __slots__ = ()
+
+
+class _InfoReply(NamedTuple):
+    HardType: int
+    Version: str
+    ComNumber: int
+    BoardCount: int
+
+
+class InfoReply(_InfoReply):
+    __slots__ = ()
+
+
+# -------------------------
+# Event values
+# -------------------------
+def plain(value):
+    """The value as event callbacks see it: replies as dicts, anything else as-is."""
+    if isinstance(value, DevReply):
+        return {"com": value.com, "ch": value.ch, "addr": value.addr,
+                "result": value.result, "value": value.value}
+    if isinstance(value, InfoReply):
+        return dict(zip(value._fields, value))
+    return value
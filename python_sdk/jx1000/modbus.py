@@ -5,11 +5,19 @@ Modbus API helper for JX1000 devices.
 
 from pymodbus.client import ModbusSerialClient
 from pymodbus.exceptions import ModbusException, ModbusIOException
-from serial.tools import list_ports
 import struct
 import time
 from typing import Optional, List, Tuple
 
+import numpy as np
+
+from jx1000.discovery import PortCache, discover
+from jx1000.registers import (MAX_WRITE_REGISTERS, WriteQueue, decode_registers, expand_writes,
+                              plan_writes)
+
+# Protocol limit for one read holding registers (0x03) request.
+MAX_READ_REGISTERS = 125
+
 
 class ModbusHelper:
 
@@ -57,7 +65,33 @@ class ModbusHelper:
             return result.registers, None
         return None, err
 
-    def read_mapped_pair(self, start, num_pairs=1):
+    def read_registers(self, start, count, max_per_request=MAX_READ_REGISTERS):
+        """
+        Read `count` consecutive holding registers in as few requests as possible.
+        Returns (registers, None) or (None, err); err names the failing block.
+        """
+        registers = []
+        for block_start, block_count in self.plan_reads(start, count, max_per_request):
+            result, err = self._safe_call(
+                self.client.read_holding_registers,
+                address=block_start,
+                count=block_count,
+            )
+            if err:
+                return None, f"Error reading registers {block_start}-{block_start + block_count - 1}: {err}"
+            registers.extend(result.registers)
+        return registers, None
+
+    def read_mapped_pair(self, start, num_pairs=1, as_array=False, wordorder="big"):
+        """
+        Read the register pairs mapped to inputs start..start+num_pairs-1.
+
+        Input N (1000-1499) maps to registers 1000 + (N - 1000) * 2 and the one
+        after it, so the whole range is one contiguous block, read in requests of
+        up to 124 registers (62 pairs). Returns a list of
+        {input_target, mapped_registers, values} records, or with as_array=True
+        a float32 array of the decoded pairs.
+        """
         if not (1000 <= start <= 1499):
             return None, "Mapped read requires 1000-1499 input"
         
@@ -65,28 +99,44 @@ class ModbusHelper:
         if max_last > 1499:
             return None, "Requested range exceeds 1499"
 
-        results = []
-
-        for src in range(start, start + num_pairs):
-            base = 1000 + (src - 1000) * 2
-
+        first = 1000 + (start - 1000) * 2
+        # Keep pairs whole so a failed block never leaves half a value behind.
+        per_request = MAX_READ_REGISTERS - MAX_READ_REGISTERS % 2
+        registers = []
+        for block_start, block_count in self.plan_reads(first, num_pairs * 2, per_request):
             regs, err = self._safe_call(
                 self.client.read_holding_registers,
-                address=base,
-                count=2,
+                address=block_start,
+                count=block_count,
             )
 
             if err:
+                src = start + (block_start - first) // 2
                 return None, f"Error reading mapped pair at {src}: {err}"
+            registers.extend(regs.registers)
+
+        if as_array:
+            return self.pairs_to_floats(registers, wordorder), None
 
+        results = []
+        for i, src in enumerate(range(start, start + num_pairs)):
+            base = first + i * 2
             results.append({
                 "input_target": src,
                 "mapped_registers": [base, base + 1],
-                "values": regs.registers,
+                "values": registers[i * 2:i * 2 + 2],
             })
 
         return results, None
 
+    @staticmethod
+    def plan_reads(start, count, max_per_request=MAX_READ_REGISTERS) -> List[Tuple[int, int]]:
+        """Split a register range into (address, count) requests of at most max_per_request."""
+        if not 1 <= max_per_request <= MAX_READ_REGISTERS:
+            raise ValueError(f"max_per_request must be 1-{MAX_READ_REGISTERS}")
+        return [(address, min(max_per_request, start + count - address))
+                for address in range(start, start + count, max_per_request)]
+
     # ------------------------
     # WRITE FUNCTIONS
     # ------------------------
@@ -97,10 +147,19 @@ class ModbusHelper:
         address      : int -> main register
         value        : int -> 0 or 1
         pair_address : int -> optional paired register that will receive the opposite value
+
+        An adjacent pair is written in one Write Multiple Registers request,
+        so the two relays never show the same state.
         """
         if value not in (0, 1):
             raise ValueError("Value must be 0 or 1")
 
+        if pair_address is not None and abs(pair_address - address) == 1:
+            ok, err = self.write_registers({address: value, pair_address: 1 - value})
+            if not ok:
+                return None, f"Failed writing pair {address}/{pair_address}: {err}"
+            return True, None
+
         # Write main register
         result, err = self._safe_call(
             self.client.write_register,
@@ -121,7 +180,49 @@ class ModbusHelper:
                 return None, f"Failed writing pair register {pair_address}: {pair_err}"
 
         return True, None
-    
+
+    def write_registers(self, writes, dtype=None, wordorder="big", byteorder="big",
+                        max_per_request=MAX_WRITE_REGISTERS):
+        """
+        Write {address: value} (or (address, value) pairs), merging adjacent
+        registers into Write Multiple Registers (0x10) requests. With `dtype`
+        (e.g. "float32") each value is encoded into consecutive registers.
+        Switching a whole relay bank is a single request.
+        """
+        try:
+            registers = expand_writes(writes, dtype, wordorder, byteorder)
+        except ValueError as e:
+            return None, str(e)
+        for start, values in plan_writes(registers, max_per_request):
+            ok, err = self._write_run(start, values)
+            if not ok:
+                return None, err
+        return True, None
+
+    def _write_run(self, start, values):
+        if len(values) == 1:
+            result, err = self._safe_call(
+                self.client.write_register,
+                address=start,
+                value=values[0],
+            )
+        else:
+            result, err = self._safe_call(
+                self.client.write_registers,
+                address=start,
+                values=values,
+            )
+        if result is None:
+            return None, f"Error writing registers {start}-{start + len(values) - 1}: {err}"
+        return True, None
+
+    def write_queue(self, interval=None) -> WriteQueue:
+        """
+        Queue for writes that should coalesce: repeated writes to a register
+        keep only the last value until flush() (or every `interval` seconds).
+        """
+        return WriteQueue(self._write_run, interval=interval)
+
     # ------------------------
     # UTILITY
     # ------------------------
@@ -133,9 +234,38 @@ class ModbusHelper:
             raw_bytes = reg2.to_bytes(2, "big") + reg1.to_bytes(2, "big")
         return struct.unpack(">f", raw_bytes)[0]
 
+    @staticmethod
+    def pairs_to_floats(registers, wordorder="big") -> np.ndarray:
+        """Decode a flat list of register pairs into a float32 array in one pass."""
+        return decode_registers(registers, "float32", wordorder=wordorder)
+
     # ------------------------
     # PORT DISCOVERY
     # ------------------------
+    @staticmethod
+    def _open_probe(port, baudrate, bytesize, parity, stopbits, timeout, test_register):
+        """Open `port` and read `test_register`; the connected client, or None."""
+        client = ModbusSerialClient(
+            port=port,
+            baudrate=baudrate,
+            bytesize=bytesize,
+            parity=parity,
+            stopbits=stopbits,
+            timeout=timeout,
+        )
+        try:
+            if not client.connect():
+                return None
+            time.sleep(0.05)
+            result = client.read_holding_registers(address=test_register, count=1)
+            if result is None or result.isError():
+                client.close()
+                return None
+            return client
+        except Exception:
+            client.close()
+            return None
+
     @staticmethod
     def probe_modbus_ports(
         baudrate=9600,
@@ -144,42 +274,24 @@ class ModbusHelper:
         stopbits=1,
         timeout=1,
         test_register=1000,
+        max_devices=None,
+        cache: Optional[PortCache] = None,
     ) -> List[str]:
-        valid_ports = []
-        
-        for port in list_ports.comports():
-            client = None
-            try:
-                client = ModbusSerialClient(
-                    port=port.device,
-                    baudrate=baudrate,
-                    bytesize=bytesize,
-                    parity=parity,
-                    stopbits=stopbits,
-                    timeout=timeout,
-                )
-
-                if not client.connect():
-                    continue
-                
-                time.sleep(0.05)
-
-                # simple probe to verify connection
-                result = client.read_holding_registers(
-                    address=test_register,
-                    count=1,
-                )
-
-                if result and not result.isError():
-                    valid_ports.append(port.device)
-
-            except Exception:
-                pass
-            finally:
-                if client:
-                    client.close()
-
-        return valid_ports
+        """
+        Ports with a Modbus slave answering `test_register`, probed in parallel.
+        Stops once `max_devices` have answered (None probes every port).
+        """
+        def probe(port):
+            client = ModbusHelper._open_probe(port, baudrate, bytesize, parity, stopbits,
+                                              timeout, test_register)
+            if client is None:
+                return False
+            client.close()
+            return True
+
+        found = discover(probe, want=max_devices, cache_key=f"modbus-{baudrate}-{test_register}",
+                         cache=cache)
+        return [port for port, _ in found]
 
     # ------------------------
     # AUTO-CONNECT TO MODBUS PORT
@@ -192,36 +304,21 @@ class ModbusHelper:
         stopbits=1,
         timeout=1,
         test_register=1000,
+        cache: Optional[PortCache] = None,
     ) -> Tuple[Optional["ModbusHelper"], Optional[str]]:
-
-        ports = [p.device for p in list_ports.comports()]
-
-        for port in ports:
-            client = ModbusSerialClient(
-                port=port,
-                baudrate=baudrate,
-                bytesize=bytesize,
-                parity=parity,
-                stopbits=stopbits,
-                timeout=timeout,
-            )
-
-            try:
-                if not client.connect():
-                    continue
-                try:
-                    result = client.read_holding_registers(address=test_register, count=1)
-                    if result is None or result.isError():
-                        client.close()
-                        continue
-                except Exception:
-                    client.close()
-                    continue
-                return ModbusHelper(client, port=port), port
-
-            except Exception:
-                if client:
-                    client.close()
-                continue
-            
-        return None, None
+        """
+        Connect to the first port whose slave answers `test_register`.
+        The last port that answered is tried first; the others are probed in parallel.
+        """
+        found = discover(
+            lambda port: ModbusHelper._open_probe(port, baudrate, bytesize, parity, stopbits,
+                                                  timeout, test_register),
+            want=1,
+            cache_key=f"modbus-{baudrate}-{test_register}",
+            cache=cache,
+            release=lambda client: client.close(),
+        )
+        if not found:
+            return None, None
+        port, client = found[0]
+        return ModbusHelper(client, port=port), port
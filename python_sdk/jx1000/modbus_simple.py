@@ -1,25 +1,33 @@
-import time
+import struct
+
 import serial
-import serial.tools.list_ports
-
-# Modbus RTU CRC16 (IBM / 0xA001)
-
-def crc16_modbus(data: bytes) -> int:
-    """
-    Calculate Modbus RTU CRC16.
-
-    Returns:
-        int: 16-bit CRC value
-    """
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
-    return crc
+
+# Modbus RTU CRC16 (IBM / 0xA001), table driven; re-exported for existing imports
+from jx1000.crc import crc16_modbus, crc16_modbus_bytes
+from jx1000.discovery import candidate_ports, discover
+from jx1000.registers import MAX_WRITE_REGISTERS, expand_writes, plan_writes
+
+EXCEPTION_NAMES = {
+    0x01: "Illegal function",
+    0x02: "Illegal data address",
+    0x03: "Illegal data value",
+    0x04: "Slave device failure",
+    0x05: "Acknowledge",
+    0x06: "Slave device busy",
+    0x08: "Memory parity error",
+    0x0A: "Gateway path unavailable",
+    0x0B: "Gateway target device failed to respond",
+}
+
+
+class ModbusExceptionResponse(RuntimeError):
+    """The slave answered with an exception response (function | 0x80)."""
+
+    def __init__(self, function: int, code: int):
+        self.function = function
+        self.code = code
+        name = EXCEPTION_NAMES.get(code, "Unknown exception")
+        super().__init__(f"Modbus exception 0x{code:02X} ({name}) for function 0x{function:02X}")
 
 
 # ModbusRTU
@@ -32,19 +40,53 @@ class ModbusRTU:
             bytesize=8,
             parity="N",
             stopbits=1,
-            timeout=timeout
+            timeout=timeout,
         )
 
+    @classmethod
+    def from_serial(cls, ser) -> "ModbusRTU":
+        """Wrap an already open serial port (or any object with the same read/write API)."""
+        rtu = cls.__new__(cls)
+        rtu.ser = ser
+        return rtu
+
     # ------------------------
     # Auto-connect FTDI RS485
     # ------------------------
     @classmethod
-    def auto_connect(cls, baudrate=9600, timeout=1):
-        for p in serial.tools.list_ports.comports():
-            desc = (p.description or "").lower()
-            if "ftdi" in desc:
-                return cls(p.device, baudrate, timeout)
-        raise RuntimeError("No FTDI RS485 adapter found")
+    def auto_connect(cls, baudrate=9600, timeout=1, slave=1, test_register=None):
+        """
+        Open an FTDI RS485 adapter. With `test_register`, every adapter is
+        probed in parallel and the first whose slave answers is used; the
+        adapter found last time is tried first. Without it, adapters are
+        opened one at a time and the first that opens is used.
+        """
+        ports = candidate_ports(lambda p: "ftdi" in (p.description or "").lower())
+        if not ports:
+            raise RuntimeError("No FTDI RS485 adapter found")
+        if test_register is None:
+            # Nothing to probe, so nothing gained by opening every adapter at once.
+            for port in ports:
+                try:
+                    return cls(port, baudrate, timeout)
+                except Exception:
+                    continue
+            raise RuntimeError("No FTDI RS485 adapter could be opened")
+
+        def probe(port):
+            rtu = cls(port, baudrate, timeout)
+            try:
+                rtu.read_holding_registers(slave, test_register, 1)
+                return rtu
+            except Exception:
+                rtu.close()
+                return None
+
+        found = discover(probe, want=1, ports=ports, cache_key=f"rtu-{baudrate}-{slave}",
+                         release=lambda rtu: rtu.close())
+        if not found:
+            raise RuntimeError("No Modbus slave answered on the FTDI RS485 adapters")
+        return found[0][1]
 
     def close(self):
         if self.ser and self.ser.is_open:
@@ -54,16 +96,40 @@ class ModbusRTU:
     # Low-level send / receive
     # ------------------------
     def _send_frame(self, frame: bytes, response_length: int) -> bytes:
+        """
+        Send a request and return the validated response.
+
+        The slave id, function code and exception flag are read first, so an
+        exception response (5 bytes) is recognised as soon as it arrives.
+        Otherwise the rest of `response_length` is read with the normal
+        timeout. No inter-byte timeout: USB adapters deliver replies in
+        bursts separated by their latency timer (16 ms on FTDI).
+        """
         self.ser.reset_input_buffer()
         self.ser.write(frame)
         self.ser.flush()
-        time.sleep(0.05)
 
-        resp = self.ser.read(response_length)
+        resp = self.ser.read(2)
+        if len(resp) == 2 and resp[1] & 0x80:
+            resp += self.ser.read(3)
+            if len(resp) != 5:
+                raise RuntimeError("Timeout or incomplete Modbus response")
+            self._check_crc(resp)
+            raise ModbusExceptionResponse(resp[1] & 0x7F, resp[2])
+        if len(resp) == 2:
+            resp += self.ser.read(response_length - 2)
         if len(resp) != response_length:
             raise RuntimeError("Timeout or incomplete Modbus response")
+        self._check_crc(resp)
+        if resp[0] != frame[0] or resp[1] != frame[1]:
+            raise RuntimeError(f"Unexpected response {resp[:2].hex(' ')} to request {frame[:2].hex(' ')}")
         return resp
 
+    @staticmethod
+    def _check_crc(resp: bytes):
+        if crc16_modbus(resp[:-2]).to_bytes(2, "little") != resp[-2:]:
+            raise RuntimeError("CRC mismatch")
+
     # ------------------------
     # Read Holding Registers (0x03)
     # ------------------------
@@ -77,25 +143,14 @@ class ModbusRTU:
             count & 0xFF
         ])
 
-        crc = crc16_modbus(frame)
-        frame += crc.to_bytes(2, "little")
+        frame += crc16_modbus_bytes(frame)
 
         # Response: slave + func + byte_count + data + crc
         response_len = 5 + count * 2
         resp = self._send_frame(frame, response_len)
 
-        data, recv_crc = resp[:-2], resp[-2:]
-        if crc16_modbus(data).to_bytes(2, "little") != recv_crc:
-            raise RuntimeError("CRC mismatch")
-
         byte_count = resp[2]
-        values = []
-        for i in range(0, byte_count, 2):
-            hi = resp[3 + i]
-            lo = resp[4 + i]
-            values.append((hi << 8) | lo)
-
-        return values
+        return list(struct.unpack_from(f">{byte_count // 2}H", resp, 3))
 
     # ------------------------
     # Write Single Register (0x06)
@@ -110,13 +165,45 @@ class ModbusRTU:
             value & 0xFF
         ])
 
-        crc = crc16_modbus(frame)
-        frame += crc.to_bytes(2, "little")
+        frame += crc16_modbus_bytes(frame)
 
-        resp = self._send_frame(frame, 8)
+        self._send_frame(frame, 8)
+        return True
 
-        data, recv_crc = resp[:-2], resp[-2:]
-        if crc16_modbus(data).to_bytes(2, "little") != recv_crc:
-            raise RuntimeError("CRC mismatch")
+    # ------------------------
+    # Write Multiple Registers (0x10)
+    # ------------------------
+    def write_multiple_registers(self, slave: int, address: int, values):
+        count = len(values)
+        if not 1 <= count <= MAX_WRITE_REGISTERS:
+            raise ValueError(f"Write of {count} registers, expected 1-{MAX_WRITE_REGISTERS}")
+        frame = bytes([
+            slave,
+            0x10,
+            (address >> 8) & 0xFF,
+            address & 0xFF,
+            (count >> 8) & 0xFF,
+            count & 0xFF,
+            count * 2
+        ]) + struct.pack(f">{count}H", *values)
 
+        frame += crc16_modbus_bytes(frame)
+
+        # Response: slave + func + address + quantity + crc
+        self._send_frame(frame, 8)
         return True
+
+    def write_registers(self, slave: int, writes, dtype=None, wordorder="big", byteorder="big"):
+        """
+        Write {address: value} (or (address, value) pairs) with adjacent
+        registers merged into Write Multiple Registers requests; a lone
+        register uses Write Single Register. With `dtype` (e.g. "float32")
+        values are encoded as in jx1000.registers. Returns the request count.
+        """
+        runs = plan_writes(expand_writes(writes, dtype, wordorder, byteorder))
+        for start, values in runs:
+            if len(values) == 1:
+                self.write_single_register(slave, start, values[0])
+            else:
+                self.write_multiple_registers(slave, start, values)
+        return len(runs)
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class RequestMux:
+    """
+    Correlates device replies with outstanding requests.
+
+    Each request is registered under a key (for DevRead/DevWrite this is
+    (cmd, com, ch, addr)) and receives a Future. Replies resolve the oldest
+    pending Future with the same key, so several requests can be in flight
+    at once without a late reply being matched to the wrong caller.
+
+    `on_reply(key, seconds)`, if set, is called with the round-trip time of
+    every request completed by a reply.
+    """
+
+    def __init__(self, max_in_flight: int = 16):
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Deque[Tuple[float, int, Future, float]]] = {}
+        self._seq = 0
+        self._count = 0
+        self.on_reply: Optional[Callable[[Hashable, float], None]] = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._count
+
+    # -------------------------
+    # Registration
+    # -------------------------
+    def register(self, key: Hashable, timeout: float, block: bool = True) -> Optional[Future]:
+        """
+        Reserve an in-flight slot and return a Future for the reply to `key`.
+        Returns None if no slot became free within `timeout` seconds, or at
+        once when block=False.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        if not self._slots.acquire(block, timeout if block else None):
+            return None
+        fut: Future = Future()
+        fut.add_done_callback(self._release)
+        with self._lock:
+            self._seq += 1
+            self._pending.setdefault(key, deque()).append((deadline, self._seq, fut, started))
+            self._count += 1
+        return fut
+
+    def discard(self, key: Hashable, fut: Future):
+        """Forget a request that will not be answered (timed out, send failed)."""
+        with self._lock:
+            entries = self._pending.get(key)
+            if not entries:
+                return
+            for entry in entries:
+                if entry[2] is fut:
+                    entries.remove(entry)
+                    self._count -= 1
+                    break
+            if not entries:
+                del self._pending[key]
+
+    def _release(self, _fut: Future):
+        self._slots.release()
+
+    # -------------------------
+    # Completion
+    # -------------------------
+    def resolve(self, key: Hashable, reply) -> bool:
+        """Complete the oldest live request for `key`. Returns False if none was pending."""
+        if not self._count:
+            # Unsolicited replies (nothing in flight) skip the lock entirely.
+            return False
+        expired: List[Future] = []
+        fut = None
+        started = 0.0
+        now = time.monotonic()
+        with self._lock:
+            entries = self._pending.get(key)
+            while entries:
+                deadline, _, candidate, started = entries.popleft()
+                self._count -= 1
+                if deadline < now:
+                    expired.append(candidate)
+                    continue
+                fut = candidate
+                break
+            if entries is not None and not entries:
+                del self._pending[key]
+        self._fail(expired, FutureTimeoutError())
+        if fut is None:
+            return False
+        if self.on_reply is not None:
+            self.on_reply(key, now - started)
+        try:
+            fut.set_result(reply)
+        except InvalidStateError:
+            return False
+        return True
+
+    def resolve_oldest(self, cmd: int, reply) -> bool:
+        """
+        Complete the oldest request of a given command regardless of address.
+        Used for short replies that do not carry (com, ch, addr).
+        """
+        with self._lock:
+            oldest_key = None
+            oldest_seq = None
+            for key, entries in self._pending.items():
+                if key[0] == cmd and entries and (oldest_seq is None or entries[0][1] < oldest_seq):
+                    oldest_key, oldest_seq = key, entries[0][1]
+        if oldest_key is None:
+            return False
+        return self.resolve(oldest_key, reply)
+
+    def expire(self):
+        """Fail every request whose deadline has passed."""
+        now = time.monotonic()
+        expired: List[Future] = []
+        with self._lock:
+            if not self._count:
+                return
+            for key in list(self._pending):
+                entries = self._pending[key]
+                while entries and entries[0][0] < now:
+                    expired.append(entries.popleft()[2])
+                    self._count -= 1
+                if not entries:
+                    del self._pending[key]
+        self._fail(expired, FutureTimeoutError())
+
+    def fail_all(self, exc: BaseException):
+        """Fail every pending request, e.g. when the port is closed."""
+        with self._lock:
+            pending = [entry[2] for entries in self._pending.values() for entry in entries]
+            self._pending.clear()
+            self._count = 0
+        self._fail(pending, exc)
+
+    @staticmethod
+    def _fail(futures: List[Future], exc: BaseException):
+        for fut in futures:
+            try:
+                fut.set_exception(exc)
+            except InvalidStateError:
+                pass
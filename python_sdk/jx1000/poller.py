@@ -0,0 +1,346 @@
+"""
+Polling scheduler: many points, each with its own period and priority.
+
+A Poller keeps its points in a heap ordered by next due time. Its thread
+wakes at the earliest deadline, takes every point that is due, highest
+priority first, and reads up to `max_batch` of them in one batched
+request: a pipelined read_many for a JX1000Poller, merged register
+blocks for a ModbusPoller. Points left over stay due and go out in the
+next batch, so a slow point never delays a fast one by more than a batch.
+
+Only changes are delivered: a "PointChanged" event with a PointChange
+value is published when a point is first read and whenever it moves by
+more than its deadband from the last delivered value. point_stats()
+reports per-point staleness (time since the last good read), lateness
+and failures.
+
+    poller = JX1000Poller(drv)
+    poller.add((1, 1, 100), period=0.05, priority=10)
+    poller.add_many([(1, 2, a) for a in range(200)], period=2.0, deadband=0.1)
+    poller.subscribe(lambda cmd, change: print(change.key, change.value))
+    poller.start()
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from jx1000.events import EventBus
+from jx1000.modbus import MAX_READ_REGISTERS
+from jx1000.registers import decode_registers
+
+POINT_CHANGED = "PointChanged"
+
+
+class PointChange(NamedTuple):
+    key: Hashable
+    value: float
+    previous: Optional[float]
+    t: float
+
+
+class Point:
+    __slots__ = ("key", "period", "priority", "deadband", "next_due", "value", "delivered",
+                 "updated", "polls", "failures", "changes", "max_late", "removed")
+
+    def __init__(self, key, period: float, priority: int, deadband: float):
+        self.key = key
+        self.period = period
+        self.priority = priority
+        self.deadband = deadband
+        self.next_due = 0.0
+        self.value: Optional[float] = None       # last good read
+        self.delivered: Optional[float] = None   # last value published
+        self.updated: Optional[float] = None
+        self.polls = 0
+        self.failures = 0
+        self.changes = 0
+        self.max_late = 0.0
+        self.removed = False
+
+
+class Poller(ABC):
+    """
+    Scheduler core; subclasses implement _read(keys) -> [value or None].
+    Events go to `event_bus` with the poller as source.
+    """
+
+    def __init__(self, event_bus: Optional[EventBus] = None, max_batch: int = 64):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.events = event_bus if event_bus is not None else EventBus()
+        self.max_batch = max_batch
+        self.points: Dict[Hashable, Point] = {}
+        self.batches = 0
+        self.overruns = 0
+        self._heap: List[Tuple[float, int, int, Point]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------
+    # Points
+    # -------------------------
+    def add(self, key, period: float, priority: int = 0, deadband: float = 0.0):
+        """
+        Poll `key` every `period` seconds. Higher `priority` points go first
+        when more are due than fit in a batch. Re-adding a key replaces it.
+        """
+        self.add_many([key], period, priority, deadband)
+
+    def add_many(self, keys: Iterable, period: float, priority: int = 0, deadband: float = 0.0):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        if deadband < 0:
+            raise ValueError("deadband must not be negative")
+        keys = [self._check_key(key) for key in keys]
+        now = time.monotonic()
+        with self._cond:
+            for key in keys:
+                old = self.points.get(key)
+                if old is not None:
+                    old.removed = True
+                point = Point(key, period, priority, deadband)
+                point.next_due = now
+                self.points[key] = point
+                self._push(point)
+            self._cond.notify_all()
+
+    def remove(self, key):
+        with self._cond:
+            point = self.points.pop(key, None)
+            if point is not None:
+                point.removed = True
+
+    def _check_key(self, key):
+        return key
+
+    def _push(self, point: Point):
+        heapq.heappush(self._heap, (point.next_due, -point.priority, next(self._seq), point))
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def subscribe(self, callback: Callable, batch: bool = False):
+        """Call `callback(cmd, PointChange)` for this poller's changes; see EventBus.subscribe."""
+        return self.events.subscribe(callback, cmd=POINT_CHANGED, batch=batch, source=self)
+
+    def unsubscribe(self, sub):
+        self.events.unsubscribe(sub)
+
+    # -------------------------
+    # Control
+    # -------------------------
+    def start(self) -> "Poller":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="jx1000-poller", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    # -------------------------
+    # Scheduling thread
+    # -------------------------
+    def _due(self) -> Optional[List[Point]]:
+        """Wait for the next deadline and pop up to max_batch due points; None once stopped."""
+        with self._cond:
+            while self._running:
+                while self._heap and self._heap[0][3].removed:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                now = time.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    point = heapq.heappop(self._heap)[3]
+                    if not point.removed:
+                        due.append(point)
+                # Most important first, then most overdue; the rest wait for the next batch.
+                due.sort(key=lambda p: (-p.priority, p.next_due))
+                for point in due[self.max_batch:]:
+                    self._push(point)
+                return due[:self.max_batch]
+            return None
+
+    def _run(self):
+        while True:
+            due = self._due()
+            if due is None:
+                return
+            if not due:
+                continue
+            started = time.monotonic()
+            try:
+                values = self._read([p.key for p in due])
+            except Exception:
+                values = [None] * len(due)
+            now = time.monotonic()
+            self.batches += 1
+            with self._cond:
+                for point, value in zip(due, values):
+                    self._update(point, value, started, now)
+                    if point.removed:
+                        continue
+                    point.next_due += point.period
+                    if point.next_due <= now:
+                        # Fell a whole period behind: restart the grid rather than burst.
+                        self.overruns += 1
+                        point.next_due = now + point.period
+                    self._push(point)
+
+    def _update(self, point: Point, value: Optional[float], started: float, now: float):
+        point.polls += 1
+        late = started - point.next_due
+        if late > point.max_late:
+            point.max_late = late
+        if value is None or value != value:
+            point.failures += 1
+            return
+        point.value = value
+        point.updated = now
+        previous = point.delivered
+        if previous is not None and abs(value - previous) <= point.deadband:
+            return
+        point.delivered = value
+        point.changes += 1
+        self.events.publish(POINT_CHANGED, PointChange(point.key, value, previous, now), source=self)
+
+    @abstractmethod
+    def _read(self, keys: List) -> List[Optional[float]]:
+        """Read `keys` in one go; a value per key, None where the read failed."""
+
+    # -------------------------
+    # Statistics
+    # -------------------------
+    def value(self, key) -> Optional[float]:
+        """Last good value read for `key`, or None."""
+        point = self.points.get(key)
+        return point.value if point is not None else None
+
+    def point_stats(self) -> Dict[Hashable, dict]:
+        """Per point: period, age of the last good value (None if never read), worst lateness, counts."""
+        now = time.monotonic()
+        return {
+            key: {
+                "period": p.period,
+                "priority": p.priority,
+                "value": p.value,
+                "age_s": now - p.updated if p.updated is not None else None,
+                "max_late_ms": p.max_late * 1e3,
+                "polls": p.polls,
+                "failures": p.failures,
+                "changes": p.changes,
+            }
+            for key, p in list(self.points.items())
+        }
+
+    def stats(self) -> dict:
+        points = list(self.points.values())
+        ages = [time.monotonic() - p.updated for p in points if p.updated is not None]
+        return {
+            "points": len(points),
+            "never_read": len(points) - len(ages),
+            "max_age_s": max(ages) if ages else None,
+            "batches": self.batches,
+            "overruns": self.overruns,
+            "polls": sum(p.polls for p in points),
+            "failures": sum(p.failures for p in points),
+            "changes": sum(p.changes for p in points),
+        }
+
+
+class JX1000Poller(Poller):
+    """Polls (com, ch, addr) points through a JX1000Driver; events go to the driver's bus by default."""
+
+    def __init__(self, driver, max_batch: int = 64, timeout: int = 300,
+                 event_bus: Optional[EventBus] = None):
+        super().__init__(event_bus if event_bus is not None else driver.events, max_batch)
+        self.driver = driver
+        self.timeout = timeout
+
+    def _check_key(self, key):
+        com, ch, addr = key
+        return com, ch, addr
+
+    def _read(self, keys: List[Tuple[int, int, int]]) -> List[Optional[float]]:
+        return self.driver.read_many(keys, self.timeout)
+
+
+class ModbusPoller(Poller):
+    """
+    Polls holding-register values through a ModbusHelper. A key is the
+    first register of a `dtype` value (for mapped input N that is
+    1000 + (N - 1000) * 2). Due points are read as merged blocks, bridging
+    gaps of up to `max_gap` unused registers.
+    """
+
+    def __init__(self, helper, dtype="float32", wordorder: str = "big", byteorder: str = "big",
+                 max_gap: int = 8, max_batch: int = 256, event_bus: Optional[EventBus] = None):
+        super().__init__(event_bus, max_batch)
+        self.helper = helper
+        self.dtype = dtype
+        self.wordorder = wordorder
+        self.byteorder = byteorder
+        self.max_gap = max_gap
+        # Fails early on an unsupported dtype or order.
+        decode_registers([0] * 4, dtype, wordorder, byteorder)
+        self.width = np.dtype(dtype).itemsize // 2
+        self.requests = 0
+
+    def _check_key(self, key):
+        if not isinstance(key, int) or not 0 <= key <= 0xFFFF - self.width + 1:
+            raise ValueError(f"Invalid register address {key!r}")
+        return key
+
+    def plan(self, addresses: Iterable[int]) -> List[Tuple[int, int]]:
+        """Merge value addresses into (start, count) register blocks of at most MAX_READ_REGISTERS."""
+        blocks: List[Tuple[int, int]] = []
+        for address in sorted(set(addresses)):
+            end = address + self.width
+            if blocks:
+                start, count = blocks[-1]
+                if address - (start + count) <= self.max_gap and end - start <= MAX_READ_REGISTERS:
+                    blocks[-1] = (start, max(count, end - start))
+                    continue
+            blocks.append((address, self.width))
+        return blocks
+
+    def _read(self, keys: List[int]) -> List[Optional[float]]:
+        values: Dict[int, Optional[float]] = {}
+        for start, count in self.plan(keys):
+            self.requests += 1
+            registers, err = self.helper.read_registers(start, count)
+            if err:
+                continue
+            for address in keys:
+                offset = address - start
+                if 0 <= offset <= count - self.width:
+                    words = registers[offset:offset + self.width]
+                    values[address] = float(decode_registers(words, self.dtype, self.wordorder,
+                                                             self.byteorder)[0])
+        return [values.get(address) for address in keys]
@@ -0,0 +1,281 @@
+"""
+StationPool: many JX1000 and Modbus stations on a fixed set of threads.
+
+JX1000 stations are AsyncJX1000 clients on one event loop running in one
+background thread, so adding a station adds a transport, not a thread.
+Modbus stations keep the blocking ModbusHelper and share a small
+executor (one request at a time per station). All station events go to
+one EventBus, published with the Station as source; subscribe() filters
+by station name.
+
+Commands fan out to every station or a named subset and return
+{name: (result, err)}, like the ModbusHelper calls; a station that does
+not finish within the timeout gets (None, "Timed out after ...").
+
+    pool = StationPool()
+    for i, port in enumerate(ports):
+        pool.add_jx1000(f"fixture{i}", port)
+    pool.download_rules(image)
+    results = pool.run_tests(timeout=30)        # {"fixture0": ("{PASS}", None), ...}
+    values = pool.read_many([(1, 1, 100), (1, 2, 100)])
+    pool.close()
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from jx1000.aio import AsyncJX1000
+from jx1000.events import EventBus
+from jx1000.frames import EFRAME
+
+Results = Dict[str, Tuple[Any, Optional[str]]]
+
+
+class _StationError(RuntimeError):
+    """A station failed; the message is reported as-is in its (None, err) result."""
+
+
+class Station:
+    """One endpoint in the pool: an AsyncJX1000 (kind "jx1000") or a ModbusHelper (kind "modbus")."""
+
+    __slots__ = ("name", "kind", "client", "lock", "result_waiter")
+
+    def __init__(self, name: str, kind: str, client):
+        self.name = name
+        self.kind = kind
+        self.client = client
+        self.lock: Optional[asyncio.Lock] = None
+        self.result_waiter: Optional[asyncio.Future] = None
+
+
+class StationPool:
+
+    def __init__(self, modbus_workers: int = 4, timeout: float = 5.0,
+                 event_bus: Optional[EventBus] = None):
+        self.timeout = timeout
+        self._owns_events = event_bus is None
+        self.events = event_bus if event_bus is not None else EventBus()
+        self.stations: Dict[str, Station] = {}
+        self._executor = ThreadPoolExecutor(max_workers=modbus_workers,
+                                            thread_name_prefix="jx1000-modbus")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="jx1000-pool",
+                                        daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.stations
+
+    def _call(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine on the pool loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    # -------------------------
+    # Stations
+    # -------------------------
+    def add_jx1000(self, name: str, port: str, baud: int = 115200,
+                   max_in_flight: int = 16) -> bool:
+        """Open a JX1000 port on the pool loop. Returns False if the port could not be opened."""
+        if name in self.stations:
+            raise ValueError(f"Station {name!r} already exists")
+        client = AsyncJX1000(port, baud, max_in_flight=max_in_flight)
+        station = Station(name, "jx1000", client)
+        client.on_event = lambda cmd, value: self._on_event(station, cmd, value)
+        if not self._call(client.connect()):
+            return False
+        self.stations[name] = station
+        return True
+
+    def add_modbus(self, name: str, helper) -> bool:
+        """Add a connected ModbusHelper (see ModbusHelper.auto_connect / probe_modbus_ports)."""
+        if name in self.stations:
+            raise ValueError(f"Station {name!r} already exists")
+        if helper is None:
+            return False
+        self.stations[name] = Station(name, "modbus", helper)
+        return True
+
+    def remove(self, name: str):
+        station = self.stations.pop(name, None)
+        if station is None:
+            return
+        if station.kind == "jx1000":
+            self._call(station.client.close(), self.timeout)
+        else:
+            station.client.close()
+
+    def close(self):
+        """Close every station and stop the pool threads."""
+        for name in list(self.stations):
+            try:
+                self.remove(name)
+            except Exception:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(self.timeout)
+        self._loop.close()
+        # The loop is stopped, so calls still queued could not report back anyway.
+        self._executor.shutdown(wait=False)
+        if self._owns_events:
+            self.events.close()
+
+    def _select(self, names: Optional[Iterable[str]], kind: Optional[str]) -> List[Station]:
+        if names is None:
+            return [s for s in self.stations.values() if kind is None or s.kind == kind]
+        selected = []
+        for name in names:
+            station = self.stations.get(name)
+            if station is None:
+                raise ValueError(f"Unknown station {name!r}")
+            if kind is None or station.kind == kind:
+                selected.append(station)
+        return selected
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def _on_event(self, station: Station, cmd, value):
+        # Runs on the pool loop; publish() only enqueues.
+        if cmd == EFRAME.RES and value in ("{PASS}", "FAIL"):
+            waiter = station.result_waiter
+            if waiter is not None and not waiter.done():
+                waiter.set_result(str(value))
+        self.events.publish(cmd, value, source=station)
+
+    def subscribe(self, callback: Callable[[str, Any, Any], None],
+                  names: Optional[Iterable[str]] = None, cmd=None, batch: bool = False) -> list:
+        """
+        Call `callback(name, cmd, value)` for events of the selected stations
+        (or `callback(name, [(cmd, value), ...])` with batch=True). Returns
+        the bus subscriptions, for unsubscribe().
+        """
+        subs = []
+        for station in self._select(names, None):
+            def deliver(*args, _name=station.name):
+                callback(_name, *args)
+            subs.append(self.events.subscribe(deliver, cmd=cmd, batch=batch, source=station))
+        return subs
+
+    def unsubscribe(self, subs: list):
+        for sub in subs:
+            self.events.unsubscribe(sub)
+
+    # -------------------------
+    # Fan-out
+    # -------------------------
+    def run(self, fn: Callable[[Station], Awaitable], names: Optional[Iterable[str]] = None,
+            timeout: Optional[float] = None, kind: Optional[str] = None) -> Results:
+        """
+        Await `fn(station)` on the pool loop for each selected station at
+        once and return {name: (result, err)}. Each station has its own
+        `timeout`; one slow station does not delay the others' results.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        stations = self._select(names, kind)
+
+        async def one(station: Station):
+            try:
+                return await asyncio.wait_for(fn(station), timeout), None
+            except asyncio.TimeoutError:
+                return None, f"Timed out after {timeout:g} s"
+            except _StationError as e:
+                return None, str(e)
+            except Exception as e:
+                return None, f"{type(e).__name__}: {e}"
+
+        async def gather():
+            return await asyncio.gather(*(one(s) for s in stations))
+
+        results = self._call(gather())
+        return {station.name: result for station, result in zip(stations, results)}
+
+    def run_modbus(self, fn: Callable[[Any], Tuple[Any, Optional[str]]],
+                   names: Optional[Iterable[str]] = None,
+                   timeout: Optional[float] = None) -> Results:
+        """
+        Call `fn(helper)` for each Modbus station on the shared executor;
+        `fn` returns (result, err) like the ModbusHelper methods.
+        """
+        loop = self._loop
+
+        async def call(station: Station):
+            if station.lock is None:
+                station.lock = asyncio.Lock()
+            # The helper's client is not thread-safe: one request per station at a time.
+            async with station.lock:
+                result, err = await loop.run_in_executor(self._executor, fn, station.client)
+            if err:
+                raise _StationError(err)
+            return result
+
+        return self.run(call, names, timeout, kind="modbus")
+
+    # -------------------------
+    # JX1000 commands
+    # -------------------------
+    def get_info(self, names: Optional[Iterable[str]] = None, timeout: Optional[float] = None) -> Results:
+        return self.run(lambda s: s.client.get_info(), names, timeout, kind="jx1000")
+
+    def start_test(self, names: Optional[Iterable[str]] = None) -> Results:
+        return self.run(lambda s: s.client.start_test(), names, kind="jx1000")
+
+    def stop_test(self, names: Optional[Iterable[str]] = None) -> Results:
+        return self.run(lambda s: s.client.stop_test(), names, kind="jx1000")
+
+    def run_tests(self, names: Optional[Iterable[str]] = None, timeout: float = 60.0) -> Results:
+        """Start a test on each station and wait for its result: ("{PASS}" or "FAIL", None)."""
+        async def test(station: Station):
+            waiter = asyncio.get_running_loop().create_future()
+            station.result_waiter = waiter
+            try:
+                if not await station.client.start_test():
+                    raise _StationError("Send failed")
+                return await waiter
+            finally:
+                station.result_waiter = None
+
+        return self.run(test, names, timeout, kind="jx1000")
+
+    def download_rules(self, buf, names: Optional[Iterable[str]] = None, timeout: float = 120.0,
+                       unit_ids: Optional[Dict[str, str]] = None, **kwargs) -> Results:
+        """
+        Download one rule image to every selected station at once; (True, None)
+        per success. With delta=True, `unit_ids` maps station names to the unit
+        ids AsyncJX1000.download_rules needs; stations without one get the
+        whole image.
+        """
+        if "unit_id" in kwargs:
+            raise ValueError("unit_id differs per station; pass unit_ids={name: unit_id}")
+        unit_ids = unit_ids or {}
+
+        async def download(station: Station):
+            if not await station.client.download_rules(buf, unit_id=unit_ids.get(station.name),
+                                                       **kwargs):
+                raise _StationError("Rule download failed")
+            return True
+
+        return self.run(download, names, timeout, kind="jx1000")
+
+    def read_many(self, requests: Iterable[Tuple[int, int, int]],
+                  names: Optional[Iterable[str]] = None, timeout: Optional[float] = None,
+                  point_timeout: int = 300) -> Results:
+        """The same (com, ch, addr) points from every station: {name: ([values], err)}."""
+        requests = list(requests)
+        return self.run(lambda s: s.client.read_many(requests, point_timeout), names, timeout,
+                        kind="jx1000")
+
+    def write_many(self, requests: Iterable[Tuple[int, int, int, float]],
+                   names: Optional[Iterable[str]] = None, timeout: Optional[float] = None,
+                   point_timeout: int = 300) -> Results:
+        requests = list(requests)
+
+        async def write(station: Station):
+            return list(await asyncio.gather(*(station.client.write(com, ch, addr, value, point_timeout)
+                                               for com, ch, addr, value in requests)))
+
+        return self.run(write, names, timeout, kind="jx1000")
@@ -0,0 +1,192 @@
+"""
+Vectorized conversion between Modbus registers and 32/64-bit values.
+
+Registers are 16-bit words. A 32-bit value spans two registers and a
+64-bit value four. `wordorder` is the order of those registers ("big":
+most significant register first, the Modbus convention) and `byteorder`
+the order of the two bytes inside each register ("big" unless the
+device swaps bytes). Decoding and encoding work on whole arrays, so a
+block read of hundreds of registers is converted in one pass.
+
+Writes are planned here too: plan_writes() merges register writes into
+the fewest Write Multiple Registers (0x10) requests, and WriteQueue
+collapses bursts to the same register to its last value before sending.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+DTYPES = ("float32", "float64", "int32", "uint32")
+
+# Protocol limit for one write multiple registers (0x10) request.
+MAX_WRITE_REGISTERS = 123
+
+
+def _value_dtype(dtype) -> np.dtype:
+    dtype = np.dtype(dtype)
+    if dtype.name not in DTYPES:
+        raise ValueError(f"Unsupported register dtype {dtype.name}, expected one of {', '.join(DTYPES)}")
+    return dtype
+
+
+def _check_order(wordorder: str, byteorder: str):
+    for name, order in (("wordorder", wordorder), ("byteorder", byteorder)):
+        if order not in ("big", "little"):
+            raise ValueError(f"{name} must be 'big' or 'little', not {order!r}")
+
+
+def decode_registers(registers: Union[Iterable[int], np.ndarray], dtype="float32",
+                     wordorder: str = "big", byteorder: str = "big") -> np.ndarray:
+    """
+    Decode a flat register list or uint16 array into an array of `dtype`
+    (float32, float64, int32 or uint32), one value per 2 or 4 registers.
+    """
+    dtype = _value_dtype(dtype)
+    _check_order(wordorder, byteorder)
+    words = np.asarray(registers, dtype=np.uint16).ravel()
+    per_value = dtype.itemsize // 2
+    if len(words) % per_value:
+        raise ValueError(f"{len(words)} registers do not split into {dtype.name} values "
+                         f"of {per_value} registers")
+    words = words.reshape(-1, per_value)
+    if wordorder == "little":
+        words = words[:, ::-1]
+    # Lay the words out big-endian, so the bytes read as one big-endian value.
+    raw = np.ascontiguousarray(words, dtype=">u2" if byteorder == "big" else "<u2")
+    return raw.view(dtype.newbyteorder(">")).ravel().astype(dtype)
+
+
+def encode_registers(values, dtype="float32", wordorder: str = "big",
+                     byteorder: str = "big") -> np.ndarray:
+    """
+    Encode values as a flat uint16 register array, the inverse of decode_registers.
+    Use .tolist() for clients that expect a list of ints.
+    """
+    dtype = _value_dtype(dtype)
+    _check_order(wordorder, byteorder)
+    per_value = dtype.itemsize // 2
+    raw = np.asarray(values, dtype=dtype.newbyteorder(">")).ravel()
+    words = raw.view(">u2" if byteorder == "big" else "<u2").reshape(-1, per_value)
+    if wordorder == "little":
+        words = words[:, ::-1]
+    return words.astype(np.uint16).ravel()
+
+
+# -------------------------
+# Write planning
+# -------------------------
+def expand_writes(writes: Union[Mapping[int, float], Iterable[Tuple[int, float]]], dtype=None,
+                  wordorder: str = "big", byteorder: str = "big") -> Dict[int, int]:
+    """
+    {address: register} for `writes`, given as a mapping or (address, value)
+    pairs. Without `dtype` each value is one register and must be an integer
+    0-65535. With `dtype`, each value is encoded into 2 or 4 consecutive
+    registers starting at its address; later writes to a register win.
+    """
+    items = list(writes.items() if isinstance(writes, Mapping) else writes)
+    if dtype is None:
+        registers = {}
+        for address, value in items:
+            try:
+                register = int(value)
+            except (OverflowError, ValueError):
+                register = None
+            if register is None or register != value:
+                raise ValueError(f"Register value {value} at {address} is not an integer")
+            if not 0 <= register <= 0xFFFF:
+                raise ValueError(f"Register value {value} at {address} out of range 0-65535")
+            registers[int(address)] = register
+        return registers
+    dtype = _value_dtype(dtype)
+    per_value = dtype.itemsize // 2
+    words = encode_registers([value for _, value in items], dtype, wordorder, byteorder)
+    words = words.reshape(-1, per_value).tolist()
+    registers = {}
+    for (address, _), value_words in zip(items, words):
+        for i, word in enumerate(value_words):
+            registers[int(address) + i] = word
+    return registers
+
+
+def plan_writes(registers: Mapping[int, int],
+                max_per_request: int = MAX_WRITE_REGISTERS) -> List[Tuple[int, List[int]]]:
+    """Merge {address: register} into (start, values) runs of consecutive addresses."""
+    if not 1 <= max_per_request <= MAX_WRITE_REGISTERS:
+        raise ValueError(f"max_per_request must be 1-{MAX_WRITE_REGISTERS}")
+    runs: List[Tuple[int, List[int]]] = []
+    for address in sorted(registers):
+        if runs and runs[-1][0] + len(runs[-1][1]) == address and len(runs[-1][1]) < max_per_request:
+            runs[-1][1].append(registers[address])
+        else:
+            runs.append((address, [registers[address]]))
+    return runs
+
+
+class WriteQueue:
+    """
+    Pending register writes, coalesced per register until flushed.
+
+    `send(start, values)` performs one request and returns (ok, err) like
+    the ModbusHelper calls. flush() sends everything pending as merged
+    runs; with `interval` a background thread flushes that often, so a
+    burst of writes to the same register costs one transaction.
+    """
+
+    def __init__(self, send: Callable[[int, List[int]], Tuple[Optional[bool], Optional[str]]],
+                 max_per_request: int = MAX_WRITE_REGISTERS, interval: Optional[float] = None):
+        self.send = send
+        self.max_per_request = max_per_request
+        self.interval = interval
+        self.coalesced = 0
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if interval is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, address: int, value: float, dtype=None, wordorder: str = "big",
+            byteorder: str = "big"):
+        self.put_many([(address, value)], dtype, wordorder, byteorder)
+
+    def put_many(self, writes, dtype=None, wordorder: str = "big", byteorder: str = "big"):
+        registers = expand_writes(writes, dtype, wordorder, byteorder)
+        with self._lock:
+            self.coalesced += sum(1 for address in registers if address in self._pending)
+            self._pending.update(registers)
+
+    def flush(self) -> Tuple[Optional[bool], Optional[str]]:
+        """Send all pending writes. On error the unsent runs are put back and (None, err) returned."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            runs = plan_writes(pending, self.max_per_request)
+            for i, (start, values) in enumerate(runs):
+                ok, err = self.send(start, values)
+                if not ok:
+                    with self._lock:
+                        for run_start, run_values in runs[i:]:
+                            for offset, value in enumerate(run_values):
+                                # Keep newer values queued while this flush was running.
+                                self._pending.setdefault(run_start + offset, value)
+                    return None, err
+            return True, None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self._pending:
+                self.flush()
+
+    def close(self):
+        """Stop the background thread and send what is still pending."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.flush()
@@ -0,0 +1,116 @@
+"""
+Fixed-capacity ring of NumPy records: one writer, lock-free readers.
+
+The ring lives in any writable buffer: a bytearray in-process, or a
+multiprocessing.shared_memory block shared by a writer and a reader in
+different processes. Layout:
+
+    u64 written    records published so far
+    u64 claimed    records the writer has started to write
+    capacity records of `dtype`
+
+The writer bumps `claimed`, copies the records, then publishes
+`written`. A reader copies the slots it wants and re-reads `claimed`
+afterwards; slots the writer may have reused during the copy are
+dropped and counted as lost, so a reader never returns a torn record
+and never blocks the writer.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+HEADER_SIZE = 16
+
+
+class RecordRing:
+
+    def __init__(self, dtype, capacity: int, buf=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        if buf is None:
+            buf = bytearray(self.nbytes(self.dtype, capacity))
+        elif len(buf) < self.nbytes(self.dtype, capacity):
+            raise ValueError(f"Buffer of {len(buf)} bytes is too small for {capacity} records")
+        self._header = np.ndarray(2, np.uint64, buf, 0)
+        self.records = np.ndarray(capacity, self.dtype, buf, HEADER_SIZE)
+
+    @staticmethod
+    def nbytes(dtype, capacity: int) -> int:
+        """Buffer size needed for `capacity` records of `dtype`."""
+        return HEADER_SIZE + np.dtype(dtype).itemsize * capacity
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    @property
+    def written(self) -> int:
+        return int(self._header[0])
+
+    def release(self):
+        """Drop the views of the buffer, e.g. before closing a SharedMemory block."""
+        self._header = None
+        self.records = None
+
+    # -------------------------
+    # Writer
+    # -------------------------
+    def push(self, records: np.ndarray):
+        """Append records (an array of `dtype`); the oldest are overwritten when full."""
+        records = np.asarray(records, dtype=self.dtype)
+        n = len(records)
+        if not n:
+            return
+        cap = self.capacity
+        w = int(self._header[0])
+        end = w + n
+        if n > cap:
+            records = records[-cap:]
+            w = end - cap
+            n = cap
+        self._header[1] = end
+        i = w % cap
+        first = min(n, cap - i)
+        self.records[i:i + first] = records[:first]
+        if first < n:
+            self.records[:n - first] = records[first:]
+        self._header[0] = end
+
+    # -------------------------
+    # Readers
+    # -------------------------
+    def _copy(self, start: int, end: int) -> Tuple[np.ndarray, int]:
+        """Records start..end-1 and how many leading ones were overwritten during the copy."""
+        cap = self.capacity
+        i, j = start % cap, end % cap
+        if end - start == 0:
+            out = self.records[:0].copy()
+        elif i < j:
+            out = self.records[i:j].copy()
+        else:
+            out = np.concatenate((self.records[i:], self.records[:j]))
+        overrun = int(self._header[1]) - cap - start
+        if overrun > 0:
+            out = out[min(overrun, len(out)):]
+            return out, min(overrun, end - start)
+        return out, 0
+
+    def read(self, cursor: int) -> Tuple[np.ndarray, int, int]:
+        """
+        Records published since `cursor` (a previous return value, 0 at
+        first). Returns (records, new_cursor, lost), where `lost` counts
+        records overwritten before they could be read.
+        """
+        w = self.written
+        start = max(cursor, w - self.capacity)
+        out, overrun = self._copy(start, w)
+        return out, w, start - cursor + overrun
+
+    def snapshot(self, n: Optional[int] = None) -> np.ndarray:
+        """Copy of the latest `n` records (all retained ones by default), oldest first."""
+        w = self.written
+        n = min(w, self.capacity) if n is None else min(n, w, self.capacity)
+        out, _ = self._copy(w - n, w)
+        return out
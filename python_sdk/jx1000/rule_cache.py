@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from jx1000.messages import InfoReply
+from jx1000.transfer import DEFAULT_CHUNK
+
+
+class RuleImageCache:
+    """
+    On-disk record of the last rule image each device accepted.
+
+    Entries are keyed by a caller-supplied unit id and the device's Info
+    fingerprint, and hold the image plus its SHA-256, so a later download
+    can send only the blocks that changed. The Info reply carries no
+    serial number, so the unit id is what tells two units of one model
+    apart. A missing, corrupt or expired entry, or one of another length,
+    yields a full download. Nothing is written unless a download asks
+    for a delta.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_age: Optional[float] = None):
+        self.directory = Path(directory) if directory else Path.home() / ".jx1000" / "rule_cache"
+        self.max_age = max_age
+
+    @staticmethod
+    def key(unit_id: str, info: InfoReply) -> str:
+        parts = [str(unit_id)] + [str(getattr(info, k, "")) for k in ("HardType", "Version", "ComNumber", "BoardCount")]
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", "-".join(parts))
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.directory / f"{key}.bin", self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[bytes]:
+        image_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            image = image_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if hashlib.sha256(image).hexdigest() != meta.get("sha256"):
+            return None
+        if self.max_age is not None and time.time() - meta.get("time", 0) > self.max_age:
+            return None
+        return image
+
+    def store(self, key: str, image):
+        image_path, meta_path = self._paths(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = image_path.with_suffix(".tmp")
+        tmp.write_bytes(image)
+        os.replace(tmp, image_path)
+        meta = {"sha256": hashlib.sha256(image).hexdigest(), "size": len(image), "time": time.time()}
+        meta_path.write_text(json.dumps(meta))
+
+    def delta_ranges(self, key: str, image) -> Optional[List[Tuple[int, int]]]:
+        """Ranges of `image` to send, or None for a full download (no usable record, or the length changed)."""
+        cached = self.load(key)
+        if cached is None or len(cached) != len(image):
+            return None
+        return self.diff(cached, image)
+
+    def invalidate(self, key: str):
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def diff(old, new, block: int = DEFAULT_CHUNK) -> List[Tuple[int, int]]:
+        """
+        Byte ranges of `new` that differ from `old`, at `block` granularity.
+        Adjacent changed blocks are merged into one range.
+        """
+        old, new = memoryview(old).cast("B"), memoryview(new).cast("B")
+        ranges: List[Tuple[int, int]] = []
+        for start in range(0, len(new), block):
+            end = min(start + block, len(new))
+            if old[start:end] == new[start:end]:
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
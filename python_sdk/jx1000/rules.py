@@ -0,0 +1,226 @@
+"""
+Parser and compiler for .jx1000 rule tables.
+
+A rule image is a sequence of sections. Each section starts with an
+8-byte header, optionally followed by an index table, then `count`
+fixed-size records:
+
+    header   tag u8 | count u16 | index_end u16 | length u16 | '*' (0x2A)
+    index    count x (record index u16 | record offset u16 | '.' (0x2E))
+    records  count x (record index u16 | body | CRC-16/KERMIT u16)
+
+`index_end` is the offset of the first record (0 when the section has no
+index table), `length` the size of the whole section. Offsets in the
+index table are relative to the first record. All integers are little
+endian, matching the C# CBuf writer. The '#' section holds the 46-byte
+channel records ("Ch 1", "Ch 2", ...).
+
+Records are held in NumPy structured arrays, so parsing, CRC checking
+and compiling are whole-array operations rather than per-field packing.
+
+Sizes are bounded by the format: a section's 16-bit `length` allows at
+most MAX_CHANNELS (1284) indexed channel records, and RuleDown's 16-bit
+offset caps the whole image at 64 KiB, so splitting channels across
+several sections would not raise the total.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from jx1000.crc import KERMIT_TABLE
+
+CHANNEL_TAG = 0x23
+SECTION_MARK = 0x2A
+INDEX_SEP = 0x2E
+
+HEADER_DTYPE = np.dtype([
+    ("tag", "u1"), ("count", "<u2"), ("index_end", "<u2"), ("length", "<u2"), ("mark", "u1"),
+])
+INDEX_DTYPE = np.dtype([("index", "<u2"), ("offset", "<u2"), ("sep", "u1")])
+CHANNEL_DTYPE = np.dtype([
+    ("index", "<u2"),
+    ("kind", "u1"),
+    ("flags", "u1"),
+    ("name", "S10"),
+    ("params", "u1", (30,)),
+    ("crc", "<u2"),
+])
+# Channel records that fit one indexed section (16-bit section length).
+MAX_CHANNELS = (0xFFFF - HEADER_DTYPE.itemsize) // (CHANNEL_DTYPE.itemsize + INDEX_DTYPE.itemsize)
+
+
+def record_dtype(size: int) -> np.dtype:
+    """Generic layout for records of a section whose body is not decoded."""
+    if size < 4:
+        raise ValueError(f"Record size {size} too small")
+    return np.dtype([("index", "<u2"), ("body", "u1", (size - 4,)), ("crc", "<u2")])
+
+
+_KERMIT = np.array(KERMIT_TABLE, dtype=np.uint16)
+
+
+def record_crcs(records: np.ndarray) -> np.ndarray:
+    """CRC-16/KERMIT of every record (excluding its CRC field), one pass per byte column."""
+    raw = records.view(np.uint8).reshape(len(records), records.dtype.itemsize)[:, :-2]
+    crc = np.zeros(len(records), dtype=np.uint16)
+    for column in raw.T:
+        crc = (crc >> 8) ^ _KERMIT[(crc ^ column) & 0xFF]
+    return crc
+
+
+class RuleSection:
+
+    def __init__(self, tag: int, records: np.ndarray, has_index: bool = True):
+        self.tag = tag
+        self.records = records
+        self.has_index = has_index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def record_size(self) -> int:
+        return self.records.dtype.itemsize
+
+    @property
+    def names(self) -> List[str]:
+        if "name" not in self.records.dtype.names:
+            return []
+        return [n.decode("ascii", errors="replace") for n in self.records["name"]]
+
+    # -------------------------
+    # Parse
+    # -------------------------
+    @classmethod
+    def parse(cls, data, offset: int = 0, verify_crc: bool = True) -> "RuleSection":
+        if len(data) - offset < HEADER_DTYPE.itemsize:
+            raise ValueError(f"Truncated section header at {offset}")
+        hdr = np.frombuffer(data, HEADER_DTYPE, 1, offset)[0]
+        tag, count = int(hdr["tag"]), int(hdr["count"])
+        index_end, length = int(hdr["index_end"]), int(hdr["length"])
+        if hdr["mark"] != SECTION_MARK:
+            raise ValueError(f"Section at {offset}: missing 0x2A marker")
+        if offset + length > len(data):
+            raise ValueError(f"Section at {offset}: length {length} runs past end of image")
+        if count == 0:
+            raise ValueError(f"Section at {offset}: no records")
+
+        has_index = index_end != 0
+        first = index_end if has_index else HEADER_DTYPE.itemsize
+        if has_index and first != HEADER_DTYPE.itemsize + count * INDEX_DTYPE.itemsize:
+            raise ValueError(f"Section at {offset}: index table size does not match count {count}")
+        size, rem = divmod(length - first, count)
+        if rem or size < 4:
+            raise ValueError(f"Section at {offset}: {length - first} record bytes do not split into {count} records")
+
+        dtype = CHANNEL_DTYPE if tag == CHANNEL_TAG and size == CHANNEL_DTYPE.itemsize else record_dtype(size)
+        records = np.frombuffer(data, dtype, count, offset + first).copy()
+
+        if has_index:
+            index = np.frombuffer(data, INDEX_DTYPE, count, offset + HEADER_DTYPE.itemsize)
+            if np.any(index["sep"] != INDEX_SEP):
+                raise ValueError(f"Section at {offset}: malformed index table")
+            expected = np.arange(count, dtype=np.int64) * size
+            bad = np.flatnonzero(index["offset"] != expected)
+            if len(bad):
+                raise ValueError(f"Section at {offset}: index entry {bad[0]} points to offset "
+                                 f"{index['offset'][bad[0]]}, expected {expected[bad[0]]}")
+            if np.any(index["index"] != records["index"]):
+                raise ValueError(f"Section at {offset}: index table does not match record indices")
+        if verify_crc:
+            bad = np.flatnonzero(record_crcs(records) != records["crc"])
+            if len(bad):
+                raise ValueError(f"Section at {offset}: CRC mismatch in record {records['index'][bad[0]]}")
+        return cls(tag, records, has_index)
+
+    # -------------------------
+    # Compile
+    # -------------------------
+    def to_bytes(self) -> bytes:
+        count = len(self.records)
+        if not count:
+            raise ValueError("Cannot compile an empty section")
+        index_end = HEADER_DTYPE.itemsize + count * INDEX_DTYPE.itemsize if self.has_index else 0
+        first = index_end or HEADER_DTYPE.itemsize
+        length = first + count * self.record_size
+        if length > 0xFFFF:
+            raise ValueError(f"Section of {count} records exceeds the 16-bit length field")
+
+        self.records["crc"] = record_crcs(self.records)
+        hdr = np.array([(self.tag, count, index_end, length, SECTION_MARK)], dtype=HEADER_DTYPE)
+        parts = [hdr.tobytes()]
+        if self.has_index:
+            index = np.empty(count, dtype=INDEX_DTYPE)
+            index["index"] = self.records["index"]
+            index["offset"] = np.arange(count) * self.record_size
+            index["sep"] = INDEX_SEP
+            parts.append(index.tobytes())
+        parts.append(self.records.tobytes())
+        return b"".join(parts)
+
+
+class RuleTable:
+    """
+    A rule image as a list of sections. The compiled image is limited to
+    64 KiB (the RuleDown offset range), about 1280 channels in all.
+    """
+
+    def __init__(self, sections: Optional[List[RuleSection]] = None):
+        self.sections: List[RuleSection] = sections or []
+
+    @property
+    def channels(self) -> Optional[RuleSection]:
+        for section in self.sections:
+            if section.tag == CHANNEL_TAG:
+                return section
+        return None
+
+    @classmethod
+    def parse(cls, data, verify_crc: bool = True) -> "RuleTable":
+        sections = []
+        offset = 0
+        while offset < len(data):
+            section = RuleSection.parse(data, offset, verify_crc)
+            sections.append(section)
+            offset += int(np.frombuffer(data, HEADER_DTYPE, 1, offset)[0]["length"])
+        if not sections:
+            raise ValueError("Empty rule image")
+        return cls(sections)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], verify_crc: bool = True) -> "RuleTable":
+        return cls.parse(Path(path).read_bytes(), verify_crc)
+
+    def to_bytes(self) -> bytes:
+        image = b"".join(section.to_bytes() for section in self.sections)
+        if len(image) > 0x10000:
+            raise ValueError(f"Rule image of {len(image)} bytes exceeds the 16-bit RuleDown offset range")
+        return image
+
+    def save(self, path: Union[str, Path]):
+        Path(path).write_bytes(self.to_bytes())
+
+
+def build_channels(count: int, params=None, names: Optional[Sequence[str]] = None,
+                   first_index: int = 1, kind: int = 0x50, flags: int = 0x07) -> RuleSection:
+    """
+    Build a channel section of `count` records in one vectorized pass.
+
+    `params` may be a 30-byte template shared by every channel or a
+    (count, 30) array; names default to "Ch 1", "Ch 2", ...
+    At most MAX_CHANNELS (1284) channels fit one section.
+    """
+    if not 1 <= count <= MAX_CHANNELS:
+        raise ValueError(f"Channel count must be 1-{MAX_CHANNELS}; one section's length field is 16-bit")
+    records = np.zeros(count, dtype=CHANNEL_DTYPE)
+    records["index"] = np.arange(first_index, first_index + count)
+    records["kind"] = kind
+    records["flags"] = flags
+    if names is None:
+        names = np.char.add("Ch ", np.arange(first_index, first_index + count).astype(str))
+    records["name"] = np.char.encode(np.asarray(names, dtype=str), "ascii")
+    if params is not None:
+        records["params"] = np.asarray(params, dtype=np.uint8)
+    return RuleSection(CHANNEL_TAG, records, has_index=True)
@@ -0,0 +1,169 @@
+"""
+Continuous sampling of a fixed set of points into a NumPy ring.
+
+Sampler sends one sweep (a pipelined DevRead for every point) every
+1/rate seconds from its own thread and keeps up to `max_sweeps` sweeps in
+flight, so the rate is bounded by the link rather than by the round trip.
+Each completed sweep becomes one record in a preallocated RecordRing: the
+monotonic send time and a float32 value per point (NaN when the point got
+no reply or the device reported an error). Readers take lock-free
+snapshots while sampling continues.
+
+A sweep that cannot start within one period of its deadline (the window
+is full or the device is slow) is skipped and counted in `missed`; the
+schedule stays on the original time grid.
+
+    sampler = Sampler(drv, [(1, 1, 100), (1, 2, 100)], rate=200).start()
+    t, values = sampler.arrays(1000)      # latest 1000 sweeps, values[:, point]
+    print(sampler.stats())
+    sampler.stop()
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, wait
+from typing import Deque, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from jx1000.ring import RecordRing
+
+
+class Sampler:
+
+    def __init__(self, driver, points: Iterable[Tuple[int, int, int]], rate: float,
+                 capacity: int = 1 << 16, max_sweeps: int = 4, timeout: int = 300):
+        self.driver = driver
+        self.points = [tuple(p) for p in points]
+        if not self.points:
+            raise ValueError("Sampler needs at least one point")
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.max_sweeps = max(1, max_sweeps)
+        self.timeout = timeout
+        self.dtype = np.dtype([("t", "f8"), ("value", "f4", (len(self.points),))])
+        self.ring = RecordRing(self.dtype, capacity)
+
+        self.sweeps = 0
+        self.missed = 0
+        self.failed_points = 0
+        self.max_lateness = 0.0
+        self._started: Optional[float] = None
+        self._stopped: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------
+    # Control
+    # -------------------------
+    def start(self) -> "Sampler":
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._stopped = None
+        self._thread = threading.Thread(target=self._run, name="jx1000-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sending; sweeps already in flight are completed and stored."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -------------------------
+    # Sampling thread
+    # -------------------------
+    def _run(self):
+        inflight: Deque[Tuple[float, List[Future]]] = deque()
+        row = np.zeros(1, self.dtype)
+        next_due = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                # Store finished sweeps in send order.
+                while inflight and all(f.done() for f in inflight[0][1]):
+                    self._store(row, *inflight.popleft())
+                now = time.monotonic()
+                if now < next_due:
+                    time.sleep(next_due - now)
+                    continue
+                if len(inflight) >= self.max_sweeps:
+                    # Window full: wait for the oldest sweep; deadlines passing meanwhile are missed.
+                    wait(inflight[0][1], timeout=self.period)
+                    continue
+                late = now - next_due
+                if late > self.period:
+                    skipped = int(late // self.period)
+                    self.missed += skipped
+                    next_due += skipped * self.period
+                    late -= skipped * self.period
+                if late > self.max_lateness:
+                    self.max_lateness = late
+                inflight.append((now, self.driver.submit_read_many(self.points, self.timeout)))
+                next_due += self.period
+        finally:
+            for t, futures in inflight:
+                wait(futures, timeout=self.timeout * 0.001 + 0.1)
+                self._store(row, t, futures)
+            self._stopped = time.monotonic()
+
+    def _store(self, row: np.ndarray, t: float, futures: List[Future]):
+        values = row["value"][0]
+        timed_out = 0
+        for i, fut in enumerate(futures):
+            try:
+                reply = fut.result(0)
+            except FutureTimeoutError:
+                reply = None
+                timed_out += 1
+            except Exception:
+                reply = None
+            if reply is None or reply.result != 0:
+                values[i] = np.nan
+                self.failed_points += 1
+            else:
+                values[i] = reply.value
+        if timed_out:
+            self.driver.stats.timed_out(timed_out)
+        row["t"][0] = t
+        self.ring.push(row)
+        self.sweeps += 1
+
+    # -------------------------
+    # Readers
+    # -------------------------
+    def snapshot(self, n: Optional[int] = None) -> np.ndarray:
+        """Copy of the latest `n` sweeps (all retained by default) as records (t, value[points])."""
+        return self.ring.snapshot(n)
+
+    def arrays(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Latest sweeps as (t, values) with values[sweep, point]."""
+        records = self.ring.snapshot(n)
+        return records["t"], records["value"]
+
+    def read(self, cursor: int = 0) -> Tuple[np.ndarray, int, int]:
+        """Sweeps since `cursor`, for streaming consumers; see RecordRing.read."""
+        return self.ring.read(cursor)
+
+    def stats(self) -> dict:
+        end = self._stopped if self._stopped is not None else time.monotonic()
+        elapsed = end - self._started if self._started is not None else 0.0
+        return {
+            "rate": self.rate,
+            "achieved_rate": self.sweeps / elapsed if elapsed else 0.0,
+            "points_per_s": self.sweeps * len(self.points) / elapsed if elapsed else 0.0,
+            "sweeps": self.sweeps,
+            "missed": self.missed,
+            "failed_points": self.failed_points,
+            "max_lateness_ms": self.max_lateness * 1e3,
+            "retained": len(self.ring),
+        }
@@ -0,0 +1,533 @@
+"""
+ShardedStationPool: stations split across worker processes.
+
+Each worker process runs its own StationPool for its share of the ports,
+so frame parsing, decoding and event handling of different shards run on
+different cores instead of behind one GIL. The coordinator talks to each
+worker over:
+
+    a control pipe   commands and their small results, plus test/log
+                     events (DevRead/DevWrite events stay in the worker)
+    a shared-memory  RecordRing of measurement records (MEASUREMENT_DTYPE)
+    ring             written by the worker, read by the coordinator
+
+read_many results and continuous polling (start_polling) travel through
+the ring; measurements() returns everything polled since the last call.
+The coordinator exposes the StationPool API and returns the same
+{name: (result, err)} results.
+
+    pool = ShardedStationPool({f"fixture{i}": port for i, port in enumerate(ports)})
+    pool.run_tests(timeout=30)
+    pool.start_polling([(1, 1, 100), (1, 2, 100)], interval=0.05)
+    records = pool.measurements()       # structured array, see MEASUREMENT_DTYPE
+    pool.close()
+
+Workers are started with the "spawn" method, so code creating the pool
+must be guarded by `if __name__ == "__main__":` on every platform.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from jx1000.events import EventBus
+from jx1000.frames import EFRAME
+from jx1000.ring import RecordRing
+
+Results = Dict[str, Tuple[Any, Optional[str]]]
+
+# One measured point. `tag` is 0 for polled samples and the request id for read_many.
+MEASUREMENT_DTYPE = np.dtype([
+    ("t", "f8"),          # time.monotonic() in the worker when the values were collected
+    ("station", "u2"),    # index into ShardedStationPool.station_names
+    ("com", "u1"),
+    ("ch", "u1"),
+    ("addr", "u2"),
+    ("status", "i2"),     # 0 ok, -3 no reply
+    ("value", "f4"),      # NaN without a reply
+    ("tag", "u4"),
+])
+
+
+# -------------------------
+# Worker process
+# -------------------------
+class _Worker:
+
+    def __init__(self, conn, shm_name: str, capacity: int, timeout: float):
+        from jx1000.pool import StationPool
+
+        self.conn = conn
+        self.shm = SharedMemory(name=shm_name)
+        self.ring = RecordRing(MEASUREMENT_DTYPE, capacity, self.shm.buf)
+        self.pool = StationPool(timeout=timeout)
+        self.index: Dict[str, int] = {}
+        self._send_lock = threading.Lock()
+        self._ring_lock = threading.Lock()
+        self._polling: Optional[asyncio.Future] = None
+
+    def send(self, *msg):
+        with self._send_lock:
+            self.conn.send(msg)
+
+    def _forward_event(self, name: str, cmd, value):
+        if cmd in (EFRAME.DevRead, EFRAME.DevWrite):
+            return
+        try:
+            self.send("event", name, cmd, value)
+        except Exception:
+            pass
+
+    def push(self, tag: int, names: List[str], requests: List[Tuple[int, int, int]], results: Results):
+        now = time.monotonic()
+        rows = []
+        for name in names:
+            station = self.index.get(name)
+            if station is None:
+                continue    # removed meanwhile
+            values, err = results.get(name, (None, "No result"))
+            if values is None:
+                values = [None] * len(requests)
+            for (com, ch, addr), value in zip(requests, values):
+                ok = value is not None
+                rows.append((now, station, com, ch, addr, 0 if ok else -3,
+                             value if ok else np.nan, tag))
+        records = np.array(rows, dtype=MEASUREMENT_DTYPE)
+        if len(records) > self.ring.capacity:
+            # Too big for the ring: return it through the pipe instead.
+            return records
+        with self._ring_lock:
+            self.ring.push(records)
+        return None
+
+    # Commands, called on their own thread so a long test does not block the pipe.
+    def handle(self, req_id: int, op: str, args: tuple, kwargs: dict):
+        try:
+            result = getattr(self, "op_" + op)(req_id, *args, **kwargs)
+            self.send("reply", req_id, result, None)
+        except Exception as e:
+            self.send("reply", req_id, None, f"{type(e).__name__}: {e}")
+
+    def op_add(self, _req_id, name: str, index: int, port: str, baud: int):
+        self.index[name] = index
+        ok = self.pool.add_jx1000(name, port, baud)
+        if ok:
+            self.pool.subscribe(self._forward_event, names=[name])
+        return ok
+
+    def op_remove(self, _req_id, name: str):
+        self.pool.remove(name)
+        self.index.pop(name, None)
+        return True
+
+    def op_call(self, _req_id, method: str, *args, **kwargs):
+        return getattr(self.pool, method)(*args, **kwargs)
+
+    def op_read_many(self, req_id, requests, names, timeout, point_timeout):
+        results = self.pool.read_many(requests, names, timeout, point_timeout)
+        overflow = self.push(req_id, list(results), requests, results)
+        return {name: err for name, (_, err) in results.items()}, overflow
+
+    def op_start_polling(self, _req_id, requests, interval: float, names):
+        self.op_stop_polling(_req_id)
+        pool = self.pool
+
+        async def read(name: str):
+            station = pool.stations.get(name)
+            if station is None:
+                # Removed while polling: report it once and stop polling it.
+                selected.remove(name)
+                self._forward_event(name, EFRAME.RES, "Polling stopped: station removed")
+                return None
+            try:
+                return await station.client.read_many(requests)
+            except Exception as e:
+                self._forward_event(name, EFRAME.RES, f"Polling failed: {type(e).__name__}: {e}")
+                return None
+
+        async def poll():
+            next_due = time.monotonic()
+            while selected:
+                # Each point has its own reply timeout, so a dead station cannot stall the others.
+                names = list(selected)
+                results = await asyncio.gather(*(read(name) for name in names))
+                self.push(0, names, requests, {name: (values, None)
+                                               for name, values in zip(names, results)})
+                next_due += interval
+                await asyncio.sleep(max(0.0, next_due - time.monotonic()))
+
+        selected = [s.name for s in pool._select(names, "jx1000")]
+        self._polling = asyncio.run_coroutine_threadsafe(poll(), pool._loop)
+        return len(selected)
+
+    def op_stop_polling(self, _req_id):
+        if self._polling is not None:
+            self._polling.cancel()
+            self._polling = None
+        return True
+
+    def run(self):
+        try:
+            while True:
+                try:
+                    msg = self.conn.recv()
+                except (EOFError, OSError):
+                    break
+                if msg is None:
+                    break
+                req_id, op, args, kwargs = msg
+                threading.Thread(target=self.handle, args=(req_id, op, args, kwargs),
+                                 daemon=True).start()
+        finally:
+            self.op_stop_polling(0)
+            self.pool.close()
+            self.ring.release()
+            self.shm.close()
+
+
+def _worker_main(conn, shm_name: str, capacity: int, timeout: float):
+    _Worker(conn, shm_name, capacity, timeout).run()
+
+
+# -------------------------
+# Coordinator
+# -------------------------
+class _Shard:
+
+    def __init__(self, ctx, capacity: int, timeout: float):
+        self.shm = SharedMemory(create=True, size=RecordRing.nbytes(MEASUREMENT_DTYPE, capacity))
+        self.ring = RecordRing(MEASUREMENT_DTYPE, capacity, self.shm.buf)
+        self.cursor = 0
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, self.shm.name, capacity, timeout),
+                                   name="jx1000-shard", daemon=True)
+        self.process.start()
+        child.close()
+        self.names: List[str] = []
+
+
+class _ShardStation:
+    """Event source for one station; subscribe() filters on these."""
+
+    __slots__ = ("name", "shard")
+
+    def __init__(self, name: str, shard: _Shard):
+        self.name = name
+        self.shard = shard
+
+
+class ShardedStationPool:
+
+    def __init__(self, stations: Union[Mapping[str, str], Iterable[Tuple[str, str]]] = (),
+                 workers: Optional[int] = None, baud: int = 115200, timeout: float = 5.0,
+                 ring_capacity: int = 1 << 16, event_bus: Optional[EventBus] = None):
+        stations = list(stations.items() if isinstance(stations, Mapping) else stations)
+        if workers is None:
+            workers = max(1, min(os.cpu_count() or 1, len(stations) or 1))
+        self.baud = baud
+        self.timeout = timeout
+        self._owns_events = event_bus is None
+        self.events = event_bus if event_bus is not None else EventBus()
+        self.station_names: List[str] = []
+        self.stations: Dict[str, _ShardStation] = {}
+        self.lost = 0
+        self._samples: List[np.ndarray] = []
+        # read_many records by request id, kept until their caller collects them.
+        # Records of a request nobody waits for any more (timed out) are dropped.
+        self._tagged: Dict[int, List[np.ndarray]] = {}
+        self._awaiting: set = set()
+        self._ring_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._futures: Dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+
+        ctx = multiprocessing.get_context("spawn")
+        self._shards = [_Shard(ctx, ring_capacity, timeout) for _ in range(workers)]
+        self._reader = threading.Thread(target=self._read_replies, name="jx1000-shards", daemon=True)
+        self._reader.start()
+        for name, port in stations:
+            self.add_jx1000(name, port)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.stations
+
+    # -------------------------
+    # Control channel
+    # -------------------------
+    def _send(self, shard: _Shard, op: str, *args, **kwargs) -> Tuple[int, Future]:
+        req_id = next(self._ids)
+        fut: Future = Future()
+        self._futures[req_id] = fut
+        with self._send_lock:
+            shard.conn.send((req_id, op, args, kwargs))
+        return req_id, fut
+
+    def _read_replies(self):
+        conns = {shard.conn: shard for shard in self._shards}
+        while conns:
+            for conn in connection.wait(list(conns)):
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    del conns[conn]
+                    continue
+                if msg[0] == "reply":
+                    _, req_id, result, err = msg
+                    fut = self._futures.pop(req_id, None)
+                    if fut is not None:
+                        fut.set_result((result, err))
+                elif msg[0] == "event":
+                    _, name, cmd, value = msg
+                    station = self.stations.get(name)
+                    self.events.publish(cmd, value, source=station)
+        for fut in list(self._futures.values()):
+            if not fut.done():
+                fut.set_result((None, "Worker process exited"))
+
+    def _wait(self, request: Tuple[int, Future], timeout: Optional[float]):
+        """Wait for the reply to a _send(); a late reply after a timeout is discarded."""
+        req_id, fut = request
+        try:
+            return fut.result(timeout)
+        except Exception:
+            return None, "Timed out waiting for worker"
+        finally:
+            self._futures.pop(req_id, None)
+
+    def _by_shard(self, names: Optional[Iterable[str]]) -> Dict[_Shard, Optional[List[str]]]:
+        if names is None:
+            return {shard: None for shard in self._shards if shard.names}
+        grouped: Dict[_Shard, Optional[List[str]]] = {}
+        for name in names:
+            station = self.stations.get(name)
+            if station is None:
+                raise ValueError(f"Unknown station {name!r}")
+            grouped.setdefault(station.shard, []).append(name)
+        return grouped
+
+    def _ordered(self, results: Results, names: Optional[Iterable[str]]) -> Results:
+        """Results in the caller's order (station order by default) rather than by worker."""
+        order = self.station_names if names is None else names
+        return {name: results[name] for name in order if name in results}
+
+    def _fan_out(self, method: str, names: Optional[Iterable[str]], call_timeout: Optional[float],
+                 *args, **kwargs) -> Results:
+        """Call StationPool.`method` in every involved worker and merge the results."""
+        names = None if names is None else list(names)
+        wait = (self.timeout if call_timeout is None else call_timeout) + 5.0
+        futures = [(shard_names, self._send(shard, "call", method, *args, names=shard_names,
+                                            **kwargs))
+                   for shard, shard_names in self._by_shard(names).items()]
+        merged: Results = {}
+        for shard_names, fut in futures:
+            result, err = self._wait(fut, wait)
+            if err:
+                merged.update({name: (None, err) for name in shard_names or []})
+            else:
+                merged.update(result)
+        return self._ordered(merged, names)
+
+    # -------------------------
+    # Stations
+    # -------------------------
+    def add_jx1000(self, name: str, port: str, baud: Optional[int] = None) -> bool:
+        """Open a station in the least loaded worker."""
+        if name in self.stations:
+            raise ValueError(f"Station {name!r} already exists")
+        shard = min(self._shards, key=lambda s: len(s.names))
+        index = len(self.station_names)
+        self.station_names.append(name)
+        self.stations[name] = _ShardStation(name, shard)
+        ok, err = self._wait(self._send(shard, "add", name, index, port, baud or self.baud),
+                             self.timeout + 5.0)
+        if not ok:
+            del self.stations[name]
+            return False
+        shard.names.append(name)
+        return True
+
+    def remove(self, name: str):
+        station = self.stations.pop(name, None)
+        if station is None:
+            return
+        station.shard.names.remove(name)
+        self._wait(self._send(station.shard, "remove", name), self.timeout + 5.0)
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        for shard in self._shards:
+            try:
+                with self._send_lock:
+                    shard.conn.send(None)
+            except OSError:
+                pass
+        for shard in self._shards:
+            shard.process.join(self.timeout + 5.0)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            shard.conn.close()
+        self._reader.join(1.0)
+        for shard in self._shards:
+            shard.ring.release()
+            shard.shm.close()
+            shard.shm.unlink()
+        if self._owns_events:
+            self.events.close()
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def subscribe(self, callback: Callable[[str, Any, Any], None],
+                  names: Optional[Iterable[str]] = None, cmd=None, batch: bool = False) -> list:
+        """As StationPool.subscribe; DevRead/DevWrite events are not forwarded from workers."""
+        selected = list(self.stations) if names is None else list(names)
+        subs = []
+        for name in selected:
+            def deliver(*args, _name=name):
+                callback(_name, *args)
+            subs.append(self.events.subscribe(deliver, cmd=cmd, batch=batch,
+                                              source=self.stations[name]))
+        return subs
+
+    def unsubscribe(self, subs: list):
+        for sub in subs:
+            self.events.unsubscribe(sub)
+
+    # -------------------------
+    # Commands
+    # -------------------------
+    def get_info(self, names: Optional[Iterable[str]] = None, timeout: Optional[float] = None) -> Results:
+        return self._fan_out("get_info", names, timeout, timeout=timeout)
+
+    def start_test(self, names: Optional[Iterable[str]] = None) -> Results:
+        return self._fan_out("start_test", names, None)
+
+    def stop_test(self, names: Optional[Iterable[str]] = None) -> Results:
+        return self._fan_out("stop_test", names, None)
+
+    def run_tests(self, names: Optional[Iterable[str]] = None, timeout: float = 60.0) -> Results:
+        return self._fan_out("run_tests", names, timeout, timeout=timeout)
+
+    def download_rules(self, buf, names: Optional[Iterable[str]] = None, timeout: float = 120.0,
+                       **kwargs) -> Results:
+        return self._fan_out("download_rules", names, timeout, bytes(buf), timeout=timeout, **kwargs)
+
+    def write_many(self, requests: Iterable[Tuple[int, int, int, float]],
+                   names: Optional[Iterable[str]] = None, timeout: Optional[float] = None,
+                   point_timeout: int = 300) -> Results:
+        return self._fan_out("write_many", names, timeout, list(requests), timeout=timeout,
+                             point_timeout=point_timeout)
+
+    def read_many(self, requests: Iterable[Tuple[int, int, int]],
+                  names: Optional[Iterable[str]] = None, timeout: Optional[float] = None,
+                  point_timeout: int = 300) -> Results:
+        """As StationPool.read_many; the values come back through the shared-memory rings."""
+        requests = list(requests)
+        names = None if names is None else list(names)
+        wait = (self.timeout if timeout is None else timeout) + 5.0
+        futures = []
+        for shard, shard_names in self._by_shard(names).items():
+            request = self._send(shard, "read_many", requests, shard_names, timeout, point_timeout)
+            with self._ring_lock:
+                self._awaiting.add(request[0])
+            futures.append((shard, shard_names, request))
+
+        results: Results = {}
+        for shard, shard_names, request in futures:
+            try:
+                reply, err = self._wait(request, wait)
+                if err:
+                    results.update({name: (None, err) for name in shard_names or shard.names})
+                    continue
+                errors, overflow = reply
+                records = overflow if overflow is not None else self._drain(shard, request[0])
+            finally:
+                with self._ring_lock:
+                    self._awaiting.discard(request[0])
+                    self._tagged.pop(request[0], None)
+            values: Dict[str, List[Optional[float]]] = {name: [] for name in errors}
+            for rec in records:
+                value = float(rec["value"]) if rec["status"] == 0 else None
+                values[self.station_names[rec["station"]]].append(value)
+            for name, station_err in errors.items():
+                if station_err:
+                    results[name] = (None, station_err)
+                elif len(values[name]) != len(requests):
+                    # Records overwritten in the ring: the values left cannot be matched to requests.
+                    missing = len(requests) - len(values[name])
+                    results[name] = (None, f"{missing} of {len(requests)} values lost from the ring")
+                else:
+                    results[name] = (values[name], None)
+        return self._ordered(results, names)
+
+    # -------------------------
+    # Measurements
+    # -------------------------
+    def _drain(self, shard: _Shard, tag: Optional[int] = None) -> np.ndarray:
+        """
+        Read new records from a shard's ring and sort them: polled samples
+        are kept for measurements(), read_many records for their request.
+        Returns the records of request `tag`.
+        """
+        with self._ring_lock:
+            records, shard.cursor, lost = shard.ring.read(shard.cursor)
+            self.lost += lost
+            tags = records["tag"]
+            polled = tags == 0
+            if polled.any():
+                self._samples.append(records[polled])
+            for req_tag in np.unique(tags[~polled]):
+                req_tag = int(req_tag)
+                if req_tag in self._awaiting or req_tag in self._futures:
+                    self._tagged.setdefault(req_tag, []).append(records[tags == req_tag])
+            if tag is None:
+                return records[:0]
+            parts = self._tagged.pop(tag, [])
+        return np.concatenate(parts) if parts else records[:0]
+
+    def start_polling(self, requests: Iterable[Tuple[int, int, int]], interval: float = 0.1,
+                      names: Optional[Iterable[str]] = None) -> Results:
+        """Read `requests` from the selected stations every `interval` s inside the workers."""
+        requests = list(requests)
+        futures = [(shard_names or shard.names, self._send(shard, "start_polling", requests, interval,
+                                                            shard_names))
+                   for shard, shard_names in self._by_shard(names).items()]
+        results: Results = {}
+        for shard_names, fut in futures:
+            count, err = self._wait(fut, self.timeout)
+            results.update({name: (count is not None, err) for name in shard_names})
+        return results
+
+    def stop_polling(self):
+        for fut in [self._send(shard, "stop_polling") for shard in self._shards]:
+            self._wait(fut, self.timeout)
+
+    def measurements(self) -> np.ndarray:
+        """
+        Polled records since the last call, as a MEASUREMENT_DTYPE array
+        (station indexes refer to station_names). Samples overwritten in a
+        ring before they were read are counted in `lost`.
+        """
+        for shard in self._shards:
+            self._drain(shard)
+        with self._ring_lock:
+            samples, self._samples = self._samples, []
+        if not samples:
+            return np.zeros(0, MEASUREMENT_DTYPE)
+        return np.concatenate(samples)
@@ -0,0 +1,142 @@
+"""
+Protocol model of a JX1000 device for the simulator.
+
+SimulatedJX1000 consumes the bytes a host writes and returns the reply
+frames it would send, each with a delay. It answers exactly what
+JX1000Driver._handle_frame expects:
+
+    Info       HardType | Version*10 | ComNumber | BoardCount | u16
+    DevRead    com | ch | result | addr u16 | value f32, from per-board memory
+    DevWrite   same layout, echoing the stored value
+    RuleDown   1-byte ack (1 = ok, 2 = error); the image is kept in `rule_image`
+    LOG        cmd_EnableExec() runs a test: "cmd_EnableExec.", "cmd_Test Start...",
+               then after `test_duration` RES "{ED,1}" (or "{ED,0}") and "cmd_Test End..."
+
+Faults are drawn from a seeded random generator: reply latency with
+jitter, dropped replies, corrupted checksums, noise bytes between frames
+and NAKed rule chunks. Baud throttling is applied by the link that
+carries the bytes (see simulator.py).
+"""
+
+import random
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from jx1000.frames import EFRAME, FrameParser, build_frame
+
+
+class SimulatedJX1000:
+
+    def __init__(self, hard_type: int = 1, version: float = 1.0, com_number: int = 2,
+                 board_count: int = 8, latency: float = 0.0, jitter: float = 0.0,
+                 drop_rate: float = 0.0, corrupt_rate: float = 0.0, noise_rate: float = 0.0,
+                 nak_rate: float = 0.0, pass_rate: float = 1.0, test_duration: float = 0.05,
+                 seed: Optional[int] = None):
+        self.hard_type = hard_type
+        self.version = version
+        self.com_number = com_number
+        self.board_count = board_count
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.noise_rate = noise_rate
+        self.nak_rate = nak_rate
+        self.pass_rate = pass_rate
+        self.test_duration = test_duration
+        self.random = random.Random(seed)
+
+        self.memory: Dict[Tuple[int, int, int], float] = {}
+        self.rule_image = bytearray()
+        self.rules_complete = False
+        self.frames_in = 0
+        self.frames_out = 0
+        self.dropped = 0
+        self._parser = FrameParser()
+
+    # -------------------------
+    # Host -> device
+    # -------------------------
+    def receive(self, data: bytes) -> List[Tuple[float, bytes]]:
+        """Feed bytes written by the host; returns [(delay_seconds, bytes), ...] to send back."""
+        out: List[Tuple[float, bytes]] = []
+        for cmd, payload in self._parser.feed(data):
+            self.frames_in += 1
+            for delay, cmd_out, payload_out in self._handle(cmd, payload):
+                frame = self._emit(cmd_out, payload_out)
+                if frame is not None:
+                    out.append((delay + self._latency(), frame))
+        return out
+
+    def _handle(self, cmd: int, payload: bytes) -> List[Tuple[float, int, bytes]]:
+        if cmd == EFRAME.Info:
+            info = struct.pack("<BBBBH", self.hard_type, int(round(self.version * 10)),
+                               self.com_number, self.board_count, 0)
+            return [(0.0, EFRAME.Info, info)]
+        if cmd in (EFRAME.DevRead, EFRAME.DevWrite):
+            if len(payload) < 8:
+                return []
+            com, ch, addr, value = struct.unpack_from("<BBHf", payload)
+            result = 0 if 1 <= com <= self.board_count else 1
+            if cmd == EFRAME.DevWrite and result == 0:
+                self.memory[(com, ch, addr)] = value
+            stored = self.memory.get((com, ch, addr), 0.0)
+            return [(0.0, cmd, struct.pack("<BBBHf", com, ch, result, addr, stored))]
+        if cmd == EFRAME.RuleDown:
+            return [(0.0, EFRAME.RuleDown, self._rule_chunk(payload))]
+        if cmd == EFRAME.LOG:
+            return self._command(payload.decode("ascii", errors="ignore").strip())
+        return []
+
+    def _rule_chunk(self, payload: bytes) -> bytes:
+        if len(payload) < 4 or self.random.random() < self.nak_rate:
+            return b"\x02"
+        state, offset, length = struct.unpack_from("<BHB", payload)
+        data = payload[4:4 + length]
+        if state == 2:
+            self.rules_complete = True
+            return b"\x01"
+        if len(data) != length:
+            return b"\x02"
+        if offset == 0:
+            self.rules_complete = False
+        end = offset + length
+        if len(self.rule_image) < end:
+            self.rule_image.extend(bytes(end - len(self.rule_image)))
+        self.rule_image[offset:end] = data
+        return b"\x01"
+
+    def _command(self, text: str) -> List[Tuple[float, int, bytes]]:
+        if text.startswith("cmd_EnableExec"):
+            passed = self.random.random() < self.pass_rate
+            return [
+                (0.0, EFRAME.LOG, b"cmd_EnableExec.\r\n"),
+                (0.0, EFRAME.LOG, b"cmd_Test Start...\r\n"),
+                (self.test_duration, EFRAME.RES, b"{ED,1}\r\n" if passed else b"{ED,0}\r\n"),
+                (self.test_duration, EFRAME.LOG, b"cmd_Test End...\r\n"),
+            ]
+        if text.startswith("cmd_ExitExec"):
+            return [(0.0, EFRAME.LOG, b"cmd_ExitExec.\r\n")]
+        return [(0.0, EFRAME.LOG, f"{text}?\r\n".encode("ascii"))]
+
+    # -------------------------
+    # Device -> host
+    # -------------------------
+    def _latency(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def _emit(self, cmd: int, payload: bytes) -> Optional[bytes]:
+        rnd = self.random
+        if self.drop_rate and rnd.random() < self.drop_rate:
+            self.dropped += 1
+            return None
+        frame = build_frame(cmd, payload)
+        if self.corrupt_rate and rnd.random() < self.corrupt_rate:
+            frame[-1] ^= 0xFF
+        if self.noise_rate and rnd.random() < self.noise_rate:
+            noise = bytes(rnd.getrandbits(8) for _ in range(rnd.randint(1, 16)))
+            frame = noise + frame
+        self.frames_out += 1
+        return bytes(frame)
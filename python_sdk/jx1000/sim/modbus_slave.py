@@ -0,0 +1,169 @@
+"""
+Modbus RTU slave model of a JX1000 for the simulator.
+
+SimulatedModbusSlave consumes the bytes a master writes and returns the
+replies it would send, each with a delay, so it plugs into
+Simulator.add_pty() / add_fake() like SimulatedJX1000:
+
+    sim = Simulator()
+    port = sim.add_pty(SimulatedModbusSlave(latency=0.002), baud=115200)
+    client = ModbusSerialClient(port=port, baudrate=115200, timeout=0.5)
+    modbus = ModbusHelper(client)
+
+It answers read holding registers (0x03), write single register (0x06)
+and write multiple registers (0x10) on `size` registers, with the layout
+the SDK expects:
+
+    1000-1999  input N (1000-1499) as a float32 pair at 1000 + (N - 1000) * 2
+    20         test trigger; writing non-zero starts a test
+    23         test result: 0 not tested / running, 1 PASS, 2 NG
+
+Faults are drawn from a seeded random generator: reply latency with
+jitter, dropped replies, corrupted CRCs and exception responses
+(slave device busy). Requests with a bad CRC or another slave address are
+ignored, as on a real bus.
+"""
+
+import random
+import struct
+import time
+from typing import List, Optional, Tuple
+
+from jx1000.crc import crc16_modbus, crc16_modbus_bytes
+from jx1000.registers import encode_registers
+
+MAPPED_FIRST = 1000
+MAPPED_LAST = 1499
+TRIGGER_REGISTER = 20
+RESULT_REGISTER = 23
+
+
+class SimulatedModbusSlave:
+
+    def __init__(self, slave: int = 1, size: int = 2000, latency: float = 0.0,
+                 jitter: float = 0.0, drop_rate: float = 0.0, corrupt_rate: float = 0.0,
+                 exception_rate: float = 0.0, pass_rate: float = 1.0,
+                 test_duration: float = 0.05, seed: Optional[int] = None):
+        self.slave = slave
+        self.registers = [0] * size
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.exception_rate = exception_rate
+        self.pass_rate = pass_rate
+        self.test_duration = test_duration
+        self.random = random.Random(seed)
+
+        self.requests = 0
+        self.replies = 0
+        self.dropped = 0
+        self.exceptions = 0
+        self._buf = bytearray()
+        self._test_done_at: Optional[float] = None
+
+    # -------------------------
+    # Register layout
+    # -------------------------
+    def set_inputs(self, start: int, values, wordorder: str = "big"):
+        """Store float32 `values` for mapped inputs start, start+1, ... (1000-1499)."""
+        words = encode_registers(values, "float32", wordorder).tolist()
+        if not (MAPPED_FIRST <= start and start + len(words) // 2 - 1 <= MAPPED_LAST):
+            raise ValueError(f"Mapped inputs must be within {MAPPED_FIRST}-{MAPPED_LAST}")
+        first = MAPPED_FIRST + (start - MAPPED_FIRST) * 2
+        self.registers[first:first + len(words)] = words
+
+    def _update_test(self, now: float):
+        if self._test_done_at is not None and now >= self._test_done_at:
+            passed = self.random.random() < self.pass_rate
+            self.registers[RESULT_REGISTER] = 1 if passed else 2
+            self.registers[TRIGGER_REGISTER] = 0
+            self._test_done_at = None
+
+    def _written(self, address: int, count: int, now: float):
+        if address <= TRIGGER_REGISTER < address + count and self.registers[TRIGGER_REGISTER]:
+            self.registers[RESULT_REGISTER] = 0
+            self._test_done_at = now + self.test_duration
+
+    # -------------------------
+    # Master -> slave
+    # -------------------------
+    def receive(self, data: bytes) -> List[Tuple[float, bytes]]:
+        """Feed bytes written by the master; returns [(delay_seconds, bytes), ...] to send back."""
+        self._buf += data
+        out: List[Tuple[float, bytes]] = []
+        now = time.monotonic()
+        while len(self._buf) >= 8:
+            length = self._request_length()
+            if length is None or len(self._buf) < length:
+                break
+            req = bytes(self._buf[:length])
+            if crc16_modbus(req) != 0:
+                # Noise or a partial frame: resync one byte further.
+                del self._buf[0]
+                continue
+            del self._buf[:length]
+            if req[0] != self.slave:
+                continue
+            self.requests += 1
+            reply = self._emit(self._handle(req, now))
+            if reply is not None:
+                out.append((self._latency(), reply))
+        return out
+
+    def _request_length(self) -> Optional[int]:
+        if self._buf[1] == 0x10:
+            return 9 + self._buf[6] if len(self._buf) >= 7 else None
+        return 8
+
+    def _exception(self, func: int, code: int) -> bytes:
+        self.exceptions += 1
+        return bytes([self.slave, func | 0x80, code])
+
+    def _handle(self, req: bytes, now: float) -> bytes:
+        func = req[1]
+        address, arg = struct.unpack_from(">HH", req, 2)
+        if self.exception_rate and self.random.random() < self.exception_rate:
+            return self._exception(func, 0x06)
+        self._update_test(now)
+        if func == 0x03:
+            if not 1 <= arg <= 125:
+                return self._exception(func, 0x03)
+            if address + arg > len(self.registers):
+                return self._exception(func, 0x02)
+            regs = self.registers[address:address + arg]
+            return bytes([self.slave, 0x03, arg * 2]) + struct.pack(f">{arg}H", *regs)
+        if func == 0x06:
+            if address >= len(self.registers):
+                return self._exception(func, 0x02)
+            self.registers[address] = arg
+            self._written(address, 1, now)
+            return req[:6]
+        if func == 0x10:
+            if not 1 <= arg <= 123 or req[6] != arg * 2:
+                return self._exception(func, 0x03)
+            if address + arg > len(self.registers):
+                return self._exception(func, 0x02)
+            self.registers[address:address + arg] = struct.unpack_from(f">{arg}H", req, 7)
+            self._written(address, arg, now)
+            return req[:6]
+        return self._exception(func, 0x01)
+
+    # -------------------------
+    # Slave -> master
+    # -------------------------
+    def _latency(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def _emit(self, body: bytes) -> Optional[bytes]:
+        rnd = self.random
+        if self.drop_rate and rnd.random() < self.drop_rate:
+            self.dropped += 1
+            return None
+        frame = bytearray(body + crc16_modbus_bytes(body))
+        if self.corrupt_rate and rnd.random() < self.corrupt_rate:
+            frame[-1] ^= 0xFF
+        self.replies += 1
+        return bytes(frame)
@@ -0,0 +1,295 @@
+"""
+Runs simulated devices behind pseudo-terminals or in-process fake ports.
+
+One Simulator thread serves every device: it reads the PTY masters with
+a selector and delivers replies from a single timer heap, so hundreds of
+devices fit in one process. Each link throttles both directions to
+`baud` (10 bits per byte) on top of the device's own latency.
+
+    sim = Simulator()
+    port = sim.add_pty(SimulatedJX1000(latency=0.002))   # e.g. /dev/pts/5
+    drv = JX1000Driver(port); drv.open_port()
+
+    fake = sim.add_fake(SimulatedJX1000())               # no OS port needed
+    drv = JX1000Driver("sim0"); drv.open_serial(fake)
+
+PTYs need a POSIX system; fake ports work everywhere.
+"""
+
+import heapq
+import itertools
+import os
+import selectors
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import pty
+    import tty
+except ImportError:  # Windows
+    pty = None
+    tty = None
+
+
+class _Link(ABC):
+    """Output side shared by PTY and fake links: baud throttling and counters."""
+
+    def __init__(self, sim: "Simulator", device, baud: Optional[int]):
+        self.sim = sim
+        self.device = device
+        self.baud = baud
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._line_free = 0.0
+        self._host_line_free = 0.0
+
+    def _arrive(self, data: bytes):
+        """Hand host bytes to the device once they would have crossed the line."""
+        if not self.baud:
+            self.sim.call_soon(self._from_host, data)
+            return
+        due = max(time.monotonic(), self._host_line_free) + len(data) * 10 / self.baud
+        self._host_line_free = due
+        self.sim.call_at(due, self._from_host, data)
+
+    def _from_host(self, data: bytes):
+        self.bytes_in += len(data)
+        now = time.monotonic()
+        for delay, frame in self.device.receive(data):
+            due = now + delay
+            if self.baud:
+                # Bytes leave one after another at the line rate.
+                due = max(due, self._line_free) + len(frame) * 10 / self.baud
+                self._line_free = due
+            self.sim.call_at(due, self._to_host, frame)
+
+    @abstractmethod
+    def _to_host(self, frame: bytes):
+        """Deliver a device frame to the host side."""
+
+    def close(self):
+        pass
+
+
+class FakeSerial(_Link):
+    """
+    In-process port with the pyserial calls JX1000Driver and ModbusRTU use:
+    read (timeout and inter_byte_timeout), write, in_waiting,
+    reset_input_buffer, flush and close.
+    """
+
+    def __init__(self, sim: "Simulator", device, baud: Optional[int] = None,
+                 timeout: Optional[float] = 0.05, inter_byte_timeout: Optional[float] = None):
+        super().__init__(sim, device, baud)
+        self.timeout = timeout
+        self.inter_byte_timeout = inter_byte_timeout
+        self.is_open = True
+        self._rx = bytearray()
+        self._last_rx = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx)
+
+    def write(self, data) -> int:
+        if not self.is_open:
+            raise OSError("Port closed")
+        data = bytes(data)
+        self._arrive(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        with self._cond:
+            self._rx.clear()
+
+    def _to_host(self, frame: bytes):
+        with self._cond:
+            self._rx += frame
+            self.bytes_out += len(frame)
+            self._last_rx = time.monotonic()
+            self._cond.notify_all()
+
+    def inject(self, data: bytes):
+        """Put raw bytes in the receive buffer, e.g. unsolicited frames or garbage."""
+        self._to_host(bytes(data))
+
+    def read(self, size: int = 1) -> bytes:
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while len(self._rx) < size and self.is_open:
+                now = time.monotonic()
+                remaining = None if deadline is None else deadline - now
+                if self._rx and self.inter_byte_timeout is not None:
+                    gap = self._last_rx + self.inter_byte_timeout - now
+                    if gap <= 0:
+                        break
+                    remaining = gap if remaining is None else min(remaining, gap)
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            out = bytes(self._rx[:size])
+            del self._rx[:size]
+            return out
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+
+
+class PtyLink(_Link):
+    """A device behind the master side of a pseudo-terminal; `port` is the slave path."""
+
+    def __init__(self, sim: "Simulator", device, baud: Optional[int] = None):
+        if pty is None:
+            raise RuntimeError("PTY links need a POSIX system; use Simulator.add_fake()")
+        super().__init__(sim, device, baud)
+        self.master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        os.set_blocking(self.master, False)
+
+    def _readable(self):
+        try:
+            data = os.read(self.master, 4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self.sim._unregister(self)
+            return
+        if data:
+            self._arrive(data)
+
+    def _to_host(self, frame: bytes):
+        view = memoryview(frame)
+        while view:
+            try:
+                n = os.write(self.master, view)
+            except BlockingIOError:
+                # The host is not reading; drop the rest as a real UART would overrun.
+                return
+            except OSError:
+                return
+            self.bytes_out += n
+            view = view[n:]
+
+    def close(self):
+        for fd in (self.master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class Simulator:
+
+    def __init__(self):
+        self.links: List[_Link] = []
+        self._selector = selectors.DefaultSelector()
+        self._timers: List[Tuple[float, int, Callable, tuple]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        # Windows selectors cannot wait on pipes; there the loop sleeps on _cond instead.
+        self._wake_r, self._wake_w = os.pipe() if pty is not None else (None, None)
+        if self._wake_r is not None:
+            os.set_blocking(self._wake_r, False)
+            self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._cond = threading.Condition(self._lock)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="jx1000-sim", daemon=True)
+        self._thread.start()
+
+    # -------------------------
+    # Devices
+    # -------------------------
+    def add_pty(self, device, baud: Optional[int] = None) -> str:
+        """Serve `device` on a new PTY and return the port name to open."""
+        link = PtyLink(self, device, baud)
+        with self._lock:
+            self.links.append(link)
+            self._selector.register(link.master, selectors.EVENT_READ, link)
+        self._wake()
+        return link.port
+
+    def add_fake(self, device, baud: Optional[int] = None, timeout: Optional[float] = 0.05,
+                 inter_byte_timeout: Optional[float] = None) -> FakeSerial:
+        """Serve `device` on an in-process port object."""
+        link = FakeSerial(self, device, baud, timeout, inter_byte_timeout)
+        with self._lock:
+            self.links.append(link)
+        return link
+
+    def _unregister(self, link: _Link):
+        with self._lock:
+            try:
+                self._selector.unregister(link.master)
+            except (KeyError, ValueError):
+                pass
+
+    # -------------------------
+    # Scheduling
+    # -------------------------
+    def call_at(self, due: float, fn: Callable, *args):
+        with self._lock:
+            heapq.heappush(self._timers, (due, next(self._seq), fn, args))
+        self._wake()
+
+    def call_soon(self, fn: Callable, *args):
+        self.call_at(0.0, fn, *args)
+
+    def _wake(self):
+        if threading.current_thread() is self._thread:
+            return
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"\0")
+            except (BlockingIOError, OSError):
+                pass
+        else:
+            with self._cond:
+                self._cond.notify()
+
+    def _run(self):
+        while self._running:
+            now = time.monotonic()
+            due_calls = []
+            with self._lock:
+                while self._timers and self._timers[0][0] <= now:
+                    due_calls.append(heapq.heappop(self._timers))
+                timeout = self._timers[0][0] - now if self._timers else 0.5
+            for _, _, fn, args in due_calls:
+                try:
+                    fn(*args)
+                except Exception:
+                    pass
+            if due_calls:
+                continue
+            if self._wake_r is None:
+                with self._cond:
+                    self._cond.wait(timeout)
+                continue
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except OSError:
+                        pass
+                else:
+                    key.data._readable()
+
+    def close(self):
+        self._running = False
+        self._wake()
+        self._thread.join(1.0)
+        for link in self.links:
+            link.close()
+        self._selector.close()
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
@@ -0,0 +1,156 @@
+"""
+Low-overhead driver instrumentation.
+
+LatencyHistogram keeps fixed log-scale buckets (50 us doubling up to
+~13 s), so recording is one bisect and a few additions, and percentiles
+are read from the bucket counts. DriverStats holds the counters a
+JX1000Driver updates on its hot paths; everything else (parser errors,
+queue depths) is read from the driver's own objects when a snapshot is
+taken. StatsDumper hands a snapshot to a callback every `interval`.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict
+
+from jx1000.frames import EFRAME_NAMES
+
+# Bucket upper bounds in seconds; the last bucket collects everything slower.
+LATENCY_BOUNDS = tuple(50e-6 * 2 ** i for i in range(19))
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (0..1), capped at the max seen."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(LATENCY_BOUNDS[i], self.max) if i < len(LATENCY_BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1e3,
+            "p90_ms": self.percentile(0.9) * 1e3,
+            "p99_ms": self.percentile(0.99) * 1e3,
+            "max_ms": self.max * 1e3,
+            # Non-empty buckets as [upper bound in ms (None = overflow), count].
+            "buckets": [[LATENCY_BOUNDS[i] * 1e3 if i < len(LATENCY_BOUNDS) else None, n]
+                        for i, n in enumerate(self.counts) if n],
+        }
+
+
+class DriverStats:
+    """
+    Counters for one driver. Reader-thread counters are plain attributes;
+    the few updated from caller threads (timeouts, send errors) take a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_in = 0
+        self.timeouts = 0
+        self.send_errors = 0
+        self.latency: Dict[int, LatencyHistogram] = {}
+        self.transfers = 0
+        self.transfers_failed = 0
+        self.transfer_bytes = 0
+        self.transfer_seconds = 0.0
+        self.last_transfer_bps = 0.0
+
+    def observe(self, cmd: int, seconds: float):
+        """Record one request/reply round trip for EFRAME command `cmd`."""
+        hist = self.latency.get(cmd)
+        if hist is None:
+            hist = self.latency.setdefault(cmd, LatencyHistogram())
+        hist.record(seconds)
+
+    def timed_out(self, n: int = 1):
+        with self._lock:
+            self.timeouts += n
+
+    def send_failed(self):
+        with self._lock:
+            self.send_errors += 1
+
+    def transfer_done(self, ok: bool, bytes_sent: int, seconds: float):
+        with self._lock:
+            if not ok:
+                self.transfers_failed += 1
+                return
+            self.transfers += 1
+            self.transfer_bytes += bytes_sent
+            self.transfer_seconds += seconds
+            self.last_transfer_bps = bytes_sent / seconds if seconds else 0.0
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started
+        return {
+            "uptime_s": uptime,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "frames_in": self.frames_in,
+            "timeouts": self.timeouts,
+            "send_errors": self.send_errors,
+            "latency": {EFRAME_NAMES.get(cmd, str(cmd)): hist.snapshot()
+                        for cmd, hist in list(self.latency.items())},
+            "rule_download": {
+                "transfers": self.transfers,
+                "failed": self.transfers_failed,
+                "bytes": self.transfer_bytes,
+                "avg_bps": self.transfer_bytes / self.transfer_seconds if self.transfer_seconds else 0.0,
+                "last_bps": self.last_transfer_bps,
+            },
+        }
+
+
+class StatsDumper:
+    """Calls `sink(snapshot())` every `interval` seconds on a daemon thread until stop()."""
+
+    def __init__(self, snapshot: Callable[[], dict], sink: Callable[[dict], None], interval: float):
+        self.snapshot = snapshot
+        self.sink = sink
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="jx1000-stats", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sink(self.snapshot())
+            except Exception:
+                pass
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(1.0)
@@ -0,0 +1,224 @@
+import struct
+import threading
+import time
+from collections import deque
+from typing import Deque, Generator, List, Optional, Sequence, Tuple
+
+from jx1000.frames import EFRAME, FRAME_H, FRAME_L
+
+DEFAULT_CHUNK = 156
+MIN_CHUNK = 32
+# The frame length byte also covers the 4-byte RuleDown header.
+MAX_CHUNK = 255 - 4
+
+
+class RuleTransfer:
+    """
+    Sliding-window RuleDown transfer.
+
+    Keeps up to `window` chunks in flight and matches acks to chunks in send
+    order (the device acks RuleDown frames one by one, without an offset).
+    Only chunks that are nacked or time out are sent again. With `adaptive`
+    the chunk size follows the smoothed per-chunk ack time: it grows while
+    acks come back well under `target_rtt` and shrinks when they do not.
+
+    The defaults (window=1, adaptive=False) are plain stop-and-wait with
+    156-byte chunks, which is what older firmware expects. In windowed mode
+    the first nack or timeout drops the transfer back to that.
+
+    `buf` may be any buffer (bytes, mmap, ...). Chunks are copied straight
+    from a memoryview of it into one reusable frame buffer, so sending
+    allocates nothing per chunk. release() drops the view and the buffer
+    once the transfer has ended, so an mmap can be closed afterwards.
+    """
+
+    def __init__(self, driver, buf, window: int = 1, chunk_size: int = DEFAULT_CHUNK,
+                 adaptive: bool = False, ack_timeout: float = 2.0, retries: int = 3,
+                 target_rtt: float = 0.02,
+                 ranges: Optional[Sequence[Tuple[int, int]]] = None):
+        if not 1 <= chunk_size <= MAX_CHUNK:
+            raise ValueError(f"chunk_size must be 1..{MAX_CHUNK}")
+        if len(buf) > 0x10000:
+            raise ValueError("Rule image exceeds the 16-bit RuleDown offset range")
+        self.driver = driver
+        self.buf = buf
+        self._view = memoryview(buf).cast("B")
+        self._frame = bytearray(4 + 255 + 1)
+        self._frame[0:2] = bytes([FRAME_H, FRAME_L])
+        self._frame[3] = EFRAME.RuleDown
+        self.window = max(1, window)
+        self.chunk_size = chunk_size
+        self.adaptive = adaptive and window > 1
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.target_rtt = target_rtt
+        self.ranges: List[Tuple[int, int]] = list(ranges) if ranges is not None else [(0, len(buf))]
+
+        self.srtt: Optional[float] = None
+        self.fell_back = False
+        self.bytes_sent = 0
+        self.elapsed = 0.0
+        # Per-chunk ack times go to the driver's histograms when it keeps them.
+        self._stats = getattr(driver, "stats", None)
+        self._acks: Deque[Tuple[bool, float]] = deque()
+        self._cond = threading.Condition()
+
+    def release(self):
+        self._view.release()
+        self.buf = None
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_sent / self.elapsed if self.elapsed else 0.0
+
+    # -------------------------
+    # Reader thread side
+    # -------------------------
+    def on_ack(self, ok: bool):
+        with self._cond:
+            self._acks.append((ok, time.monotonic()))
+            self._cond.notify()
+
+    def _next_ack(self, deadline: float) -> Optional[Tuple[bool, float]]:
+        with self._cond:
+            while not self._acks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._acks.popleft()
+
+    # -------------------------
+    # Transfer
+    # -------------------------
+    def _event(self, value):
+        self.driver._dispatch_event(EFRAME.RuleDown, value)
+
+    def _send(self, offset: int, length: int) -> bool:
+        frame = self._frame
+        end = 8 + length
+        frame[2] = 4 + length
+        struct.pack_into("<B H B", frame, 4, 1, offset & 0xFFFF, length & 0xFF)
+        frame[8:end] = self._view[offset:offset + length]
+        with memoryview(frame) as view:
+            frame[end] = sum(view[:end]) & 0xFF
+            return self.driver.send_raw(view[:end + 1])
+
+    def _observe(self, rtt: float, depth: int):
+        # Acks queue behind the chunks sent before them; divide that out.
+        sample = rtt / depth
+        self.srtt = sample if self.srtt is None else 0.875 * self.srtt + 0.125 * sample
+        if not self.adaptive:
+            return
+        if self.srtt < self.target_rtt * 0.5:
+            self.chunk_size = min(MAX_CHUNK, self.chunk_size + self.chunk_size // 4 + 1)
+        elif self.srtt > self.target_rtt:
+            self.chunk_size = max(MIN_CHUNK, self.chunk_size * 3 // 4)
+
+    def _fall_back(self, todo: Deque[Tuple[int, int]], unacked: List[Tuple[int, int]]):
+        """Switch to stop-and-wait and requeue everything that is not acknowledged."""
+        self.fell_back = True
+        self.window = 1
+        self.adaptive = False
+        self.chunk_size = DEFAULT_CHUNK
+        self._event("fallback: stop-and-wait")
+        spans = sorted(unacked + list(todo))
+        merged: List[Tuple[int, int]] = []
+        for start, end in spans:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        todo.clear()
+        todo.extend(merged)
+
+    def run(self) -> bool:
+        """Run the transfer on the calling thread; acks arrive through on_ack()."""
+        with self._cond:
+            self._acks.clear()
+        steps = self.steps()
+        try:
+            deadline, settle = next(steps)
+            while True:
+                if settle:
+                    time.sleep(max(0.0, deadline - time.monotonic()))
+                    with self._cond:
+                        self._acks.clear()
+                    ack = None
+                else:
+                    ack = self._next_ack(deadline)
+                deadline, settle = steps.send(ack)
+        except StopIteration as stop:
+            return stop.value
+
+    def steps(self) -> Generator[Tuple[float, bool], Optional[Tuple[bool, float]], bool]:
+        """
+        The transfer as a generator, independent of how acks are awaited.
+
+        Yields (deadline, settle). For settle=False the caller waits for the
+        next ack until `deadline` and sends back (ok, monotonic time) or None
+        on timeout. For settle=True it waits until `deadline`, discards any
+        acks that arrived meanwhile and sends back None.
+        """
+        total = sum(end - start for start, end in self.ranges)
+        todo: Deque[Tuple[int, int]] = deque((s, e) for s, e in self.ranges if e > s)
+        retry: Deque[Tuple[int, int, int]] = deque()  # (offset, length, attempts)
+        inflight: Deque[Tuple[int, int, float, int, int]] = deque()  # + sent_at, attempts, depth
+        done = 0
+        start_time = time.monotonic()
+
+        def percent() -> int:
+            return int(done * 100 / total) if total else 100
+
+        while todo or retry or inflight:
+            while len(inflight) < self.window and (retry or todo):
+                if retry:
+                    offset, length, attempts = retry.popleft()
+                else:
+                    offset, end = todo[0]
+                    length = min(self.chunk_size, end - offset)
+                    if offset + length >= end:
+                        todo.popleft()
+                    else:
+                        todo[0] = (offset + length, end)
+                    attempts = 0
+                if not self._send(offset, length):
+                    self._event("error-send")
+                    return False
+                inflight.append((offset, length, time.monotonic(), attempts, len(inflight) + 1))
+
+            ack = yield inflight[0][2] + self.ack_timeout, False
+            offset, length, sent_at, attempts, depth = inflight.popleft()
+            ok = ack is not None and ack[0]
+
+            if not ok:
+                self._event(f"{percent()}% - {'Timeout' if ack is None else 'FAIL'}")
+                if attempts >= self.retries:
+                    self._event("chunk-timeout" if ack is None else "chunk-failed")
+                    return False
+                if self.window > 1:
+                    unacked = [(offset, offset + length)]
+                    unacked += [(o, o + n) for o, n, *_ in inflight]
+                    unacked += [(o, o + n) for o, n, _ in retry]
+                    inflight.clear()
+                    retry.clear()
+                    self._fall_back(todo, unacked)
+                    # Let late acks for the abandoned window arrive, then forget them.
+                    yield time.monotonic() + min(self.ack_timeout, 0.5), True
+                else:
+                    retry.appendleft((offset, length, attempts + 1))
+                continue
+
+            self._observe(ack[1] - sent_at, depth)
+            if self._stats is not None:
+                self._stats.observe(EFRAME.RuleDown, ack[1] - sent_at)
+            done += length
+            self._event(f"{percent()}% - OK")
+
+        final_hdr = struct.pack("<B H B", 2, 0, 1)
+        self.driver.send_frame(EFRAME.RuleDown, final_hdr + b"\x00")
+        self.bytes_sent = done
+        self.elapsed = time.monotonic() - start_time
+        self._event("Done")
+        self._event(f"{done} bytes in {self.elapsed:.2f} s ({self.bytes_per_second:.0f} B/s)")
+        return True
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from jx1000.driver import JX1000Driver
+from jx1000.sim.device import SimulatedJX1000
+from jx1000.sim.simulator import Simulator
+
+
+@pytest.fixture(autouse=True)
+def _home(tmp_path, monkeypatch):
+    # Rule and port caches live under ~/.jx1000; keep them out of the real home.
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+@pytest.fixture
+def sim():
+    simulator = Simulator()
+    yield simulator
+    simulator.close()
+
+
+@pytest.fixture
+def device():
+    dev = SimulatedJX1000()
+    dev.memory[(1, 1, 5)] = 3.25
+    return dev
+
+
+@pytest.fixture
+def driver(sim, device):
+    drv = JX1000Driver("sim", print_events=False)
+    drv.open_serial(sim.add_fake(device))
+    yield drv
+    drv.close_port()
+    drv.events.close()
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from jx1000.api import JX1000
+from jx1000.cache import ReadCache
+
+
+class _Driver:
+    """read_many/write_many(as_array=True) over a dict, optionally held on a gate."""
+
+    def __init__(self):
+        self.memory = {}
+        self.reads = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.on_transfer_done = None
+
+    def read_many(self, keys, timeout, as_array):
+        self.reads.append(list(keys))
+        self.gate.wait(5)
+        values = [self.memory.get(key, np.nan) for key in keys]
+        status = [0 if key in self.memory else 1 for key in keys]
+        return np.array(values, dtype=np.float32), np.array(status, dtype=np.int16)
+
+    def write_many(self, items, timeout, as_array):
+        status = []
+        for com, ch, addr, value in items:
+            ok = com != 9
+            if ok:
+                self.memory[(com, ch, addr)] = value
+            status.append(0 if ok else 1)
+        values = [self.memory.get(item[:3], np.nan) if st == 0 else np.nan
+                  for item, st in zip(items, status)]
+        return np.array(values, dtype=np.float32), np.array(status, dtype=np.int16)
+
+
+@pytest.fixture
+def fake():
+    drv = _Driver()
+    drv.memory[(1, 1, 5)] = 3.25
+    return drv
+
+
+def test_hits_within_ttl_and_refetch_after(fake):
+    cache = ReadCache(fake, ttl=0.05)
+    assert cache.read(1, 1, 5) == 3.25
+    fake.memory[(1, 1, 5)] = 4.5
+    assert cache.read(1, 1, 5) == 3.25
+    assert (cache.hits, cache.misses, len(fake.reads)) == (1, 1, 1)
+    time.sleep(0.06)
+    assert cache.read(1, 1, 5) == 4.5
+    assert len(fake.reads) == 2
+
+
+def test_concurrent_readers_share_one_fetch(fake):
+    cache = ReadCache(fake, ttl=1.0)
+    fake.gate.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.read(1, 1, 5)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    fake.gate.set()
+    for t in threads:
+        t.join(2)
+    assert results == [3.25] * 8
+    assert len(fake.reads) == 1
+    assert cache.misses == 1 and cache.coalesced == 7
+
+
+def test_batch_misses_go_out_in_one_read(fake):
+    fake.memory.update({(1, 1, a): float(a) for a in range(10)})
+    cache = ReadCache(fake)
+    cache.read(1, 1, 0)
+    assert cache.read_many([(1, 1, a) for a in range(10)]) == [float(a) for a in range(10)]
+    assert fake.reads[-1] == [(1, 1, a) for a in range(1, 10)]
+
+
+def test_rejected_reads_are_not_cached(fake):
+    cache = ReadCache(fake)
+    assert cache.read(9, 1, 5) is None
+    assert cache.read(9, 1, 5) is None
+    assert len(cache) == 0 and len(fake.reads) == 2
+
+
+def test_write_through(fake):
+    cache = ReadCache(fake)
+    assert cache.read(1, 1, 5) == 3.25
+    assert cache.write(1, 1, 5, 7.0)
+    assert cache.read(1, 1, 5) == 7.0
+    assert len(fake.reads) == 1
+    assert not cache.write(9, 1, 5, 1.0)
+    assert (9, 1, 5) not in cache._entries
+
+
+def test_invalidate_and_transfer_end(fake):
+    fake.memory[(2, 1, 5)] = 1.0
+    cache = ReadCache(fake)
+    cache.read_many([(1, 1, 5), (2, 1, 5)])
+    cache.invalidate(com=2)
+    assert list(cache._entries) == [(1, 1, 5)]
+    fake.on_transfer_done(True)
+    assert len(cache) == 0
+    cache.close()
+    assert fake.on_transfer_done is None
+
+
+def test_invalidate_during_fetch_wins(fake):
+    cache = ReadCache(fake)
+    fake.gate.clear()
+    reader = threading.Thread(target=cache.read, args=(1, 1, 5))
+    reader.start()
+    time.sleep(0.05)
+    cache.invalidate()
+    fake.gate.set()
+    reader.join(2)
+    assert len(cache) == 0
+
+
+def test_per_key_ttl_and_eviction(fake):
+    fake.memory.update({(1, 1, a): float(a) for a in range(5)})
+    cache = ReadCache(fake, max_entries=3)
+    cache.set_ttl((1, 1, 0), 0)
+    cache.read_many([(1, 1, a) for a in range(5)])
+    assert list(cache._entries) == [(1, 1, 2), (1, 1, 3), (1, 1, 4)]
+    assert cache.evictions == 1
+
+
+@pytest.mark.parametrize("ttl", [None, 5.0])
+def test_api_results_do_not_depend_on_the_cache(sim, device, ttl):
+    api = JX1000(print_events=False, cache_ttl=ttl)
+    api.driver.open_serial(sim.add_fake(device))
+    try:
+        assert api.read_memory(1, 1, 5) == 3.25
+        assert api.read_memory(9, 1, 5) is None
+        assert api.write_memory(1, 1, 6, 2.0) is True
+        assert api.write_memory(9, 1, 6, 2.0) is False
+        assert api.read_many([(1, 1, 6), (9, 1, 6)]) == [2.0, None]
+        assert api.write_many([(1, 1, 7, 1.0), (9, 1, 7, 1.0)]) == [True, False]
+    finally:
+        api.disconnect()
+        api.events.close()
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from jx1000.events import EventBus
+from jx1000.frames import EFRAME
+from jx1000.messages import DevReadReply, InfoReply
+
+
+def _read(addr: int, value: float) -> DevReadReply:
+    return DevReadReply(1, 1, 0, addr, value)
+
+
+def _stalled(bus: EventBus):
+    """Subscribe a callback that holds the dispatcher until the returned event is set."""
+    gate = threading.Event()
+    got = []
+
+    def callback(cmd, value):
+        gate.wait(5)
+        got.append(value)
+
+    bus.subscribe(callback)
+    return gate, got
+
+
+def _fill(bus: EventBus, events):
+    # The first event is taken by the dispatcher, which then blocks in the callback.
+    bus.publish(EFRAME.RES, "first")
+    deadline = time.monotonic() + 2
+    while len(bus) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    for cmd, value in events:
+        bus.publish(cmd, value)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        EventBus(policy="fifo")
+
+
+def test_drop_oldest():
+    bus = EventBus(maxsize=3, policy="drop-oldest")
+    gate, got = _stalled(bus)
+    _fill(bus, [(EFRAME.RES, f"e{i}") for i in range(5)])
+    gate.set()
+    assert bus.flush(2)
+    assert got == ["first", "e2", "e3", "e4"]
+    assert bus.dropped == 2
+    bus.close()
+
+
+def test_coalesce_only_when_full():
+    bus = EventBus(maxsize=3, policy="coalesce")
+    gate, got = _stalled(bus)
+    _fill(bus, [(EFRAME.DevRead, _read(5, 1.0)), (EFRAME.DevRead, _read(5, 2.0)),
+                (EFRAME.DevRead, _read(6, 3.0)), (EFRAME.DevRead, _read(5, 4.0)),
+                (EFRAME.RES, "text")])
+    gate.set()
+    assert bus.flush(2)
+    values = [v["value"] if isinstance(v, dict) else v for v in got]
+    # Below maxsize nothing is merged; once full, addr 5 replaces its queued
+    # value and the text event drops the oldest.
+    assert values == ["first", 4.0, 3.0, "text"]
+    assert bus.coalesced == 1
+    assert bus.dropped == 1
+    bus.close()
+
+
+def test_block_waits_for_space():
+    bus = EventBus(maxsize=2, policy="block")
+    gate, got = _stalled(bus)
+    _fill(bus, [(EFRAME.RES, "a"), (EFRAME.RES, "b")])
+    publisher = threading.Thread(target=bus.publish, args=(EFRAME.RES, "c"))
+    publisher.start()
+    publisher.join(0.1)
+    assert publisher.is_alive()
+    gate.set()
+    publisher.join(2)
+    assert bus.flush(2)
+    assert got == ["first", "a", "b", "c"]
+    assert bus.dropped == 0
+    bus.close()
+
+
+def test_block_publish_from_a_subscriber_does_not_deadlock():
+    bus = EventBus(maxsize=1, policy="block")
+    got = []
+
+    def callback(cmd, value):
+        got.append(value)
+        if value == "outer":
+            for i in range(3):
+                bus.publish(EFRAME.RES, f"inner{i}")
+
+    bus.subscribe(callback)
+    bus.publish(EFRAME.RES, "outer")
+    assert bus.flush(2)
+    assert sorted(got) == ["inner0", "inner1", "inner2", "outer"]
+    bus.close()
+
+
+def test_filters_and_plain_values():
+    bus = EventBus()
+    source = object()
+    by_com, batches, info = [], [], []
+    bus.subscribe(lambda cmd, value: by_com.append(value), com=1, ch=1)
+    bus.subscribe(batches.append, batch=True, source=source)
+    bus.subscribe(lambda cmd, value: info.append(value), cmd=EFRAME.Info)
+    bus.publish(EFRAME.DevRead, _read(5, 1.5), source=source)
+    bus.publish(EFRAME.DevRead, DevReadReply(2, 1, 0, 5, 2.5))
+    bus.publish(EFRAME.Info, InfoReply(1, "1.0", 2, 8))
+    assert bus.flush(2)
+    assert by_com == [{"com": 1, "ch": 1, "addr": 5, "result": 0, "value": 1.5}]
+    assert batches == [[(EFRAME.DevRead, by_com[0])]]
+    assert info == [{"HardType": 1, "Version": "1.0", "ComNumber": 2, "BoardCount": 8}]
+    bus.close()
+
+
+def test_idle_dispatcher_exits_and_restarts():
+    bus = EventBus(idle_timeout=0.05)
+    got = []
+    bus.subscribe(lambda cmd, value: got.append(value))
+    bus.publish(EFRAME.RES, "a")
+    assert bus.flush(2)
+    time.sleep(0.2)
+    assert bus._thread is None
+    bus.publish(EFRAME.RES, "b")
+    assert bus.flush(2)
+    assert got == ["a", "b"]
+    bus.close()
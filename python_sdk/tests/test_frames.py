@@ -0,0 +1,75 @@
+import struct
+
+from jx1000.frames import (EFRAME, FrameParser, build_frame, decode_dev_reply, decode_log,
+                           decode_res)
+
+
+def _read_frame(addr: int) -> bytes:
+    return bytes(build_frame(EFRAME.DevRead, struct.pack("<BBBHf", 1, 1, 0, addr, 1.5)))
+
+
+def test_frames_split_across_feeds():
+    stream = _read_frame(1) + _read_frame(2)
+    parser = FrameParser()
+    frames = []
+    for i in range(len(stream)):
+        frames += list(parser.feed(stream[i:i + 1]))
+    assert [decode_dev_reply(payload).addr for _, payload in frames] == [1, 2]
+    assert len(parser) == 0
+
+
+def test_resync_skips_garbage_between_frames():
+    parser = FrameParser()
+    garbage = b"\x00\x11\xff\x5e\x42" * 20
+    frames = list(parser.feed(garbage + _read_frame(7) + garbage + _read_frame(8)))
+    assert [decode_dev_reply(payload).addr for _, payload in frames] == [7, 8]
+    assert parser.discarded == 2 * len(garbage)
+    assert parser.bad_checksums == 0
+
+
+def test_bad_checksum_is_dropped_and_parsing_resumes():
+    bad = bytearray(_read_frame(3))
+    bad[-1] ^= 0xFF
+    parser = FrameParser()
+    frames = list(parser.feed(bytes(bad) + _read_frame(4)))
+    assert [decode_dev_reply(payload).addr for _, payload in frames] == [4]
+    assert parser.bad_checksums == 1
+
+
+def test_false_header_inside_noise():
+    # 0xA5 0x5E followed by a length that runs into the real frame.
+    parser = FrameParser()
+    frames = list(parser.feed(b"\xa5\x5e\x03\x21\x00" + _read_frame(5)))
+    assert [decode_dev_reply(payload).addr for _, payload in frames] == [5]
+
+
+def test_trailing_header_byte_is_kept():
+    frame = _read_frame(6)
+    parser = FrameParser()
+    assert list(parser.feed(b"noise" + frame[:1])) == []
+    assert len(parser) == 1
+    frames = list(parser.feed(frame[1:]))
+    assert [decode_dev_reply(payload).addr for _, payload in frames] == [6]
+
+
+def test_buffer_is_compacted():
+    parser = FrameParser(compact_threshold=64)
+    frame = _read_frame(9)
+    for _ in range(50):
+        list(parser.feed(frame + frame[:4]))
+        list(parser.feed(frame[4:]))
+    assert len(parser._buf) < 64 + 2 * len(frame)
+
+
+def test_decode_text():
+    assert decode_res(b"{ED,1}") == ("{PASS}", True)
+    assert decode_res(b"{ED,0}") == ("FAIL", True)
+    assert decode_res(b"  step 1 ok \r\n") == ("step 1 ok", False)
+    assert decode_log(b"cmd_EnableExec.") == "Starting test..."
+    assert decode_log(b"cmd_Test Start...") == "Test Start"
+    assert decode_log(b"cmd_Test End...") == "Test End"
+    assert decode_log(b" free text ") == "free text"
+
+
+def test_short_dev_reply():
+    assert decode_dev_reply(b"\x01\x02") is None
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from jx1000.driver import JX1000Driver
+from jx1000.frames import EFRAME
+from jx1000.mux import RequestMux
+from jx1000.sim.device import SimulatedJX1000
+
+
+def test_replies_resolve_oldest_request_for_their_key():
+    mux = RequestMux()
+    first = mux.register("a", 1.0)
+    second = mux.register("a", 1.0)
+    other = mux.register("b", 1.0)
+    assert mux.in_flight == 3
+
+    assert mux.resolve("b", "B")
+    assert mux.resolve("a", "A1")
+    assert mux.resolve("a", "A2")
+    assert (first.result(0), second.result(0), other.result(0)) == ("A1", "A2", "B")
+    assert mux.in_flight == 0
+
+
+def test_unsolicited_reply_is_ignored():
+    mux = RequestMux()
+    assert not mux.resolve("a", "late")
+    fut = mux.register("a", 1.0)
+    assert not mux.resolve("b", "wrong key")
+    assert not fut.done()
+
+
+def test_resolve_oldest_ignores_address():
+    mux = RequestMux()
+    later = mux.register((EFRAME.DevWrite, 1, 1, 9), 1.0)
+    time.sleep(0.001)
+    newest = mux.register((EFRAME.DevWrite, 1, 1, 2), 1.0)
+    assert mux.resolve_oldest(EFRAME.DevWrite, b"\x00")
+    assert later.result(0) == b"\x00"
+    assert not newest.done()
+
+
+def test_expired_requests_fail_and_free_their_slot():
+    mux = RequestMux(max_in_flight=1)
+    fut = mux.register("a", 0.01)
+    assert mux.register("b", 0.0, block=False) is None
+    time.sleep(0.02)
+    mux.expire()
+    with pytest.raises(FutureTimeoutError):
+        fut.result(0)
+    assert mux.register("b", 0.0, block=False) is not None
+
+
+def test_expired_request_is_not_resolved_by_a_late_reply():
+    mux = RequestMux()
+    stale = mux.register("a", 0.01)
+    time.sleep(0.02)
+    fresh = mux.register("a", 1.0)
+    assert mux.resolve("a", "reply")
+    with pytest.raises(FutureTimeoutError):
+        stale.result(0)
+    assert fresh.result(0) == "reply"
+
+
+def test_fail_all():
+    mux = RequestMux()
+    futures = [mux.register(i, 1.0) for i in range(3)]
+    mux.fail_all(ConnectionError("Port closed"))
+    for fut in futures:
+        with pytest.raises(ConnectionError):
+            fut.result(0)
+    assert mux.in_flight == 0
+
+
+def test_pipelined_reads_come_back_in_request_order(driver, device):
+    for addr in range(20):
+        device.memory[(1, 2, addr)] = addr * 0.5
+    values = driver.read_many([(1, 2, addr) for addr in range(20)])
+    assert values == [addr * 0.5 for addr in range(20)]
+
+
+def test_read_timeout_against_a_silent_device(sim):
+    drv = JX1000Driver("sim", print_events=False)
+    drv.open_serial(sim.add_fake(SimulatedJX1000(drop_rate=1.0)))
+    try:
+        assert drv.read(1, 1, 5, timeout=50) is None
+        assert drv._mux.in_flight == 0
+    finally:
+        drv.close_port()
+        drv.events.close()
@@ -0,0 +1,60 @@
+import struct
+
+import numpy as np
+import pytest
+
+from jx1000.registers import (MAX_WRITE_REGISTERS, decode_registers, encode_registers,
+                              expand_writes, plan_writes)
+
+VALUES = {
+    "float32": [0.0, 1.5, -3.25, 1e6, float("inf")],
+    "float64": [0.0, 1.5, -3.25, 1e300],
+    "int32": [0, 1, -1, 2 ** 31 - 1, -2 ** 31],
+    "uint32": [0, 1, 2 ** 32 - 1, 123456789],
+}
+
+
+@pytest.mark.parametrize("dtype", sorted(VALUES))
+@pytest.mark.parametrize("wordorder", ["big", "little"])
+@pytest.mark.parametrize("byteorder", ["big", "little"])
+def test_round_trip(dtype, wordorder, byteorder):
+    values = np.array(VALUES[dtype], dtype=dtype)
+    registers = encode_registers(values, dtype, wordorder, byteorder)
+    assert registers.dtype == np.uint16
+    assert len(registers) == len(values) * np.dtype(dtype).itemsize // 2
+    decoded = decode_registers(registers.tolist(), dtype, wordorder, byteorder)
+    np.testing.assert_array_equal(decoded, values)
+
+
+def test_word_orders_match_struct():
+    hi, lo = struct.unpack(">HH", struct.pack(">f", 1.5))
+    assert encode_registers([1.5]).tolist() == [hi, lo]
+    assert encode_registers([1.5], wordorder="little").tolist() == [lo, hi]
+    assert decode_registers([lo, hi], wordorder="little")[0] == 1.5
+    swapped = [int.from_bytes(struct.pack(">H", w), "little") for w in (hi, lo)]
+    assert encode_registers([1.5], byteorder="little").tolist() == swapped
+
+
+def test_decode_rejects_bad_input():
+    with pytest.raises(ValueError):
+        decode_registers([1, 2, 3], "float32")
+    with pytest.raises(ValueError):
+        decode_registers([1, 2], "int16")
+    with pytest.raises(ValueError):
+        decode_registers([1, 2], wordorder="middle")
+
+
+def test_expand_writes():
+    assert expand_writes({5: 7, 6: 8.0}) == {5: 7, 6: 8}
+    assert expand_writes([(10, 1.5)], "float32") == dict(zip((10, 11), encode_registers([1.5]).tolist()))
+    for bad in (3.7, -1, 0x10000, float("nan")):
+        with pytest.raises(ValueError):
+            expand_writes({1: bad})
+
+
+def test_plan_writes_merges_runs():
+    registers = {address: address for address in list(range(10, 14)) + [20, 21]}
+    assert plan_writes(registers) == [(10, [10, 11, 12, 13]), (20, [20, 21])]
+    long = {address: 0 for address in range(300)}
+    runs = plan_writes(long)
+    assert [len(values) for _, values in runs] == [MAX_WRITE_REGISTERS, MAX_WRITE_REGISTERS, 54]
@@ -0,0 +1,144 @@
+import struct
+import time
+
+from jx1000.driver import JX1000Driver
+from jx1000.frames import FrameParser
+from jx1000.sim.device import SimulatedJX1000
+from jx1000.transfer import DEFAULT_CHUNK, RuleTransfer
+
+
+class _Driver:
+    """Collects the RuleDown chunks a transfer sends and the events it raises."""
+
+    def __init__(self):
+        self.image = bytearray()
+        self.chunks = []
+        self.events = []
+        self.fallback_at = None
+        self._parser = FrameParser()
+
+    def send_raw(self, frame) -> bool:
+        for cmd, payload in self._parser.feed(bytes(frame)):
+            state, offset, length = struct.unpack_from("<BHB", payload)
+            self.chunks.append((offset, length))
+            end = offset + length
+            if len(self.image) < end:
+                self.image.extend(bytes(end - len(self.image)))
+            self.image[offset:end] = payload[4:4 + length]
+        return True
+
+    def send_frame(self, cmd, payload=b"") -> bool:
+        return True
+
+    def _dispatch_event(self, cmd, value):
+        if value == "fallback: stop-and-wait":
+            self.fallback_at = len(self.chunks)
+        self.events.append(value)
+
+
+def _drive(transfer: RuleTransfer, answer) -> bool:
+    """Run transfer.steps(); `answer(n)` gives the n-th ack: True, False or None (timeout)."""
+    steps = transfer.steps()
+    n = 0
+    try:
+        deadline, settle = next(steps)
+        while True:
+            if settle:
+                deadline, settle = steps.send(None)
+                continue
+            ok = answer(n)
+            n += 1
+            deadline, settle = steps.send(None if ok is None else (ok, time.monotonic()))
+    except StopIteration as stop:
+        return stop.value
+
+
+IMAGE = bytes(range(256)) * 8
+
+
+def test_defaults_are_stop_and_wait():
+    transfer = RuleTransfer(_Driver(), IMAGE)
+    assert (transfer.window, transfer.adaptive, transfer.chunk_size) == (1, False, DEFAULT_CHUNK)
+
+
+def test_windowed_transfer_sends_the_whole_image():
+    driver = _Driver()
+    transfer = RuleTransfer(driver, IMAGE, window=4, adaptive=True)
+    assert _drive(transfer, lambda n: True)
+    assert bytes(driver.image) == IMAGE
+    assert not transfer.fell_back
+    assert transfer.bytes_sent == len(IMAGE)
+
+
+def test_nack_falls_back_to_stop_and_wait():
+    driver = _Driver()
+    transfer = RuleTransfer(driver, IMAGE, window=4, adaptive=True)
+    assert _drive(transfer, lambda n: n != 2)
+    assert transfer.fell_back
+    assert (transfer.window, transfer.adaptive, transfer.chunk_size) == (1, False, DEFAULT_CHUNK)
+    assert "fallback: stop-and-wait" in driver.events
+    assert bytes(driver.image) == IMAGE
+
+
+def test_timeout_falls_back_to_stop_and_wait():
+    driver = _Driver()
+    transfer = RuleTransfer(driver, IMAGE, window=4, ack_timeout=0.01)
+    assert _drive(transfer, lambda n: None if n == 1 else True)
+    assert transfer.fell_back
+    assert bytes(driver.image) == IMAGE
+    assert all(length <= DEFAULT_CHUNK for _, length in driver.chunks[driver.fallback_at:])
+
+
+def test_stop_and_wait_gives_up_after_retries():
+    driver = _Driver()
+    transfer = RuleTransfer(driver, IMAGE, retries=2)
+    assert not _drive(transfer, lambda n: False)
+    assert "chunk-failed" in driver.events
+    assert len(driver.chunks) == 3
+
+
+def test_delta_ranges_send_only_those_bytes():
+    driver = _Driver()
+    transfer = RuleTransfer(driver, IMAGE, ranges=[(0, 10), (1000, 1200)])
+    assert _drive(transfer, lambda n: True)
+    assert transfer.bytes_sent == 210
+    assert {offset for offset, _ in driver.chunks} == {0, 1000, 1000 + DEFAULT_CHUNK}
+
+
+def test_download_through_the_driver_with_naks(sim):
+    device = SimulatedJX1000(nak_rate=0.05, seed=3)
+    drv = JX1000Driver("sim", print_events=False)
+    drv.open_serial(sim.add_fake(device))
+    done = []
+    drv.on_transfer_done = done.append
+    try:
+        drv.download_rules(IMAGE, window=4, adaptive=True)
+        deadline = time.monotonic() + 10
+        while not done and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert done == [True]
+        assert bytes(device.rule_image) == IMAGE
+        assert drv.last_transfer.fell_back
+    finally:
+        drv.close_port()
+        drv.events.close()
+
+
+def test_delta_download_sends_only_changed_blocks(driver, device):
+    done = []
+    driver.on_transfer_done = done.append
+
+    def download(image):
+        done.clear()
+        driver.download_rules(image, delta=True, unit_id="SN1")
+        deadline = time.monotonic() + 10
+        while not done and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert done == [True]
+        return driver.last_transfer.bytes_sent
+
+    assert download(IMAGE) == len(IMAGE)
+    changed = bytearray(IMAGE)
+    changed[100] ^= 1
+    assert download(bytes(changed)) == DEFAULT_CHUNK
+    assert bytes(device.rule_image) == bytes(changed)
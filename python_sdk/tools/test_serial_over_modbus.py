@@ -1,5 +1,11 @@
+import sys
 import serial
-import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]  # points to python_sdk/
+sys.path.insert(0, str(repo_root))
+
+from jx1000.crc import crc16_modbus_bytes
 
 # Configure serial port
 ser = serial.Serial(
@@ -11,18 +17,8 @@ ser = serial.Serial(
     timeout=1
 )
 
-# CRC16 Modbus calculation
-def crc16(data: bytes):
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 0x0001:
-                crc >>= 1
-                crc ^= 0xA001
-            else:
-                crc >>= 1
-    return crc.to_bytes(2, byteorder='little')
+# CRC16 Modbus calculation (table driven, shared with jx1000)
+crc16 = crc16_modbus_bytes
 
 # Write Single Register Request (FC 0x06)
 slave_id = 1
@@ -43,9 +39,8 @@ print("TX:", request.hex(" "))
 
 # Send request
 ser.write(request)
-time.sleep(0.2) 
 
-# Read response
+# Read response (returns as soon as all 8 bytes are in)
 response = ser.read(8)
 print("RX:", response.hex(" ") if response else "no response")
 